@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import threading
+
+from catalog_store import CatalogLock, write_file_atomic, write_json_atomic
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_if_changed(full_path, content):
+    """Write a file outside the manifest (e.g. a crawler cache) unless it holds this content; returns True if written"""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    try:
+        with open(full_path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    write_file_atomic(full_path, data)
+    return True
+
+
+class BuildManifest:
+    """Content hashes of everything written under the site directory.
+
+    Kept in a JSON file next to ``out/`` as ``{"files": {path: {"sha256", "bytes"}},
+    "pending": [paths]}``. ``write()`` skips byte-identical output, so
+    unchanged pages keep their mtime, and every path whose content did change
+    stays in ``pending`` until a deploy reports the hash it published with
+    ``mark_deployed()`` (a pending path missing from ``files`` was removed).
+    Saves merge with the file on disk under the catalog lock, so the bot,
+    the APIs and a rebuild can all record into it.
+    """
+
+    def __init__(self, root="./out", path="./build-manifest.json"):
+        self.root = root
+        self.path = path
+        self.lock = CatalogLock.for_directory(root)
+        self._lock = threading.RLock()
+        self._files = {}
+        self._pending = set()
+        # Local changes not yet merged into the file
+        self._updated = {}
+        self._deployed = set()
+        self._load()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable {self.path}: {e}")
+            return {}
+
+    def _load(self):
+        data = self._read()
+        self._files = data.get("files", {})
+        self._pending = set(data.get("pending", []))
+
+    # ---- recording -----------------------------------------------------
+
+    def record(self, rel_path, digest, size):
+        """Note that rel_path now holds content with this hash; returns True if that's a change"""
+        with self._lock:
+            entry = self._files.get(rel_path)
+            if entry is not None and entry["sha256"] == digest:
+                return False
+            entry = {"sha256": digest, "bytes": size}
+            self._files[rel_path] = entry
+            self._updated[rel_path] = entry
+            self._pending.add(rel_path)
+            self._deployed.discard(rel_path)
+            return True
+
+    def annotate(self, rel_path, digest, **fields):
+        """Attach extra fields (e.g. compressed sizes) to rel_path's entry if it still has this hash"""
+        with self._lock:
+            entry = self._files.get(rel_path)
+            if entry is None or entry["sha256"] != digest:
+                return False
+            entry = {**entry, **fields}
+            self._files[rel_path] = entry
+            self._updated[rel_path] = entry
+            return True
+
+    def unchanged(self, rel_path, digest):
+        """True if rel_path on disk already holds content with this hash"""
+        entry = self._files.get(rel_path)
+        if entry is None or entry["sha256"] != digest:
+            return False
+        try:
+            return os.path.getsize(os.path.join(self.root, rel_path)) == entry["bytes"]
+        except OSError:
+            return False
+
+    def write(self, rel_path, content):
+        """Write a site file unless it already holds exactly this content; returns True if written"""
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = content_hash(data)
+        if self.unchanged(rel_path, digest):
+            return False
+        full_path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        write_file_atomic(full_path, data)
+        self.record(rel_path, digest, len(data))
+        return True
+
+    def remove(self, rel_path):
+        """Delete a site file (and its compressed siblings); it stays pending so the next deploy drops it"""
+        full_path = os.path.join(self.root, rel_path)
+        for path in (full_path, f"{full_path}.gz", f"{full_path}.br"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            if self._files.pop(rel_path, None) is None:
+                return False
+            self._updated[rel_path] = None
+            self._pending.add(rel_path)
+            self._deployed.discard(rel_path)
+            return True
+
+    def track(self, rel_path):
+        """Hash a file something else wrote (e.g. a JSON snapshot); returns True if it changed"""
+        try:
+            with open(os.path.join(self.root, rel_path), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return False
+        return self.record(rel_path, content_hash(data), len(data))
+
+    # ---- deploy hand-off -----------------------------------------------
+
+    def files(self):
+        with self._lock:
+            return dict(self._files)
+
+    def pending(self):
+        """Paths whose content changed since they were last deployed"""
+        with self.lock, self._lock:
+            self._merge()
+            return set(self._pending)
+
+    def deployable(self, paths):
+        """{path: sha256} for paths about to be deployed (None for removed files), for ``mark_deployed()``"""
+        with self._lock:
+            return {path: self._files[path]["sha256"] if path in self._files else None for path in paths}
+
+    def mark_deployed(self, deployed):
+        """Clear deployed paths from pending, unless their content changed again since ({path: sha256})"""
+        with self.lock, self._lock:
+            self._merge()
+            for path, digest in deployed.items():
+                entry = self._files.get(path)
+                if (entry["sha256"] if entry else None) == digest:
+                    self._pending.discard(path)
+                    self._deployed.add(path)
+            self.save()
+
+    # ---- persistence ---------------------------------------------------
+
+    def _merge(self):
+        """Fold other processes' records into ours (caller holds the catalog lock); returns the file's data"""
+        data = self._read()
+        files = {**data.get("files", {}), **self._updated}
+        # Removed files are None in _updated
+        self._files = {path: entry for path, entry in files.items() if entry is not None}
+        self._pending = (set(data.get("pending", [])) | set(self._updated)) - self._deployed
+        return data
+
+    def save(self, **extra):
+        """Merge local records into the manifest file; extra keys (e.g. build stats) are stored alongside"""
+        with self.lock, self._lock:
+            data = self._merge()
+            data.update(extra)
+            data["files"] = self._files
+            data["pending"] = sorted(self._pending)
+            write_json_atomic(self.path, data)
+            self._updated = {}
+            self._deployed = set()
@@ -0,0 +1,340 @@
+import json
+import os
+import sqlite3
+import threading
+
+from catalog_store import CatalogLock, ProductStore, compactor, write_json_atomic
+from product_record import Product
+from search_index import SearchIndex
+
+
+class SqliteRecordStore:
+    """SQLite-backed drop-in for RecordStore (same read/write methods).
+
+    Each collection is a table holding the record JSON plus a few indexed
+    columns pulled out of it. ``seq`` preserves the JSON files' ordering:
+    upserts move a record to the end, updates keep its place. The database
+    runs in WAL mode so readers never block the writer, and every write bumps
+    a per-table version in ``catalog_meta``. ``compact()`` exports the table
+    to the familiar JSON layout for the static site whenever that version moved.
+    """
+
+    table = None
+    collection = None
+    key_field = "id"
+    columns = ()
+    extra_indexes = ()
+    # Optional compact representation handed to readers (from_dict / to_dict)
+    record_type = None
+
+    def __init__(self, db_path, export_path):
+        self.db_path = db_path
+        self.path = export_path
+        self.lock = CatalogLock.for_directory(os.path.dirname(export_path))
+        self._local = threading.local()
+        self._exported_version = None
+        self._init_schema()
+
+    # ---- connection / schema -------------------------------------------
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._conn()
+        extra = "".join(f", {column} TEXT" for column in self.columns)
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} "
+            f"({self.key_field} TEXT PRIMARY KEY, seq INTEGER NOT NULL{extra}, data TEXT NOT NULL)"
+        )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_seq ON {self.table}(seq)")
+        for column in self.columns:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_{column} ON {self.table}({column}, seq)")
+        for name, columns in self.extra_indexes:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_{name} ON {self.table}({columns})")
+        conn.execute("CREATE TABLE IF NOT EXISTS catalog_meta (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+        conn.execute("INSERT OR IGNORE INTO catalog_meta (name, version) VALUES (?, 0)", (self.table,))
+
+    def _load(self, data):
+        record = json.loads(data)
+        return record if self.record_type is None else self.record_type.from_dict(record)
+
+    def _dump(self, record):
+        return record if self.record_type is None else self.record_type.from_dict(record).to_dict()
+
+    def _column_values(self, record):
+        return [record.get(column) for column in self.columns]
+
+    def _write(self, fn):
+        """Run fn(conn) -> (result, {key: record or None}) in an IMMEDIATE transaction and bump the table version"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result, changes = fn(conn)
+            before = self._read_version(conn)
+            conn.execute("UPDATE catalog_meta SET version = version + 1 WHERE name = ?", (self.table,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._committed(before, changes)
+        compactor.notify(self)
+        return result
+
+    def _committed(self, before_version, changes):
+        """Hook for in-memory structures that follow the table"""
+        pass
+
+    # ---- reads ---------------------------------------------------------
+
+    def _select(self, where="", params=()):
+        rows = self._conn().execute(
+            f"SELECT data FROM {self.table} {where} ORDER BY seq", params
+        ).fetchall()
+        return [self._load(row[0]) for row in rows]
+
+    def all(self):
+        return self._select()
+
+    def get(self, key):
+        row = self._conn().execute(
+            f"SELECT data FROM {self.table} WHERE {self.key_field} = ?", (key,)
+        ).fetchone()
+        return self._load(row[0]) if row else None
+
+    def __len__(self):
+        return self._conn().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def latest(self, limit):
+        """The ``limit`` most recently added records, newest first"""
+        rows = self._conn().execute(
+            f"SELECT data FROM {self.table} ORDER BY seq DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [self._load(row[0]) for row in rows]
+
+    def _read_version(self, conn):
+        return conn.execute(
+            "SELECT version FROM catalog_meta WHERE name = ?", (self.table,)
+        ).fetchone()[0]
+
+    def version(self):
+        return self._read_version(self._conn())
+
+    # ---- writes --------------------------------------------------------
+
+    def _upsert_sql(self):
+        names = [self.key_field, "seq", *self.columns, "data"]
+        placeholders = ", ".join(
+            f"(SELECT COALESCE(MAX(seq), 0) + 1 FROM {self.table})" if name == "seq" else "?"
+            for name in names
+        )
+        updates = ", ".join(f"{name} = excluded.{name}" for name in names[1:])
+        return (f"INSERT INTO {self.table} ({', '.join(names)}) VALUES ({placeholders}) "
+                f"ON CONFLICT({self.key_field}) DO UPDATE SET {updates}")
+
+    def _upsert_params(self, record):
+        return (record[self.key_field], *self._column_values(record),
+                json.dumps(record, ensure_ascii=False))
+
+    def upsert(self, record):
+        """Add or replace a record; it moves to the end (newest) of the collection"""
+        record = self._dump(record)
+        def write(conn):
+            conn.execute(self._upsert_sql(), self._upsert_params(record))
+            count = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            return count, {record[self.key_field]: record}
+        return self._write(write)
+
+    def bulk_upsert(self, records):
+        """Upsert many records in one transaction, in order"""
+        sql = self._upsert_sql()
+        records = [self._dump(record) for record in records]
+        def write(conn):
+            for record in records:
+                conn.execute(sql, self._upsert_params(record))
+            return len(records), {record[self.key_field]: record for record in records}
+        return self._write(write)
+
+    def update(self, key, changes):
+        """Merge field changes into an existing record; returns it, or None if missing"""
+        assignments = "".join(f"{column} = ?, " for column in self.columns)
+        def write(conn):
+            row = conn.execute(
+                f"SELECT data FROM {self.table} WHERE {self.key_field} = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None, {}
+            updated = self._dump({**json.loads(row[0]), **changes})
+            conn.execute(
+                f"UPDATE {self.table} SET {assignments}data = ? WHERE {self.key_field} = ?",
+                (*self._column_values(updated), json.dumps(updated, ensure_ascii=False), key),
+            )
+            return updated, {key: updated}
+        return self._write(write)
+
+    def delete(self, key):
+        def write(conn):
+            deleted = conn.execute(
+                f"DELETE FROM {self.table} WHERE {self.key_field} = ?", (key,)
+            ).rowcount > 0
+            return deleted, {key: None} if deleted else {}
+        return self._write(write)
+
+    # ---- JSON export ---------------------------------------------------
+
+    def needs_compaction(self):
+        # Exports are cheap to defer; the compactor's periodic pass picks them up
+        return False
+
+    def compact(self):
+        """Export the table to the static site's JSON layout if it changed"""
+        with self.lock:
+            version = self.version()
+            if version == self._exported_version and os.path.exists(self.path):
+                return False
+            write_json_atomic(self.path, {self.collection: [self._dump(r) for r in self.all()]})
+            self._exported_version = version
+            return True
+
+
+class SqliteProductStore(SqliteRecordStore):
+    table = "products"
+    collection = "products"
+    record_type = Product
+    columns = ("artisan_phone", "category", "created_at")
+    extra_indexes = (
+        ("seller_id", "artisan_phone, id"),
+        ("listing", "created_at, id"),
+        ("category_listing", "category, created_at, id"),
+        ("seller_listing", "artisan_phone, created_at, id"),
+    )
+
+    def __init__(self, db_path, export_path):
+        super().__init__(db_path, export_path)
+        # Built on first search; kept current by our own commits and rebuilt
+        # when another process wrote in between (the table version skipped ahead)
+        self._search = None
+        self._search_version = None
+        self._search_lock = threading.Lock()
+        # Listing keysets compare (created_at, id); NULLs would drop out of them
+        self._conn().execute("UPDATE products SET created_at = '' WHERE created_at IS NULL")
+
+    def _column_values(self, product):
+        return [product.get("artisan_phone") or product.get("user_phone"),
+                product.get("category"), product.get("created_at") or ""]
+
+    def _committed(self, before_version, changes):
+        with self._search_lock:
+            if self._search is None or self._search_version != before_version:
+                self._search_version = None
+                return
+            for key, product in changes.items():
+                if product is None:
+                    self._search.remove(key)
+                else:
+                    self._search.add(product)
+            self._search_version = before_version + 1
+
+    def search(self, query, limit=None):
+        """Products matching a free-text query, best BM25 match first"""
+        with self._search_lock:
+            version = self.version()
+            if self._search is None or self._search_version != version:
+                self._search = SearchIndex()
+                for product in self.all():
+                    self._search.add(product)
+                self._search_version = version
+            ranked = self._search.search(query, limit)
+        products = []
+        for product_id, _ in ranked:
+            product = self.get(product_id)
+            if product is not None:
+                products.append(product)
+        return products
+
+    def by_seller(self, phone):
+        return self._select("WHERE artisan_phone = ?", (phone,))
+
+    def by_category(self, category):
+        return self._select("WHERE category = ?", (category,))
+
+    listing_key = staticmethod(ProductStore.listing_key)
+
+    def page(self, limit, after=None, seller=None, category=None):
+        """One page of products, newest first, via a keyset scan of the listing indexes"""
+        where, params = [], []
+        if seller is not None:
+            where.append("artisan_phone = ?")
+            params.append(seller)
+        if category is not None:
+            where.append("category = ?")
+            params.append(category)
+        if after is not None:
+            where.append("(created_at, id) < (?, ?)")
+            params.extend(after)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        rows = self._conn().execute(
+            f"SELECT data FROM products {clause} ORDER BY created_at DESC, id DESC LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+        products = [self._load(row[0]) for row in rows[:limit]]
+        if len(rows) > limit:
+            return products, self.listing_key(products[-1])
+        return products, None
+
+    def listing_ids(self, category=None):
+        """Ids of all products (or one category's), oldest first in listing order"""
+        if category is None:
+            rows = self._conn().execute("SELECT id FROM products ORDER BY created_at, id")
+        else:
+            rows = self._conn().execute(
+                "SELECT id FROM products WHERE category = ? ORDER BY created_at, id", (category,))
+        return [row[0] for row in rows]
+
+    def seller_summaries(self, limit):
+        """[(seller phone, product count, first product)] for the first ``limit`` sellers"""
+        rows = self._conn().execute(
+            "SELECT artisan_phone, COUNT(*), MIN(seq) AS first_seq FROM products "
+            "WHERE artisan_phone IS NOT NULL GROUP BY artisan_phone ORDER BY first_seq LIMIT ?",
+            (limit,),
+        ).fetchall()
+        summaries = []
+        for phone, count, first_seq in rows:
+            data = self._conn().execute("SELECT data FROM products WHERE seq = ?", (first_seq,)).fetchone()
+            summaries.append((phone, count, self._load(data[0])))
+        return summaries
+
+    def find_by_prefix(self, prefix, seller=None, limit=2):
+        """Up to ``limit`` product ids starting with ``prefix``, via an index range scan"""
+        if not prefix:
+            return []
+        # Every id starting with prefix sorts in [prefix, prefix-with-last-char-bumped)
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        where = "id >= ? AND id < ?"
+        params = [prefix, upper]
+        if seller is not None:
+            where += " AND artisan_phone = ?"
+            params.append(seller)
+        rows = self._conn().execute(
+            f"SELECT id FROM products WHERE {where} ORDER BY id LIMIT ?", (*params, limit)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+class SqliteSellerStore(SqliteRecordStore):
+    table = "sellers"
+    collection = "sellers"
+    key_field = "phone"
+
+
+class SqliteReelStore(SqliteRecordStore):
+    table = "reels"
+    collection = "reels"
+    columns = ("created_at",)
@@ -0,0 +1,663 @@
+import json
+import os
+import queue
+from bisect import bisect_left, insort
+from itertools import islice
+import threading
+import time
+from concurrent.futures import Future
+
+from product_record import Product
+from search_index import SearchIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines
+    fcntl = None
+    import msvcrt
+
+
+def temp_path(path):
+    """Scratch name next to path, unique per writer (process and thread)"""
+    return f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+
+
+def write_file_atomic(path, data):
+    """Write bytes via a temp file + rename; the old file is replaced, never rewritten in place"""
+    tmp_path = temp_path(path)
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_json_atomic(path, data):
+    """Write JSON via a temp file + rename so readers never see a half-written file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = temp_path(path)
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class CatalogLock:
+    """Exclusive lock over a catalog directory, shared by threads and processes.
+
+    A threading lock serializes this process; an flock on ``.catalog.lock``
+    serializes against main.py, edit_api.py, combined_api.py and friends.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_directory(cls, directory):
+        path = os.path.abspath(os.path.join(directory or ".", ".catalog.lock"))
+        with cls._instances_lock:
+            if path not in cls._instances:
+                cls._instances[path] = cls(path)
+            return cls._instances[path]
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        self._depth += 1
+        if self._depth == 1:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_EX)
+                else:
+                    msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+            except Exception:
+                self._release()
+                raise
+        return self
+
+    def __exit__(self, *exc):
+        self._release()
+
+    def _release(self):
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        self._thread_lock.release()
+
+
+class RecordStore:
+    """In-memory view of one catalog collection (products, sellers or reels).
+
+    State lives in two files: a JSON snapshot (the familiar ``{"products": [...]}``
+    layout the static site serves) and a hidden append-only log next to it with
+    one JSON line per mutation. Reads are snapshot + log replay; writes append a
+    single line, so their cost no longer grows with the catalog. ``compact()``
+    folds the log back into a new snapshot with an atomic temp-file rename.
+    """
+
+    collection = None
+    key_field = "id"
+    # Optional compact in-memory representation (from_dict / to_dict)
+    record_type = None
+
+    def __init__(self, path, compact_after=200):
+        self.path = path
+        directory, name = os.path.split(path)
+        self.log_path = os.path.join(directory, f".{os.path.splitext(name)[0]}.log")
+        self.compact_after = compact_after
+        self._lock = threading.RLock()
+        self._signature = None
+        self._snapshot_ok = True
+        self._bad_signature = None
+        self._log_offset = 0
+        self._log_entries = 0
+        self._records = {}
+        self._version = 0
+        self._reset_indexes()
+        self.lock = CatalogLock.for_directory(directory)
+
+    # ---- loading -------------------------------------------------------
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _refresh(self):
+        """Catch up with the files on disk: reload the snapshot if it was replaced, then replay new log lines"""
+        signature = self._stat_signature()
+        if signature != self._signature:
+            if not self._snapshot_ok and signature == self._bad_signature:
+                return
+            records = []
+            if signature is not None:
+                try:
+                    with open(self.path, "r") as f:
+                        records = json.load(f).get(self.collection, [])
+                except (OSError, ValueError) as e:
+                    # Keep serving the last good view rather than an empty catalog,
+                    # and never compact over a snapshot we couldn't read
+                    print(f"❌ Failed to read {self.path}: {e}")
+                    self._snapshot_ok = False
+                    self._bad_signature = signature
+                    return
+            self._snapshot_ok = True
+            self._rebuild(records)
+            self._signature = signature
+            self._log_offset = 0
+            self._log_entries = 0
+        self._tail_log()
+
+    def _rebuild(self, records):
+        self._version += 1
+        self._records = {}
+        self._reset_indexes()
+        for record in records:
+            if record.get(self.key_field):
+                self._add(self._load(record))
+
+    def _tail_log(self):
+        try:
+            size = os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            size = 0
+        if size < self._log_offset:
+            # Log was truncated by a compaction we didn't see; start over
+            self._signature = None
+            self._refresh()
+            return
+        if size == self._log_offset:
+            return
+
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            chunk = f.read(size - self._log_offset)
+
+        # A torn trailing line (crash mid-append) is left for later instead of applied
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                print(f"⚠️ Skipping corrupt line in {self.log_path}")
+                continue
+            self._apply(entry)
+            self._log_entries += 1
+        self._log_offset += end
+
+    def _apply(self, entry):
+        self._version += 1
+        op = entry.get("op")
+        if op == "delete":
+            self._remove(entry["key"])
+            return
+        record = self._load(entry["record"])
+        key = record[self.key_field]
+        if op == "update" and key in self._records:
+            # Assigning an existing key keeps the record's position in the snapshot
+            self._reindex(self._records[key], record)
+            self._records[key] = record
+        else:
+            self._remove(key)
+            self._add(record)
+
+    def _load(self, record):
+        return record if self.record_type is None else self.record_type.from_dict(record)
+
+    def _dump(self, record):
+        return record if self.record_type is None else self.record_type.from_dict(record).to_dict()
+
+    # ---- indexes (subclasses add secondary ones) -----------------------
+
+    def _reset_indexes(self):
+        pass
+
+    def _index(self, record):
+        pass
+
+    def _unindex(self, record):
+        pass
+
+    def _reindex(self, old, new):
+        self._unindex(old)
+        self._index(new)
+
+    def _add(self, record):
+        self._records[record[self.key_field]] = record
+        self._index(record)
+
+    def _remove(self, key):
+        record = self._records.pop(key, None)
+        if record is not None:
+            self._unindex(record)
+        return record
+
+    # ---- reads ---------------------------------------------------------
+
+    def _copy(self, record):
+        """What readers get: plain dicts are copied, so changing one can't bypass the writer and log"""
+        return dict(record) if self.record_type is None and record is not None else record
+
+    def all(self):
+        with self._lock:
+            self._refresh()
+            return list(map(self._copy, self._records.values()))
+
+    def get(self, key):
+        with self._lock:
+            self._refresh()
+            return self._copy(self._records.get(key))
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._records)
+
+    def latest(self, limit):
+        """The ``limit`` most recently added records, newest first"""
+        with self._lock:
+            self._refresh()
+            return list(map(self._copy, islice(reversed(self._records.values()), limit)))
+
+    def version(self):
+        """Counter that moves whenever this view changes, including by other processes' writes"""
+        with self._lock:
+            self._refresh()
+            return self._version
+
+    # ---- writes --------------------------------------------------------
+
+    def _write_log(self, entries):
+        """Append already-applied entries to the log as one fsync'd write (caller holds the catalog lock)"""
+        os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+        data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries).encode("utf-8")
+        with open(self.log_path, "ab") as f:
+            if f.tell() > self._log_offset:
+                # Bytes we haven't replayed can only be a torn line left by a
+                # crashed writer; terminate it so our lines parse cleanly
+                data = b"\n" + data
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            self._log_offset = f.tell()
+        self._log_entries += len(entries)
+
+    def upsert(self, record):
+        """Add or replace a record; it moves to the end (newest) of the collection"""
+        def mutate(store):
+            key = record[store.key_field]
+            count = len(store._records) + (0 if key in store._records else 1)
+            return [{"op": "upsert", "record": store._dump(record)}], count
+        return writer.submit(self, mutate)
+
+    def update(self, key, changes):
+        """Merge field changes into an existing record; returns it, or None if missing"""
+        def mutate(store):
+            current = store._records.get(key)
+            if current is None:
+                return [], None
+            updated = store._dump({**current, **changes})
+            return [{"op": "update", "record": updated}], updated
+        return writer.submit(self, mutate)
+
+    def delete(self, key):
+        def mutate(store):
+            if key not in store._records:
+                return [], False
+            return [{"op": "delete", "key": key}], True
+        return writer.submit(self, mutate)
+
+    # ---- compaction ----------------------------------------------------
+
+    def needs_compaction(self):
+        return self._log_entries >= self.compact_after
+
+    def compact(self):
+        """Write the current view as a new snapshot and reset the log"""
+        with self.lock, self._lock:
+            self._refresh()
+            if not self._snapshot_ok:
+                print(f"❌ Not compacting {self.path}: snapshot is unreadable")
+                return False
+            if self._log_entries == 0 and self._signature is not None:
+                return False
+
+            write_json_atomic(self.path, {self.collection: [self._dump(r) for r in self._records.values()]})
+
+            # Holding the catalog lock means nobody appended since our refresh
+            with open(self.log_path, "w"):
+                pass
+            self._signature = self._stat_signature()
+            self._log_offset = 0
+            self._log_entries = 0
+            return True
+
+
+class ProductStore(RecordStore):
+    """Products, additionally indexed by seller phone, category and id prefix"""
+
+    collection = "products"
+    record_type = Product
+
+    def _reset_indexes(self):
+        self._by_seller = {}
+        self._by_category = {}
+        # Sorted lists answer range questions by bisection:
+        #   ("ids",) / ("ids", seller)       -> product ids, for short-id prefixes
+        #   ("new",) / ("new", field, value) -> (created_at, id), for cursor pagination
+        self._sorted = {}
+        self._bulk_loading = False
+        self._search = SearchIndex()
+
+    def _rebuild(self, records):
+        # Append during a full load and sort once at the end instead of n insorts
+        self._bulk_loading = True
+        try:
+            super()._rebuild(records)
+        finally:
+            self._bulk_loading = False
+        for keys in self._sorted.values():
+            keys.sort()
+
+    @staticmethod
+    def _seller_key(product):
+        return product.get("artisan_phone") or product.get("user_phone")
+
+    @staticmethod
+    def listing_key(product):
+        """Sort key for newest-first listings; products without a date sort oldest"""
+        return (product.get("created_at") or "", product["id"])
+
+    def _sorted_entries(self, product):
+        product_id = product["id"]
+        listing_key = self.listing_key(product)
+        entries = [(("ids",), product_id), (("new",), listing_key)]
+        seller = self._seller_key(product)
+        if seller:
+            entries += [(("ids", seller), product_id), (("new", "seller", seller), listing_key)]
+        category = product.get("category")
+        if category:
+            entries.append((("new", "category", category), listing_key))
+        return entries
+
+    def _index(self, product):
+        product_id = product["id"]
+        seller = self._seller_key(product)
+        if seller:
+            self._by_seller.setdefault(seller, {})[product_id] = None
+        category = product.get("category")
+        if category:
+            self._by_category.setdefault(category, {})[product_id] = None
+
+        self._search.add(product)
+
+        for name, key in self._sorted_entries(product):
+            keys = self._sorted.setdefault(name, [])
+            if self._bulk_loading:
+                keys.append(key)
+            else:
+                insort(keys, key)
+
+    def _unindex(self, product):
+        product_id = product["id"]
+        self._search.remove(product_id)
+        for index, key in ((self._by_seller, self._seller_key(product)),
+                           (self._by_category, product.get("category"))):
+            ids = index.get(key)
+            if ids is not None:
+                ids.pop(product_id, None)
+                if not ids:
+                    del index[key]
+
+        for name, key in self._sorted_entries(product):
+            keys = self._sorted.get(name)
+            if keys:
+                position = bisect_left(keys, key)
+                if position < len(keys) and keys[position] == key:
+                    del keys[position]
+                if not keys:
+                    del self._sorted[name]
+
+    def _reindex(self, old, new):
+        # Most edits (price, title, ...) touch no indexed field; leaving the
+        # indexes alone keeps the product's place in its seller's list
+        if (self._seller_key(old) != self._seller_key(new)
+                or old.get("category") != new.get("category")
+                or old.get("created_at") != new.get("created_at")):
+            super()._reindex(old, new)
+        else:
+            self._search.add(new)
+
+    def find_by_prefix(self, prefix, seller=None, limit=2):
+        """Up to ``limit`` product ids starting with ``prefix``, optionally only ``seller``'s own.
+
+        O(log n) bisection; asking for two is enough to tell a unique match
+        from an ambiguous one.
+        """
+        if not prefix:
+            return []
+        with self._lock:
+            self._refresh()
+            ids = self._sorted.get(("ids",) if seller is None else ("ids", seller), [])
+            start = bisect_left(ids, prefix)
+            return [product_id for product_id in ids[start:start + limit] if product_id.startswith(prefix)]
+
+    def by_seller(self, phone):
+        with self._lock:
+            self._refresh()
+            return [self._records[i] for i in self._by_seller.get(phone, ())]
+
+    def by_category(self, category):
+        with self._lock:
+            self._refresh()
+            return [self._records[i] for i in self._by_category.get(category, ())]
+
+    def seller_summaries(self, limit):
+        """[(seller phone, product count, first product)] for the first ``limit`` sellers"""
+        with self._lock:
+            self._refresh()
+            return [(seller, len(ids), self._records[next(iter(ids))])
+                    for seller, ids in islice(self._by_seller.items(), limit)]
+
+    def page(self, limit, after=None, seller=None, category=None):
+        """One page of products, newest first.
+
+        ``after`` is the listing key of the last product on the previous page.
+        Returns (products, listing key to continue from, or None at the end).
+        """
+        with self._lock:
+            self._refresh()
+            if seller is not None:
+                name = ("new", "seller", seller)
+            elif category is not None:
+                name = ("new", "category", category)
+            else:
+                name = ("new",)
+            keys = self._sorted.get(name, [])
+            position = len(keys) if after is None else bisect_left(keys, tuple(after))
+
+            products = []
+            while position > 0 and len(products) <= limit:
+                position -= 1
+                product = self._records[keys[position][1]]
+                if category is None or product.get("category") == category:
+                    products.append(product)
+            if len(products) > limit:
+                return products[:limit], self.listing_key(products[limit - 1])
+            return products, None
+
+    def listing_ids(self, category=None):
+        """Ids of all products (or one category's), oldest first in listing order"""
+        with self._lock:
+            self._refresh()
+            name = ("new",) if category is None else ("new", "category", category)
+            return [key[1] for key in self._sorted.get(name, ())]
+
+    def search(self, query, limit=None):
+        """Products matching a free-text query, best BM25 match first"""
+        with self._lock:
+            self._refresh()
+            return [self._records[i] for i, _ in self._search.search(query, limit)]
+
+
+class SellerStore(RecordStore):
+    """Seller profiles keyed by phone number"""
+
+    collection = "sellers"
+    key_field = "phone"
+
+
+class ReelStore(RecordStore):
+    """Video reels keyed by id"""
+
+    collection = "reels"
+
+
+class Compactor:
+    """Background thread that folds mutation logs into fresh snapshots.
+
+    Runs every ``interval`` seconds, or sooner when a store's log passes its
+    ``compact_after`` threshold.
+    """
+
+    def __init__(self, interval=60):
+        self.interval = interval
+        self.stores = []
+        self._wake = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def watch(self, store):
+        self.stores.append(store)
+        return store
+
+    def notify(self, store):
+        """Called after every write; starts the thread lazily and wakes it early for long logs"""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="catalog-compactor", daemon=True)
+                self._thread.start()
+        if store.needs_compaction():
+            self._wake.set()
+
+    def compact_all(self):
+        for store in self.stores:
+            try:
+                store.compact()
+            except Exception as e:
+                print(f"❌ Compaction failed for {store.path}: {e}")
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.compact_all()
+
+
+class GroupCommitWriter:
+    """Single writer thread that turns concurrent catalog mutations into group commits.
+
+    Callers submit a ``mutate(store) -> (entries, result)`` function and block
+    until it is durable. Everything that arrives within ``window`` seconds of
+    the first queued mutation is applied against a freshly refreshed view under
+    the catalog lock and written with one append + fsync per touched log, so an
+    upload burst costs a handful of fsyncs and no read-modify-write is lost.
+    """
+
+    def __init__(self, window=0.01):
+        self.window = window
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, store, mutate):
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("catalog mutations cannot be submitted from the writer thread")
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="catalog-writer", daemon=True)
+                self._thread.start()
+        future = Future()
+        self._queue.put((store, mutate, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            by_lock = {}
+            for item in batch:
+                by_lock.setdefault(item[0].lock, []).append(item)
+            for lock, items in by_lock.items():
+                self._commit(lock, items)
+
+    def _commit(self, lock, items):
+        pending = {}
+        done = []
+        try:
+            with lock:
+                for store, mutate, future in items:
+                    with store._lock:
+                        if store not in pending:
+                            store._refresh()
+                            pending[store] = []
+                        try:
+                            entries, result = mutate(store)
+                        except Exception as e:
+                            future.set_exception(e)
+                            continue
+                        # Apply right away so later mutations in the batch see this one
+                        for entry in entries:
+                            store._apply(entry)
+                        pending[store].extend(entries)
+                        done.append((future, result))
+
+                for store, entries in pending.items():
+                    if entries:
+                        with store._lock:
+                            store._write_log(entries)
+        except Exception as e:
+            print(f"❌ Catalog commit failed: {e}")
+            for store in pending:
+                # Memory may be ahead of disk now; rebuild from the files on next read
+                store._signature = None
+            for future, _ in done:
+                future.set_exception(e)
+            return
+
+        for future, result in done:
+            future.set_result(result)
+        for store, entries in pending.items():
+            if entries:
+                compactor.notify(store)
+
+
+compactor = Compactor()
+writer = GroupCommitWriter()
@@ -8,7 +8,6 @@ from twilio.twiml.messaging_response import MessagingResponse
 from twilio.rest import Client
 import requests
 from requests.auth import HTTPBasicAuth
-import json
 import traceback
 import logging
 import asyncio
@@ -39,7 +38,7 @@ except Exception as e:
     def remove_bg_and_upload(path): return [f"https://storage.googleapis.com/craftlink-images/fallback{i}.jpg" for i in range(1,5)]
 
 try:
-    from deploy_shop import build_and_host, update_products_json
+    from deploy_shop import build_and_host, update_products_json, update_product_fields, get_product_by_id, get_products_by_seller, list_products
     DEPLOY_AVAILABLE = True
     logger.info("Deploy shop loaded successfully")
 except Exception as e:
@@ -47,6 +46,10 @@ except Exception as e:
     DEPLOY_AVAILABLE = False
     def build_and_host(product_id, description, images): return f"https://neethi-saarathi-ids.web.app/product/{product_id}.html"
     def update_products_json(data): pass
+    def update_product_fields(product_id, changes): return False
+    def get_product_by_id(product_id): return None
+    def get_products_by_seller(phone): return []
+    def list_products(limit=48, cursor=None, category=None, seller_phone=None, search=None, fields=None): return {"products": [], "next_cursor": None}
 
 # Set Google credentials
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "key.json"
@@ -84,46 +87,15 @@ def save_image(content: bytes, filename: str) -> str:
 def get_product(product_id: str):
     """Get product data from products.json"""
     try:
-        products_file = "../shop/out/products.json"
-        if os.path.exists(products_file):
-            with open(products_file, "r") as f:
-                data = json.load(f)
-                for product in data.get("products", []):
-                    if product.get("id") == product_id:
-                        return product
-        return None
+        return get_product_by_id(product_id)
     except:
         return None
 
 def update_product(product_id: str, field: str, value: any) -> bool:
     """Update product in products.json"""
     try:
-        products_file = "../shop/out/products.json"
-        
-        # Read existing products or create empty array
-        if os.path.exists(products_file):
-            try:
-                with open(products_file, "r") as f:
-                    data = json.load(f)
-            except json.JSONDecodeError:
-                data = {"products": []}
-        else:
-            data = {"products": []}
-        
-        # Find and update product
-        updated = False
-        for product in data.get("products", []):
-            if product.get("id") == product_id:
-                product[field] = value
-                updated = True
-                break
-        
-        if updated:
-            with open(products_file, "w") as f:
-                json.dump(data, f, indent=2)
-            return True
-        return False
-        
+        # Goes through deploy_shop's locked writer so concurrent bot/API edits don't clobber each other
+        return update_product_fields(product_id, {field: value})
     except Exception as e:
         logger.error(f"Update product error: {e}")
         return False
@@ -186,20 +158,8 @@ def handle_edit_command(phone_number: str, message: str, media_url: str = None)
 def handle_myproducts_command(phone_number: str) -> str:
     """Send user their product list"""
     try:
-        products_file = "../shop/out/products.json"
-        if not os.path.exists(products_file):
-            return "You don't have any products yet. Send a photo to create your first shop!"
-        
-        with open(products_file, "r") as f:
-            data = json.load(f)
-        
-        user_products = []
         user_phone = phone_number.replace("whatsapp:", "")
-        
-        for product in data.get("products", []):
-            # Simple user matching by phone number pattern
-            if user_phone in product.get("id", "") or user_phone in product.get("user_phone", ""):
-                user_products.append(product)
+        user_products = get_products_by_seller(user_phone)
         
         if not user_products:
             return "You don't have any products yet. Send a photo to create your first shop!"
@@ -469,17 +429,16 @@ async def api_create_product(
         raise HTTPException(status_code=500, detail="Error creating product")
 
 @app.get("/api/products")
-async def get_products():
+async def get_products(limit: int = 48, cursor: str = None, category: str = None,
+                       artisan: str = None, search: str = None, fields: str = None):
     try:
-        products_file = "../shop/out/products.json"
-        if os.path.exists(products_file):
-            with open(products_file, "r") as f:
-                data = json.load(f)
-            return data
-        return {"products": []}
+        # Paginated, newest first; ?fields=id,title,price,image trims each product
+        return list_products(limit, cursor, category, artisan, search, fields)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         logger.error(f"Error loading products: {e}")
-        return {"products": []}
+        return {"products": [], "next_cursor": None}
 
 @app.get("/api/test")
 async def test_endpoint():
@@ -1,29 +1,24 @@
 #!/usr/bin/env python3
 import os
 import subprocess
-from deploy_shop import create_shop_index, deploy_to_firebase, get_all_products
+from deploy_shop import PUBLISH_TARGET, publish_site, get_all_products
+from rebuild import rebuild
 
 def deploy_all():
     """Deploy everything to Firebase"""
     print("🚀 Starting complete deployment...")
     
-    # 0. Initialize JSON files first
-    print("📝 Initializing JSON files...")
-    from deploy_shop import initialize_json_files
-    initialize_json_files()
-    
-    # 1. Create shop index
-    print("📋 Creating shop index...")
-    create_shop_index()
+    # 1. Rebuild every page in parallel (also writes the JSON snapshots)
+    print("📋 Rebuilding shop pages...")
+    stats = rebuild()
     
     # 2. Verify what files are created
-    print("🔍 Verifying created files...")
-    from deploy_shop import verify_deployment_files
-    verify_deployment_files()
+    if stats["errors"]:
+        print(f"⚠️ {len(stats['errors'])} pages failed to build; see build-manifest.json")
     
-    # 3. Deploy to Firebase
-    print("☁️  Deploying to Firebase...")
-    success = deploy_to_firebase()
+    # 3. Publish (Firebase unless PUBLISH_TARGET says otherwise)
+    print(f"☁️  Publishing to {PUBLISH_TARGET}...")
+    success = publish_site()
     
     if success:
         print("✅ Deployment completed successfully!")
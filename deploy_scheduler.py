@@ -0,0 +1,148 @@
+"""Debounced, coalescing deploys.
+
+Uploads and edits used to run a full ``firebase deploy`` each, inline, so a
+burst of photos meant a burst of overlapping deploys. Now they call
+``request()``, which only marks the site dirty. A background thread waits
+until no new request has arrived for ``quiet`` seconds (but never more than
+``max_delay`` seconds after the first one), then runs a single deploy for
+everything that changed meanwhile. At most one deploy runs at a time;
+requests made during a deploy are picked up by the next one. A request can
+pass ``on_live``, called once a deploy including it has succeeded (e.g. to
+tell a seller their edit is online).
+"""
+import threading
+import time
+from datetime import datetime
+
+
+class DeployScheduler:
+    """Background thread that coalesces deploy requests into one deploy at a time"""
+
+    def __init__(self, deploy, quiet=20, max_delay=120, retry_delay=60):
+        self.deploy = deploy
+        self.quiet = quiet
+        self.max_delay = max_delay
+        self.retry_delay = retry_delay
+        self._cond = threading.Condition()
+        self._thread = None
+        # Requests since the last deploy started: count, first and latest (monotonic)
+        self._requests = 0
+        self._reasons = []
+        self._callbacks = []
+        self._first = None
+        self._latest = None
+        # After a failed deploy, don't try again before this (monotonic)
+        self._not_before = 0
+        # Set by flush(): deploy without waiting for the quiet window
+        self._urgent = False
+        self._deploying = None
+        self._last = None
+        self._deploys = 0
+        self._failures = 0
+
+    def request(self, reason="", on_live=None):
+        """Mark the site dirty; the deploy happens in the background once changes settle"""
+        with self._cond:
+            now = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="deploy-scheduler", daemon=True)
+                self._thread.start()
+            self._requests += 1
+            if reason and len(self._reasons) < 20:
+                self._reasons.append(reason)
+            if on_live is not None:
+                self._callbacks.append(on_live)
+            self._first = self._first or now
+            self._latest = now
+            self._cond.notify()
+
+    def _due(self, now):
+        """Seconds until the pending requests should be deployed (<= 0: now)"""
+        settle = now if self._urgent else min(self._latest + self.quiet, self._first + self.max_delay)
+        return max(settle, self._not_before) - now
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._requests:
+                        wait = self._due(time.monotonic())
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                requests, reasons, callbacks, first = self._requests, self._reasons, self._callbacks, self._first
+                self._requests, self._reasons, self._callbacks = 0, [], []
+                self._first = self._latest = None
+                self._urgent = False
+                self._deploying = {"started_at": datetime.now().isoformat(), "requests": requests}
+
+            print(f"🚀 Deploying {requests} queued changes ({', '.join(reasons) or 'no details'})")
+            start = time.monotonic()
+            try:
+                ok = bool(self.deploy())
+            except Exception as e:
+                print(f"❌ Scheduled deploy failed: {e}")
+                ok = False
+
+            with self._cond:
+                finished = time.monotonic()
+                self._deploying = None
+                self._last = {
+                    "finished_at": datetime.now().isoformat(),
+                    "ok": ok,
+                    "requests": requests,
+                    "seconds": round(finished - start, 3),
+                    # From the first request to the end of its deploy
+                    "latency_seconds": round(finished - first, 3),
+                }
+                if ok:
+                    self._deploys += 1
+                else:
+                    callbacks, self._callbacks = [], callbacks + self._callbacks
+                    # Put the requests back; they go out with the next attempt
+                    self._failures += 1
+                    self._requests += requests
+                    self._reasons = (reasons + self._reasons)[:20]
+                    self._first = min(first, self._first or first)
+                    self._latest = self._latest or finished
+                    self._not_before = finished + self.retry_delay
+
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"❌ Deploy callback failed: {e}")
+
+    def flush(self, timeout=None):
+        """Wait until nothing is queued or deploying (e.g. before shutdown); returns True if idle"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            # Deploy what's queued right away
+            self._urgent = bool(self._requests)
+            self._cond.notify()
+        while True:
+            with self._cond:
+                if not self._requests and self._deploying is None:
+                    return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def state(self):
+        """Pending and last deploy, for /health"""
+        with self._cond:
+            now = time.monotonic()
+            return {
+                "pending_requests": self._requests,
+                "pending_reasons": list(self._reasons),
+                "pending_for_seconds": round(now - self._first, 3) if self._first else None,
+                "next_deploy_in_seconds": round(max(self._due(now), 0), 3) if self._requests else None,
+                "deploying": self._deploying,
+                "last_deploy": self._last,
+                "deploys": self._deploys,
+                "failures": self._failures,
+                "quiet_seconds": self.quiet,
+                "max_delay_seconds": self.max_delay,
+            }
@@ -2,10 +2,103 @@ import subprocess
 import os
 import json
 import uuid
+import base64
+import functools
+import threading
 from datetime import datetime
-
-def build_and_host(product_id: str, description: str, image_urls: list, title: str = None, price: int = None) -> str:
-    """Create HTML product page with enhanced design"""
+from build_manifest import BuildManifest, write_if_changed
+from deploy_scheduler import DeployScheduler
+from hosting_deploy import HostingAuthError, HostingDeployer, HostingError
+from publish_targets import LocalPublisher, Publisher, S3Publisher
+from image_renditions import variant_tags
+from site_compress import precompress
+from catalog_store import ProductStore, SellerStore, ReelStore, compactor
+from site_planner import BuildPlanner
+from site_templates import (CATEGORIES, assets, fragments, render_product_page,
+                            render_product_shell, render_product_document, render_seller_page, render_index,
+                            render_reels_section, render_products_section, render_sellers_section,
+                            render_category_page, render_listing_shard)
+
+# Storage backend for the catalog: "json" (snapshot + append-only log per
+# collection) or "sqlite" (CATALOG_DB). Either way the background compactor
+# keeps out/products.json, sellers.json and reels.json current for the static site.
+CATALOG_BACKEND = os.environ.get("CATALOG_BACKEND", "json")
+CATALOG_DB = os.environ.get("CATALOG_DB", "./catalog.db")
+
+if CATALOG_BACKEND == "sqlite":
+    from catalog_sqlite import SqliteProductStore, SqliteSellerStore, SqliteReelStore
+    product_store = compactor.watch(SqliteProductStore(CATALOG_DB, "./out/products.json"))
+    seller_store = compactor.watch(SqliteSellerStore(CATALOG_DB, "./out/sellers.json"))
+    reel_store = compactor.watch(SqliteReelStore(CATALOG_DB, "./out/reels.json"))
+else:
+    product_store = compactor.watch(ProductStore("./out/products.json"))
+    seller_store = compactor.watch(SellerStore("./out/sellers.json"))
+    reel_store = compactor.watch(ReelStore("./out/reels.json"))
+
+def _implied_pages(key):
+    """Pages that exist because of the record behind a change key"""
+    kind, _, name = key.partition(":")
+    if kind == "product":
+        return [f"product/{name}.html"]
+    if kind in ("seller", "seller-products"):
+        return [f"seller/{name}.html"]
+    if kind == "category" and name in CATEGORIES:
+        return [f"listing/{name}"]
+    return []
+
+# Which pages and index sections were built from which products, sellers and
+# reels; the mutation helpers below mark what they change
+planner = BuildPlanner(_implied_pages)
+
+# Content hashes of everything under out/: identical output isn't rewritten,
+# and deploys only need the files that changed since the last one
+manifest = BuildManifest("./out", "./build-manifest.json")
+
+# One build or publish at a time in this process: the media pool runs several
+# jobs at once, and they share the planner marks, the manifest and the index
+# and listing state below
+build_lock = threading.RLock()
+
+def _serialized(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with build_lock:
+            return fn(*args, **kwargs)
+    return wrapper
+
+# Catalog snapshots published next to the pages
+SNAPSHOT_FILES = ("products.json", "sellers.json", "reels.json")
+
+# How product pages are published: "pages" writes a full HTML page per
+# product; "shell" writes one product-shell.html that every /product/ URL is
+# rewritten to, plus a small product/<id>.json the shell renders from. With
+# PRERENDER_PRODUCTS set, shell mode also keeps full pages in PRERENDER_DIR
+# (outside out/, so never deployed) for a crawler-facing proxy to serve.
+SITE_MODE = os.environ.get("SITE_MODE", "pages")
+PRODUCT_SHELL = "product-shell.html"
+PRERENDER_PRODUCTS = os.environ.get("PRERENDER_PRODUCTS", "").lower() in ("1", "true", "yes")
+PRERENDER_DIR = os.environ.get("PRERENDER_DIR", "./prerender")
+
+def product_output(product_id):
+    """Site path of a product's page, or of its JSON document in shell mode"""
+    return f"product/{product_id}.json" if SITE_MODE == "shell" else f"product/{product_id}.html"
+
+def product_stale_output(product_id):
+    """Site path the other SITE_MODE would have written for a product"""
+    return f"product/{product_id}.html" if SITE_MODE == "shell" else f"product/{product_id}.json"
+
+def _seller_products_key(product):
+    seller = product and (product.get("artisan_phone") or product.get("user_phone"))
+    return f"seller-products:{seller}" if seller else None
+
+def _category_key(product):
+    category = product and product.get("category")
+    return f"category:{category}" if category else None
+
+@_serialized
+def build_and_host(product_id: str, description: str, image_urls: list, title: str = None, price: int = None,
+                   save: bool = True) -> str:
+    """Create HTML product page with enhanced design (save=False: the caller saves the manifest once per build)"""
     try:
         # Use current directory for Railway compatibility
         shop_dir = "./out"
@@ -15,16 +108,8 @@ def build_and_host(product_id: str, description: str, image_urls: list, title: s
         os.makedirs(product_dir, exist_ok=True)
         
         # Load product data to get all details
-        products_file = f"{shop_dir}/products.json"
-        product_data = None
-        
-        if os.path.exists(products_file):
-            with open(products_file, "r") as f:
-                data = json.load(f)
-                for product in data.get("products", []):
-                    if product.get("id") == product_id:
-                        product_data = product
-                        break
+        started = planner.tick()
+        product_data = product_store.get(product_id)
         
         # Use fallback if product data not found
         if not product_data:
@@ -39,182 +124,25 @@ def build_and_host(product_id: str, description: str, image_urls: list, title: s
                 "artisan_region": "India"
             }
         
-        # Create enhanced HTML product page
-        html_content = f'''<!DOCTYPE html>
-<html lang="hi">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{product_data['title']} - KalaaSaarathi</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700&family=Hind:wght@400;500;600&display=swap');
-        
-        body {{
-            font-family: 'Poppins', sans-serif;
-            background: linear-gradient(135deg, #fff5e6 0%, #ffecc7 100%);
-        }}
-        
-        .hindi-font {{
-            font-family: 'Hind', 'Noto Sans Devanagari', sans-serif;
-        }}
-        
-        .artisan-pattern {{
-            background-image: url("data:image/svg+xml,%3Csvg width='100' height='100' viewBox='0 0 100 100' xmlns='http://www.w3.org/2000/svg'%3E%3Cpath d='M50 50L100 0H0L50 50Z' fill='%23d97706' fill-opacity='0.05'/%3E%3C/svg%3E");
-        }}
-        
-        .product-image {{
-            transition: transform 0.3s ease;
-        }}
-        
-        .product-image:hover {{
-            transform: scale(1.05);
-        }}
-        
-        .image-gallery {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 1rem;
-            margin-bottom: 2rem;
-        }}
-        
-        .main-image {{
-            grid-column: 1 / -1;
-            height: 300px;
-            object-fit: cover;
-            border-radius: 12px;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        }}
-        
-        .thumbnail {{
-            height: 100px;
-            object-fit: cover;
-            border-radius: 8px;
-            cursor: pointer;
-            transition: opacity 0.3s ease;
-        }}
-        
-        .thumbnail:hover {{
-            opacity: 0.8;
-        }}
-    </style>
-</head>
-<body class="min-h-screen artisan-pattern">
-    <div class="container mx-auto px-4 py-8 max-w-6xl">
-        <!-- Header -->
-        <div class="flex items-center justify-between mb-8">
-            <a href="/" class="text-amber-600 hover:text-amber-700 font-semibold flex items-center">
-                <i class="fas fa-arrow-left mr-2"></i> Back to KalaaSaarathi
-            </a>
-            <div class="flex items-center space-x-2">
-                <div class="w-8 h-8 bg-amber-500 rounded-full flex items-center justify-center">
-                    <i class="fas fa-hands text-white text-sm"></i>
-                </div>
-                <span class="text-amber-800 font-semibold">KalaaSaarathi</span>
-            </div>
-        </div>
-
-        <!-- Product Content -->
-        <div class="bg-white rounded-2xl shadow-xl overflow-hidden">
-            <div class="grid grid-cols-1 lg:grid-cols-2">
-                <!-- Images -->
-                <div class="p-6">
-                    <div class="image-gallery">
-                        <img src="{image_urls[0]}" id="mainImage" class="main-image product-image" alt="{product_data['title']}">
-                        <div class="grid grid-cols-4 gap-2">
-                            {"".join([f'<img src="{url}" class="thumbnail" onclick="changeImage(this.src)" alt="Product image {i+1}">' for i, url in enumerate(image_urls[:4])])}
-                        </div>
-                    </div>
-                </div>
-
-                <!-- Details -->
-                <div class="p-8 bg-amber-50">
-                    <h1 class="text-3xl font-bold text-amber-800 mb-4">{product_data['title']}</h1>
-                    
-                    <div class="bg-white p-6 rounded-lg mb-6">
-                        <div class="flex items-center mb-4">
-                            <div class="flex items-center text-amber-400">
-                                {"".join(['<i class="fas fa-star"></i>' for _ in range(5)])}
-                                <span class="ml-2 text-gray-600">({product_data.get('reviews_count', 12)} reviews)</span>
-                            </div>
-                        </div>
-                        
-                        <p class="text-gray-700 text-lg leading-relaxed mb-4">{product_data['description']}</p>
-                        
-                        <div class="grid grid-cols-2 gap-4 mb-4">
-                            <div>
-                                <span class="text-sm text-gray-500">Category</span>
-                                <p class="font-semibold">{product_data.get('category', 'Handmade').title()}</p>
-                            </div>
-                            <div>
-                                <span class="text-sm text-gray-500">Material</span>
-                                <p class="font-semibold">{product_data.get('material', 'Natural Materials')}</p>
-                            </div>
-                        </div>
-                        
-                        <div class="flex items-center justify-between mt-6">
-                            <div>
-                                <span class="text-3xl font-bold text-amber-600">₹{product_data['price']}</span>
-                                {f'<span class="ml-2 text-sm text-gray-500 line-through">₹{product_data.get("original_price", product_data["price"] + 100)}</span>' if product_data.get('original_price') else ''}
-                            </div>
-                            <span class="px-3 py-1 bg-amber-100 text-amber-700 rounded-full text-sm">Handmade</span>
-                        </div>
-                    </div>
-
-                    <!-- Artisan Info -->
-                    <div class="bg-amber-100 p-4 rounded-lg mb-6">
-                        <h3 class="text-lg font-semibold text-amber-800 mb-2">Crafted by Artisan</h3>
-                        <p class="text-amber-700">{product_data.get('artisan_name', 'Local Artisan')} from {product_data.get('artisan_region', 'India')}</p>
-                        <p class="text-sm text-amber-600 mt-1">{product_data.get('orders_completed', 25)} orders completed • {product_data.get('rating', 4.8)}/5 rating</p>
-                    </div>
-
-                    <!-- Action Box -->
-                    <div class="bg-green-50 p-6 rounded-lg">
-                        <h3 class="text-lg font-semibold text-green-800 mb-3">How to Purchase</h3>
-                        <p class="text-green-700 mb-4">Contact us directly on WhatsApp to own this beautiful handmade piece</p>
-                        <a href="https://wa.me/14155238886?text=I%20want%20to%20buy%20{product_data['id']}" 
-                        class="bg-green-600 hover:bg-green-700 text-white px-6 py-3 rounded-lg font-semibold inline-flex items-center space-x-2 transition-colors w-full justify-center">
-                            <i class="fab fa-whatsapp text-xl"></i>
-                            <span>Buy on WhatsApp</span>
-                        </a>
-                    </div>
-
-                    <!-- Artisan Support -->
-                    <div class="mt-6 bg-white p-4 rounded-lg">
-                        <div class="flex items-center space-x-3">
-                            <div class="w-10 h-10 bg-amber-100 rounded-full flex items-center justify-center">
-                                <i class="fas fa-hands-helping text-amber-600"></i>
-                            </div>
-                            <div>
-                                <p class="text-sm text-amber-700">90% of proceeds go directly to the artisan</p>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-
-        <!-- Product ID -->
-        <div class="text-center mt-8">
-            <p class="text-sm text-amber-600">Product ID: {product_id}</p>
-        </div>
-    </div>
-
-    <script>
-        function changeImage(src) {{
-            document.getElementById('mainImage').src = src;
-        }}
-    </script>
-</body>
-</html>'''
-        
-        # Save HTML file
-        html_file = f"{product_dir}/{product_id}.html"
-        with open(html_file, "w", encoding="utf-8") as f:
-            f.write(html_content)
+        if SITE_MODE == "shell":
+            content = render_product_document(product_data)
+            if PRERENDER_PRODUCTS:
+                write_if_changed(f"{PRERENDER_DIR}/product/{product_id}.html",
+                                 render_product_page(product_data, image_urls))
+        else:
+            content = render_product_page(product_data, image_urls)
         
-        print(f"✅ Created HTML: {html_file}")
+        # Save the page or JSON document (skipped when unchanged)
+        output = product_output(product_id)
+        if manifest.write(output, content):
+            print(f"✅ Created {output}")
+        else:
+            print(f"✅ Unchanged {output}")
+        # Left over from a build in the other SITE_MODE
+        manifest.remove(product_stale_output(product_id))
+        planner.record(f"product/{product_id}.html", [f"product:{product_id}"], started)
+        if save:
+            manifest.save()
         
         # Return URL with .html extension for consistency
         return f"https://neethi-saarathi-ids.web.app/product/{product_id}.html"
@@ -226,96 +154,167 @@ def build_and_host(product_id: str, description: str, image_urls: list, title: s
 def update_products_json(product_data):
     """Update the public products.json file"""
     try:
-        shop_dir = "./out"
-        products_file = f"{shop_dir}/products.json"
-
-        # Ensure directory exists
-        os.makedirs(shop_dir, exist_ok=True)
-
-        # Read existing products or create empty array
-        if os.path.exists(products_file):
-            try:
-                with open(products_file, "r") as f:
-                    data = json.load(f)
-            except json.JSONDecodeError:
-                data = {"products": []}
-        else:
-            data = {"products": []}
-
+        # Note which responsive renditions its images have
+        if "images" in product_data and "image_variants" not in product_data:
+            product_data = {**product_data, "image_variants": variant_tags(product_data["images"])}
         # Add new product (or replace if exists)
-        data["products"] = [p for p in data["products"] if p.get('id') != product_data['id']]
-        data["products"].append(product_data)
-
-        # Keep only recent 50 products
-        data["products"] = data["products"][-50:]
-
-        # Write back
-        with open(products_file, "w") as f:
-            json.dump(data, f, indent=2)
-
-        print(f"✅ Updated products.json with {len(data['products'])} products")
+        previous = product_store.get(product_data["id"])
+        count = product_store.upsert(product_data)
+        # An upsert moves the product to the newest position
+        planner.mark(f"product:{product_data['id']}", "products:latest",
+                     _seller_products_key(product_data), _seller_products_key(previous),
+                     "category:all", _category_key(product_data), _category_key(previous))
+        print(f"✅ Updated products.json with {count} products")
 
     except Exception as e:
         print(f"❌ Failed to update products.json: {e}")
-        # Create basic products.json if it doesn't exist
-        with open(products_file, "w") as f:
-            json.dump({"products": [product_data]}, f, indent=2)
+
+def update_product_fields(product_id, changes):
+    """Update fields of an existing product; returns False if it doesn't exist"""
+    try:
+        if "images" in changes and "image_variants" not in changes:
+            changes = {**changes, "image_variants": variant_tags(changes["images"])}
+        previous = product_store.get(product_id)
+        updated = product_store.update(product_id, changes)
+        if updated is None:
+            return False
+        planner.mark(f"product:{product_id}")
+        if _seller_products_key(updated) != _seller_products_key(previous):
+            # Moved to another seller: both sellers' pages and the artisan counts change
+            planner.mark("products:latest", _seller_products_key(previous), _seller_products_key(updated))
+        if (updated.get("category") != previous.get("category")
+                or updated.get("created_at") != previous.get("created_at")):
+            # Moves the product between listings or within one
+            planner.mark("category:all", _category_key(previous), _category_key(updated))
+        return True
+    except Exception as e:
+        print(f"❌ Failed to update product {product_id}: {e}")
+        return False
 
 def get_all_products():
     """Get all products from products.json"""
     try:
-        shop_dir = "./out"
-        products_file = f"{shop_dir}/products.json"
-        
-        if os.path.exists(products_file):
-            with open(products_file, "r") as f:
-                data = json.load(f)
-                return data.get("products", [])
-        return []
+        return product_store.all()
     except:
         return []
 
 def get_product_by_id(product_id):
     """Get a specific product by ID"""
-    products = get_all_products()
-    for product in products:
-        if product.get("id") == product_id:
-            return product
-    return None
+    return product_store.get(product_id)
+
+def get_products_by_seller(phone):
+    """Get all products listed by a seller phone number"""
+    return product_store.by_seller(phone)
+
+def get_products_by_category(category):
+    """Get all products in a category"""
+    return product_store.by_category(category)
+
+def search_products(query, limit=None):
+    """Full-text product search (English/Hindi/hashtags, typo tolerant), best match first"""
+    return product_store.search(query, limit)
+
+# Listing pages are bounded so payload size and serialization time per
+# request stay flat however big the catalog gets
+LISTING_PAGE_SIZE = 48
+MAX_LISTING_PAGE_SIZE = 200
+# What a product card needs; "image" is the first of the product's images
+CARD_FIELDS = ("id", "title", "price", "image")
+
+def encode_cursor(position):
+    """Opaque, URL-safe cursor for a listing position"""
+    raw = json.dumps(position, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for a cursor we didn't issue"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+
+def parse_fields(fields):
+    """'id,title,image' (or a list, or 'card') -> tuple of field names; None means every field"""
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        if fields == "card":
+            return CARD_FIELDS
+        fields = fields.split(",")
+    return tuple(field.strip() for field in fields if field.strip()) or None
+
+def project_product(product, fields):
+    """Copy of a product with only the requested fields"""
+    if fields is None:
+        return product
+    projected = {}
+    for field in fields:
+        if field == "image":
+            images = product.get("images") or []
+            projected["image"] = images[0] if images else None
+        elif field in product:
+            projected[field] = product[field]
+    return projected
+
+def list_products(limit=LISTING_PAGE_SIZE, cursor=None, category=None, seller_phone=None, search=None, fields=None):
+    """One page of products plus the cursor for the next page (None on the last page).
+
+    Without a search the order is newest first (created_at, then id) and the
+    cursor is the last product's position, so pages stay stable while products
+    are being added. Search results come in rank order and the cursor is an
+    offset into them. Raises ValueError for a malformed cursor.
+    """
+    limit = max(1, min(int(limit), MAX_LISTING_PAGE_SIZE))
+    fields = parse_fields(fields)
+    position = decode_cursor(cursor) if cursor else None
+
+    if search:
+        offset = position or 0
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError("invalid cursor")
+        if category or seller_phone:
+            ranked = [p for p in product_store.search(search)
+                      if (not category or p.get("category") == category)
+                      and (not seller_phone or (p.get("artisan_phone") or p.get("user_phone")) == seller_phone)]
+        else:
+            ranked = product_store.search(search, offset + limit + 1)
+        products = ranked[offset:offset + limit]
+        next_position = offset + limit if len(ranked) > offset + limit else None
+    else:
+        if position is not None and not (isinstance(position, list) and len(position) == 2
+                                         and all(isinstance(part, str) for part in position)):
+            raise ValueError("invalid cursor")
+        products, next_position = product_store.page(limit, position, seller_phone or None, category or None)
+        if next_position is not None:
+            next_position = list(next_position)
+
+    return {
+        "products": [project_product(product, fields) for product in products],
+        "next_cursor": encode_cursor(next_position) if next_position is not None else None,
+    }
+
+# Length of the short ids the bot shows sellers
+SHORT_ID_LENGTH = 8
+
+def find_product_ids(id_prefix, seller_phone=None, limit=2):
+    """Product ids starting with a short id like 'abc12345', optionally only the seller's own.
+
+    Returns at most ``limit`` ids; more than one means the prefix is ambiguous.
+    Without a seller the prefix must be at least SHORT_ID_LENGTH characters,
+    so a guessed one- or two-character prefix can't reach anyone's product.
+    """
+    prefix = id_prefix.strip().lower()
+    if seller_phone:
+        seller_phone = seller_phone.replace("whatsapp:", "").strip()
+    elif len(prefix) < SHORT_ID_LENGTH:
+        return []
+    return product_store.find_by_prefix(prefix, seller_phone or None, limit)
 
 def update_seller_profile(phone, profile_data):
     """Update seller profile"""
     try:
-        shop_dir = "./out"
-        sellers_file = f"{shop_dir}/sellers.json"
-
-        # Ensure directory exists
-        os.makedirs(shop_dir, exist_ok=True)
-
-        # Read existing sellers or create empty array
-        if os.path.exists(sellers_file):
-            try:
-                with open(sellers_file, "r") as f:
-                    data = json.load(f)
-            except json.JSONDecodeError:
-                data = {"sellers": []}
-        else:
-            data = {"sellers": []}
-
         # Add or update seller profile
-        updated = False
-        for i, seller in enumerate(data["sellers"]):
-            if seller.get("phone") == phone:
-                data["sellers"][i] = {**seller, **profile_data}
-                updated = True
-                break
-        
-        if not updated:
-            data["sellers"].append(profile_data)
-
-        # Write back
-        with open(sellers_file, "w") as f:
-            json.dump(data, f, indent=2)
+        if not seller_store.update(phone, profile_data):
+            seller_store.upsert({**profile_data, "phone": phone})
+        planner.mark(f"seller:{phone}")
 
         print(f"✅ Updated sellers.json for {phone}")
 
@@ -325,47 +324,16 @@ def update_seller_profile(phone, profile_data):
 def get_seller_profile(phone):
     """Get seller profile by phone number"""
     try:
-        shop_dir = "./out"
-        sellers_file = f"{shop_dir}/sellers.json"
-        
-        if os.path.exists(sellers_file):
-            with open(sellers_file, "r") as f:
-                data = json.load(f)
-                for seller in data.get("sellers", []):
-                    if seller.get("phone") == phone:
-                        return seller
-        return None
+        return seller_store.get(phone)
     except:
         return None
 
 def add_reel(reel_data):
     """Add a new reel"""
     try:
-        shop_dir = "./out"
-        reels_file = f"{shop_dir}/reels.json"
-
-        # Ensure directory exists
-        os.makedirs(shop_dir, exist_ok=True)
-
-        # Read existing reels or create empty array
-        if os.path.exists(reels_file):
-            try:
-                with open(reels_file, "r") as f:
-                    data = json.load(f)
-            except json.JSONDecodeError:
-                data = {"reels": []}
-        else:
-            data = {"reels": []}
-
         # Add new reel
-        data["reels"].append(reel_data)
-
-        # Keep only recent 100 reels
-        data["reels"] = data["reels"][-100:]
-
-        # Write back
-        with open(reels_file, "w") as f:
-            json.dump(data, f, indent=2)
+        reel_store.upsert(reel_data)
+        planner.mark(f"reel:{reel_data.get('id')}", "reels:latest")
 
         print(f"✅ Added reel to reels.json")
 
@@ -375,506 +343,397 @@ def add_reel(reel_data):
 def get_all_reels():
     """Get all reels"""
     try:
-        shop_dir = "./out"
-        reels_file = f"{shop_dir}/reels.json"
-        
-        if os.path.exists(reels_file):
-            with open(reels_file, "r") as f:
-                data = json.load(f)
-                return data.get("reels", [])
-        return []
+        return reel_store.all()
     except:
         return []
 
+def catalog_version():
+    """Products version; changes on every product mutation, from any process"""
+    return product_store.version()
+
+def compact_catalog():
+    """Fold pending catalog mutations into products/sellers/reels.json snapshots"""
+    compactor.compact_all()
+    for name in SNAPSHOT_FILES:
+        manifest.track(name)
+
+def build_seller_page(seller):
+    """Render one seller's page and record what it was built from"""
+    seller_phone = seller.get("phone")
+    if not seller_phone:
+        return False
+    
+    # Get seller's products from the seller index (no per-seller catalog scan)
+    started = planner.tick()
+    seller_products = get_products_by_seller(seller_phone)[:9]
+    html_content = render_seller_page(seller, seller_products)
+    
+    # Save seller page (skipped when unchanged)
+    manifest.write(f"seller/{seller_phone}.html", html_content)
+    
+    planner.record(f"seller/{seller_phone}.html",
+                   [f"seller:{seller_phone}", f"seller-products:{seller_phone}",
+                    *(f"product:{product['id']}" for product in seller_products)], started)
+    return True
+
 def create_seller_pages():
     """Create HTML pages for each seller"""
     try:
-        shop_dir = "./out"
-        sellers_file = f"{shop_dir}/sellers.json"
-        products_file = f"{shop_dir}/products.json"
-        
-        if not os.path.exists(sellers_file):
-            return
-        
-        with open(sellers_file, "r") as f:
-            sellers = json.load(f).get("sellers", [])
-        
-        with open(products_file, "r") as f:
-            all_products = json.load(f).get("products", [])
-        
-        for seller in sellers:
-            seller_phone = seller.get("phone")
-            if not seller_phone:
-                continue
-                
-            # Get seller's products
-            seller_products = [p for p in all_products if p.get("artisan_phone") == seller_phone]
-            
-            # Create seller page HTML
-            html_content = f'''<!DOCTYPE html>
-<html lang="hi">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{seller.get('name', 'Artisan')} - KalaaSaarathi</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700&family=Hind:wght@400;500;600&display=swap');
-        
-        body {{
-            font-family: 'Poppins', sans-serif;
-            background: linear-gradient(135deg, #fff5e6 0%, #ffecc7 100%);
-        }}
-    </style>
-</head>
-<body class="min-h-screen">
-    <div class="container mx-auto px-4 py-8">
-        <a href="/" class="text-amber-600 hover:text-amber-700 font-semibold flex items-center mb-6">
-            <i class="fas fa-arrow-left mr-2"></i> Back to KalaaSaarathi
-        </a>
-        
-        <div class="bg-white rounded-2xl shadow-xl p-6 mb-6">
-            <div class="flex items-center space-x-6">
-                <img src="{seller.get('profile_image', 'https://storage.googleapis.com/craftlink-images/fallback1.jpg')}" 
-                     alt="{seller.get('name')}" class="w-32 h-32 rounded-full object-cover border-4 border-amber-100">
-                <div class="flex-1">
-                    <h1 class="text-3xl font-bold text-amber-800 mb-2">{seller.get('name', 'Artisan')}</h1>
-                    <p class="text-amber-600 text-lg mb-3">{seller.get('region', 'India')}</p>
-                    <p class="text-gray-700 mb-4">{seller.get('bio', 'Talented artisan creating beautiful handmade crafts.')}</p>
-                    <div class="flex flex-wrap gap-2">
-                        {''.join([f'<span class="inline-block bg-amber-100 text-amber-700 px-3 py-1 rounded-full text-sm">{skill}</span>' for skill in seller.get('skills', [])])}
-                    </div>
-                </div>
-            </div>
-        </div>
-
-        <h2 class="text-2xl font-bold text-amber-800 mb-6">Products by this Artisan</h2>
-        
-        <div class="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6 mb-8">
-'''
-
-            # Add seller's products
-            for product in seller_products[:9]:
-                html_content += f'''
-            <div class="bg-white rounded-xl shadow-md overflow-hidden product-card" data-category="{product.get('category', 'handmade')}">
-                <img src="{product['images'][0]}" alt="{product['title']}" class="w-full h-48 object-cover">
-                <div class="p-4">
-                    <h3 class="font-semibold text-lg mb-2">{product['title'][:40]}{'...' if len(product['title']) > 40 else ''}</h3>
-                    <p class="text-gray-600 text-sm mb-3">{product['description'][:70]}{'...' if len(product['description']) > 70 else ''}</p>
-                    <div class="flex items-center justify-between">
-                        <span class="text-amber-600 font-bold">₹{product['price']}</span>
-                        <a href="/product/{product['id']}.html" class="text-amber-500 hover:text-amber-600">View →</a>
-                    </div>
-                </div>
-            </div>
-'''
-
-            html_content += '''
-        </div>
-        
-        <div class="text-center">
-            <a href="/" class="inline-block bg-amber-500 text-white px-6 py-2 rounded-lg font-semibold">
-                <i class="fas fa-arrow-left mr-2"></i>Back to Home
-            </a>
-        </div>
-    </div>
-</body>
-</html>'''
-            
-            # Save seller page
-            seller_dir = f"{shop_dir}/seller"
-            os.makedirs(seller_dir, exist_ok=True)
-            with open(f"{seller_dir}/{seller_phone}.html", "w", encoding="utf-8") as f:
-                f.write(html_content)
+        for seller in seller_store.all():
+            build_seller_page(seller)
         
         print("✅ Created seller profile pages")
         
     except Exception as e:
         print(f"❌ Error creating seller pages: {e}")
 
-def deploy_to_firebase():
-    """Deploy to Firebase Hosting with proper file handling"""
+# Cache-Control for Firebase Hosting. Pages, listings and snapshots change in
+# place, so browsers revalidate them (cheap: Hosting answers with ETags).
+# Assets are named after their content and never change. Later matches
+# override earlier ones.
+HOSTING_HEADERS = [
+    {"source": "**", "headers": [{"key": "Cache-Control", "value": "public, max-age=0, must-revalidate"}]},
+    {"source": "/assets/**", "headers": [{"key": "Cache-Control", "value": "public, max-age=31536000, immutable"}]},
+]
+# Hosting compresses by itself; the precompressed siblings are for other hosts
+HOSTING_IGNORE = ["firebase.json", "**/.*", "**/node_modules/**", "**/*.gz", "**/*.br"]
+
+# "api" releases through the Hosting REST API, uploading only files Hosting
+# doesn't have yet; "cli" runs firebase deploy. Without Google credentials
+# the API client falls back to the CLI.
+HOSTING_DEPLOY = os.environ.get("HOSTING_DEPLOY", "api")
+hosting_deployer = HostingDeployer(state_path="./hosting-deploy.json")
+
+def update_firebase_config(path="firebase.json"):
+    """Merge our cache headers and ignore rules into firebase.json, keeping everything else; returns its hosting section"""
     try:
-        print("🚀 Deploying to Firebase...")
-        
-        # Ensure firebase.json exists with correct configuration
-        firebase_config = {
-            "hosting": {
-                "public": "out",
-                "ignore": [
-                    "firebase.json",
-                    "**/.*",
-                    "**/node_modules/**"
-                ],
-                "rewrites": [
-                    {
-                        "source": "**",
-                        "destination": "/index.html"
-                    }
-                ],
-                "cleanUrls": false,
-                "trailingSlash": false
-            }
-        }
-        
-        # Write/update firebase.json
-        with open("firebase.json", "w") as f:
-            json.dump(firebase_config, f, indent=2)
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        config = {}
+    
+    hosting = config.setdefault("hosting", {})
+    before = json.dumps(config, sort_keys=True)
+    hosting.setdefault("public", "out")
+    hosting.setdefault("rewrites", [{"source": "**", "destination": "/index.html"}])
+    # Product URLs without a page of their own go to the shell in shell mode
+    product_page = f"/{PRODUCT_SHELL}" if SITE_MODE == "shell" else "/index.html"
+    rewrites = [rule for rule in hosting["rewrites"] if rule.get("source") != "/product/**"]
+    hosting["rewrites"] = [{"source": "/product/**", "destination": product_page}] + rewrites
+    hosting["ignore"] = hosting.get("ignore", []) + [rule for rule in HOSTING_IGNORE
+                                                     if rule not in hosting.get("ignore", [])]
+    hosting["headers"] = HOSTING_HEADERS
+    if json.dumps(config, sort_keys=True) != before:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+        print(f"✅ Updated {path}")
+    return hosting
+
+def _deploy_with_cli():
+    result = subprocess.run(
+        "firebase deploy --only hosting --non-interactive",
+        shell=True,
+        capture_output=True,
+        text=True,
+        timeout=300
+    )
+    if result.returncode != 0:
+        print(f"❌ Firebase deployment failed: {result.stderr}")
+    return result.returncode == 0
+
+class FirebasePublisher(Publisher):
+    """Firebase Hosting, through the REST API client or the firebase CLI (HOSTING_DEPLOY)"""
+    
+    name = "firebase"
+    
+    def __init__(self):
+        self._last = None
+    
+    def publish(self, manifest, changed):
+        # Cache headers for the hashed assets (the rest of firebase.json is left alone)
+        hosting = update_firebase_config()
         
         # Ensure all directories exist
         os.makedirs("out/product", exist_ok=True)
         os.makedirs("out/seller", exist_ok=True)
         
-        # Deploy to Firebase
-        result = subprocess.run(
-            "firebase deploy --only hosting --non-interactive",
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=300
+        if HOSTING_DEPLOY == "api":
+            try:
+                self._last = hosting_deployer.deploy(manifest, hosting, message=f"{len(changed)} changed files")
+                return True
+            except HostingAuthError as e:
+                print(f"⚠️ No Hosting API credentials ({e}), deploying with the firebase CLI")
+            except (HostingError, OSError) as e:
+                print(f"❌ Firebase deployment failed: {e}")
+                return False
+        try:
+            return _deploy_with_cli()
+        except subprocess.TimeoutExpired:
+            print("❌ Firebase deployment timed out")
+            return False
+    
+    def state(self):
+        return {"mode": HOSTING_DEPLOY, "last_publish": self._last}
+
+# Where builds are published: "firebase" (default), "local" (a versioned
+# directory under PUBLISH_DIR whose "current" symlink nginx serves) or "s3"
+# (any S3-compatible bucket, see S3_* below)
+PUBLISH_TARGET = os.environ.get("PUBLISH_TARGET", "firebase")
+
+def make_publisher(target=PUBLISH_TARGET):
+    """The Publisher for a PUBLISH_TARGET name"""
+    if target == "local":
+        return LocalPublisher(os.environ.get("PUBLISH_DIR", "./site-releases"),
+                              keep=int(os.environ.get("PUBLISH_KEEP", 3)))
+    if target == "s3":
+        missing = [name for name in ("S3_ENDPOINT", "S3_BUCKET", "S3_ACCESS_KEY", "S3_SECRET_KEY")
+                   if not os.environ.get(name)]
+        if missing:
+            raise ValueError(f"PUBLISH_TARGET=s3 needs {', '.join(missing)}")
+        return S3Publisher(
+            os.environ["S3_ENDPOINT"], os.environ["S3_BUCKET"],
+            os.environ["S3_ACCESS_KEY"], os.environ["S3_SECRET_KEY"],
+            region=os.environ.get("S3_REGION", "us-east-1"),
+            prefix=os.environ.get("S3_PREFIX", ""),
         )
-        
-        if result.returncode == 0:
-            print("✅ Firebase deployment successful!")
+    if target == "firebase":
+        return FirebasePublisher()
+    raise ValueError(f"Unknown PUBLISH_TARGET: {target}")
+
+_publisher = None
+
+def get_publisher():
+    """The configured Publisher, built on first use: a bad publish setup fails publishes, not catalog writes"""
+    global _publisher
+    if _publisher is None:
+        _publisher = make_publisher()
+    return _publisher
+
+try:
+    get_publisher()
+except ValueError as e:
+    # Loud at startup, but the catalog (and the bot) keep working; publishes fail until it's fixed
+    print(f"❌ Publishing is not configured: {e}")
+
+@_serialized
+def publish_site(force=False):
+    """Publish the site to the configured target; skipped when no file changed since the last publish"""
+    try:
+        # Make sure the published JSON snapshots include every logged change
+        compact_catalog()
+        manifest.save()
+        
+        changed = manifest.pending()
+        # The hashes going out now; files rewritten during the publish stay pending
+        deployed = manifest.deployable(changed)
+        precompress(manifest, changed)
+        if not changed and manifest.files() and not force:
+            print("✅ Nothing changed since the last deploy")
             return True
-        else:
-            print(f"❌ Firebase deployment failed: {result.stderr}")
-            return False
-            
-    except subprocess.TimeoutExpired:
-        print("❌ Firebase deployment timed out")
-        return False
+        publisher = get_publisher()
+        print(f"🚀 Publishing to {publisher.name} ({len(changed)} changed files)...")
+        
+        published = publisher.publish(manifest, changed)
+        if published:
+            print(f"✅ Published to {publisher.name}!")
+            manifest.mark_deployed(deployed)
+        return published
+        
     except Exception as e:
-        print(f"❌ Firebase deployment error: {e}")
+        print(f"❌ Publish to {PUBLISH_TARGET} failed: {e}")
         return False
 
-def create_shop_index():
-    """Create the main shop index page with all products, sellers, and reels"""
+def deploy_to_firebase(force=False):
+    """Older name for publish_site(); publishes to PUBLISH_TARGET, which is Firebase by default"""
+    return publish_site(force)
+
+# Deploys requested by uploads and edits are coalesced: one deploy once no
+# change has come in for DEPLOY_QUIET_SECONDS, and at most DEPLOY_MAX_DELAY
+# seconds after the first change it includes
+deploy_scheduler = DeployScheduler(
+    publish_site,
+    quiet=float(os.environ.get("DEPLOY_QUIET_SECONDS", 20)),
+    max_delay=float(os.environ.get("DEPLOY_MAX_DELAY", 120)),
+)
+
+def flush_deploys():
+    """At exit of a process that schedules deploys: publish what's still queued instead of dropping it"""
+    if deploy_scheduler.state()["pending_requests"]:
+        print("🚀 Publishing queued changes before exit...")
+    if not deploy_scheduler.flush(timeout=float(os.environ.get("DEPLOY_EXIT_TIMEOUT", 15))):
+        print("⚠️ Exited before queued changes were published; the next publish picks them up")
+
+def schedule_deploy(reason="", on_live=None):
+    """Deploy the site in the background once changes settle; on_live() runs once it's published"""
+    deploy_scheduler.request(reason, on_live)
+
+def deploy_state():
+    """Pending changes, the last scheduled deploy and what the publish target has live"""
+    try:
+        published = get_publisher().state()
+    except ValueError as e:
+        published = {"error": str(e)}
+    return {**deploy_scheduler.state(), "target": PUBLISH_TARGET, "published": published}
+
+def write_site_assets():
+    """Write the generated stylesheet (content-hashed, so unchanged builds write nothing) and, in shell mode, the product shell"""
+    for path, content in assets.files.items():
+        manifest.write(path, content)
+    if SITE_MODE == "shell":
+        manifest.write(PRODUCT_SHELL, render_product_shell())
+    else:
+        manifest.remove(PRODUCT_SHELL)
+
+# Sections of index.html that depend on catalog data; the rest is static
+INDEX_SECTIONS = ("reels", "products", "sellers")
+# Last rendered HTML of each section, for reassembling index.html
+_index_sections = {}
+
+def build_index_section(name):
+    """Re-render one index.html section from the catalog; returns True if its HTML changed"""
+    started = planner.tick()
+    if name == "reels":
+        # Latest 6 reels, oldest of them first
+        reels = reel_store.latest(6)[::-1]
+        html_content = render_reels_section(reels)
+        deps = ["reels:latest", *(f"reel:{reel.get('id')}" for reel in reels)]
+    elif name == "products":
+        # Latest 12 products, oldest of them first
+        products = product_store.latest(12)[::-1]
+        html_content = render_products_section(products)
+        deps = ["products:latest", *(f"product:{product['id']}" for product in products)]
+    else:
+        # First 6 sellers; each card shows the seller's first product
+        summaries = product_store.seller_summaries(6)
+        html_content = render_sellers_section(summaries)
+        deps = ["products:latest", *(f"product:{product['id']}" for _, _, product in summaries)]
+    
+    planner.record(f"index.html#{name}", deps, started)
+    changed = _index_sections.get(name) != html_content
+    _index_sections[name] = html_content
+    return changed
+
+def update_index_page(sections=INDEX_SECTIONS):
+    """Re-render the given index sections; rewrites index.html if any changed and returns their names"""
+    changed = [name for name in sections if build_index_section(name)]
+    
+    # Save index.html (skipped when identical to what's on disk)
+    if changed or not os.path.exists("./out/index.html"):
+        manifest.write("index.html", render_index(_index_sections))
+    return changed
+
+# Products per category listing page and JSON shard. Shards are numbered from
+# the oldest product, so a new product only touches the last one
+LISTING_SHARD_SIZE = 48
+# Product ids of each shard last written, per category
+_listing_layout = {}
+
+def build_category_listing(category, stale=()):
+    """Write the pages and JSON shards of one category listing ("all" for the whole catalog).
+
+    Only shards whose products moved, or whose numbers are in stale (a
+    product on them was edited), are rendered again; returns how many files
+    were written.
+    """
+    started = planner.tick()
+    ids = product_store.listing_ids(None if category == "all" else category)
+    # An empty category still gets an (empty) first page
+    shards = [tuple(ids[i:i + LISTING_SHARD_SIZE]) for i in range(0, len(ids), LISTING_SHARD_SIZE)] or [()]
+    previous = _listing_layout.get(category, [])
+    last = len(shards)
+    
+    written = 0
+    for number, shard in enumerate(shards, 1):
+        # The last page has no "Newer" link, so it changes when a shard is added after it
+        if (number <= len(previous) and previous[number - 1] == shard
+                and (number == last) == (number == len(previous)) and number not in stale):
+            continue
+        products = [product for product in map(product_store.get, reversed(shard)) if product]
+        html_content = render_category_page(category, number, products, newer=number < last)
+        written += manifest.write(f"category/{category}/{number}.html", html_content)
+        written += manifest.write(f"listing/{category}/{number}.json",
+                                  render_listing_shard(category, number, products))
+        if number == last:
+            written += manifest.write(f"category/{category}/index.html", html_content)
+        planner.record(f"listing/{category}/{number}", [f"product:{product_id}" for product_id in shard],
+                       started)
+    
+    _listing_layout[category] = shards
+    planner.record(f"listing/{category}", [f"category:{category}"], started)
+    return written
+
+def update_listing_index():
+    """Write listing/index.json: products and shards per category, for the storefront"""
+    categories = {category: {"products": sum(map(len, shards)), "shards": len(shards)}
+                  for category, shards in _listing_layout.items()}
+    return manifest.write("listing/index.json", json.dumps(
+        {"shard_size": LISTING_SHARD_SIZE, "categories": categories}, separators=(",", ":")))
+
+@_serialized
+def create_shop_index(full=False):
+    """Bring the shop's index, seller and product pages up to date with the catalog.
+
+    The first call in a process (or full=True) renders the index, every
+    seller page and every category listing. Every call re-renders the
+    outputs that depend on
+    products, sellers or reels marked as changed since those outputs were
+    built, so the cost follows the size of the change, not of the catalog.
+    The marks are only cleared once the build got through.
+    """
     try:
-        # Initialize JSON files first
         shop_dir = "./out"
         os.makedirs(shop_dir, exist_ok=True)
         
-        # Initialize products.json if it doesn't exist
-        products_file = f"{shop_dir}/products.json"
-        if not os.path.exists(products_file):
-            with open(products_file, "w") as f:
-                json.dump({"products": []}, f, indent=2)
-        
-        # Initialize sellers.json if it doesn't exist
-        sellers_file = f"{shop_dir}/sellers.json"
-        if not os.path.exists(sellers_file):
-            with open(sellers_file, "w") as f:
-                json.dump({"sellers": []}, f, indent=2)
-        
-        # Initialize reels.json if it doesn't exist
-        reels_file = f"{shop_dir}/reels.json"
-        if not os.path.exists(reels_file):
-            with open(reels_file, "w") as f:
-                json.dump({"reels": []}, f, indent=2)
-        
-        products = get_all_products()
-        reels = get_all_reels()
-        
-        # DEBUG: Print what products were found
-        print(f"📦 Found {len(products)} products for index page")
-        for i, product in enumerate(products[-5:]):
-            print(f"   Product {i+1}: {product.get('title', 'No title')} - ₹{product.get('price', 'N/A')}")
-        
-        # DEBUG: Print what reels were found
-        print(f"🎥 Found {len(reels)} reels for index page")
-        
-        # Create the HTML content
-        html_content = '''<!DOCTYPE html>
-<html lang="hi">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>KalaaSaarathi - Handmade Crafts Marketplace</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700&family=Hind:wght@400;500;600&display=swap');
-        
-        body {
-            font-family: 'Poppins', sans-serif;
-            background: linear-gradient(135deg, #fff5e6 0%, #ffecc7 100%);
-        }
-        
-        .hindi-font {
-            font-family: 'Hind', 'Noto Sans Devanagari', sans-serif;
-        }
-        
-        .artisan-pattern {
-            background-image: url("data:image/svg+xml,%3Csvg width='100' height='100' viewBox='0 0 100 100' xmlns='http://www.w3.org/2000/svg'%3E%3Cpath d='M50 50L100 0H0L50 50Z' fill='%23d97706' fill-opacity='0.05'/%3E%3C/svg%3E");
-        }
-        
-        .product-card {
-            transition: transform 0.3s ease, box-shadow 0.3s ease;
-        }
-        
-        .product-card:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 10px 25px rgba(0, 0, 0, 0.1);
-        }
-        
-        .reel-card {
-            transition: transform 0.3s ease;
-        }
-        
-        .reel-card:hover {
-            transform: scale(1.02);
-        }
-        
-        .seller-card {
-            transition: all 0.3s ease;
-        }
-        
-        .seller-card:hover {
-            transform: translateY(-3px);
-            box-shadow: 0 8px 20px rgba(0, 0, 0, 0.1);
-        }
-    </style>
-</head>
-<body class="min-h-screen artisan-pattern">
-    <div class="container mx-auto px-4 py-8">
-        <!-- Header -->
-        <div class="flex items-center justify-between mb-8">
-            <div class="flex items-center space-x-2">
-                <div class="w-10 h-10 bg-amber-500 rounded-full flex items-center justify-center">
-                    <i class="fas fa-hands text-white"></i>
-                </div>
-                <span class="text-2xl font-bold text-amber-800">KalaaSaarathi</span>
-            </div>
-            <div class="flex items-center space-x-4">
-                <a href="#products" class="text-amber-600 hover:text-amber-700">Products</a>
-                <a href="#sellers" class="text-amber-600 hover:text-amber-700">Artisans</a>
-                <a href="#reels" class="text-amber-600 hover:text-amber-700">Reels</a>
-                <a href="https://wa.me/14155238886" class="bg-green-600 text-white px-4 py-2 rounded-lg">
-                    <i class="fab fa-whatsapp mr-2"></i> WhatsApp Us
-                </a>
-            </div>
-        </div>
-
-        <!-- Hero Section -->
-        <div class="bg-white rounded-2xl shadow-lg p-8 mb-12 text-center">
-            <h1 class="text-4xl font-bold text-amber-800 mb-4">Handmade Crafts Marketplace</h1>
-            <p class="text-gray-600 text-lg mb-6">Discover unique handmade creations from talented artisans across India</p>
-            
-            <!-- Search Bar -->
-            <div class="max-w-md mx-auto mb-6">
-                <div class="relative">
-                    <input type="text" id="searchInput" placeholder="Search products..." class="w-full px-4 py-2 border border-amber-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-amber-500">
-                    <button onclick="searchProducts()" class="absolute right-2 top-2 text-amber-600">
-                        <i class="fas fa-search"></i>
-                    </button>
-                </div>
-            </div>
-            
-            <!-- Category Filters -->
-            <div class="flex flex-wrap justify-center gap-2 mb-6">
-'''
-
-        # Category buttons
-        categories = [
-            "all", "pottery", "textiles", "jewelry", "paintings", 
-            "wooden", "metalwork", "leather", "papercraft", "home-decor", "accessories"
-        ]
-        
-        for category in categories:
-            display_name = "All" if category == "all" else category.title()
-            btn_class = "bg-amber-500 text-white" if category == "all" else "bg-amber-100 text-amber-700"
-            html_content += f'''
-                <button onclick="filterByCategory('{category}')" 
-                        class="category-btn px-3 py-1 rounded-full text-sm {btn_class}" 
-                        data-category="{category}">
-                    {display_name}
-                </button>
-'''
-
-        html_content += '''
-            </div>
-            
-            <div class="flex justify-center space-x-4">
-                <a href="#products" class="bg-amber-500 text-white px-6 py-3 rounded-lg font-semibold">Browse Products</a>
-                <a href="https://wa.me/14155238886" class="border border-amber-500 text-amber-500 px-6 py-3 rounded-lg font-semibold">Become a Seller</a>
-            </div>
-        </div>
-
-        <!-- Reels Section -->
-        <h2 id="reels" class="text-3xl font-bold text-amber-800 mb-8 text-center">Featured Reels</h2>
-        <div class="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6 mb-12" id="reelsContainer">
-'''
-
-        # Add reel cards (show latest 6 reels)
-        for reel in reels[-6:]:
-            html_content += f'''
-            <div class="reel-card bg-white rounded-xl shadow-md overflow-hidden">
-                <video src="{reel['video_url']}" class="w-full h-48 object-cover" controls></video>
-                <div class="p-4">
-                    <p class="text-gray-700 mb-2">{reel['caption']}</p>
-                    <div class="flex items-center justify-between text-sm text-gray-500">
-                        <span>By {reel['seller_name']}</span>
-                        <div class="flex items-center space-x-3">
-                            <span><i class="fas fa-heart text-red-500"></i> {reel.get('likes', 0)}</span>
-                            <span><i class="fas fa-comment text-blue-500"></i> {reel.get('comments', 0)}</span>
-                        </div>
-                    </div>
-                </div>
-            </div>
-'''
-
-        html_content += '''
-        </div>
-
-        <!-- Products Grid -->
-        <h2 id="products" class="text-3xl font-bold text-amber-800 mb-8 text-center">Featured Products</h2>
-        <div class="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6 mb-12" id="productsContainer">
-'''
-
-        # Add product cards (show latest 12 products)
-        for product in products[-12:]:
-            html_content += f'''
-            <div class="product-card bg-white rounded-xl shadow-md overflow-hidden" data-category="{product.get('category', 'handmade')}">
-                <img src="{product['images'][0]}" alt="{product['title']}" class="w-full h-48 object-cover">
-                <div class="p-4">
-                    <h3 class="font-semibold text-lg mb-2">{product['title'][:50]}{'...' if len(product['title']) > 50 else ''}</h3>
-                    <p class="text-gray-600 text-sm mb-3">{product['description'][:80]}{'...' if len(product['description']) > 80 else ''}</p>
-                    <div class="flex items-center justify-between">
-                        <span class="text-amber-600 font-bold">₹{product['price']}</span>
-                        <a href="/product/{product['id']}.html" class="text-amber-500 hover:text-amber-600">View →</a>
-                    </div>
-                </div>
-            </div>
-'''
-
-        html_content += '''
-        </div>
-
-        <!-- No results message -->
-        <div id="noResults" class="text-center py-8 hidden">
-            <p class="text-gray-500 text-lg mb-4">No products found matching your search.</p>
-            <button onclick="filterByCategory('all'); document.getElementById('searchInput').value = ''; searchProducts();" 
-                    class="px-4 py-2 bg-amber-500 text-white rounded-lg font-semibold">
-                Show All Products
-            </button>
-        </div>
-
-        <!-- Sellers Section -->
-        <h2 id="sellers" class="text-3xl font-bold text-amber-800 mb-8 text-center">Featured Artisans</h2>
-        <div class="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6 mb-12">
-'''
-
-        # Get unique sellers from products
-        sellers = {}
-        for product in products:
-            phone = product.get('artisan_phone')
-            if phone and phone not in sellers:
-                sellers[phone] = {
-                    'name': product.get('artisan_name', 'Local Artisan'),
-                    'region': product.get('artisan_region', 'India'),
-                    'products_count': 1,
-                    'image': product.get('images', [])[0] if product.get('images') else 'https://storage.googleapis.com/craftlink-images/fallback1.jpg'
-                }
-            elif phone:
-                sellers[phone]['products_count'] += 1
-
-        # Add seller cards (show up to 6 sellers)
-        for i, (phone, seller) in enumerate(list(sellers.items())[:6]):
-            html_content += f'''
-            <div class="seller-card bg-white rounded-xl shadow-md overflow-hidden">
-                <img src="{seller['image']}" alt="{seller['name']}" class="w-full h-48 object-cover">
-                <div class="p-4">
-                    <h3 class="font-semibold text-lg mb-1">{seller['name']}</h3>
-                    <p class="text-gray-600 text-sm mb-2">{seller['region']}</p>
-                    <div class="flex items-center justify-between">
-                        <span class="text-amber-600 text-sm">{seller['products_count']} products</span>
-                        <a href="/seller/{phone}.html" class="text-amber-500 hover:text-amber-600 text-sm">View Profile →</a>
-                    </div>
-                </div>
-            </div>
-'''
-
-        html_content += '''
-        </div>
-
-        <!-- Footer -->
-        <div class="text-center text-gray-600 mt-12">
-            <p>© 2025 KalaaSaarathi. All rights reserved.</p>
-            <p class="text-sm mt-2">Supporting Indian artisans one craft at a time</p>
-        </div>
-    </div>
-
-    <script>
-        let currentCategory = 'all';
-        
-        function searchProducts() {
-            const searchTerm = document.getElementById('searchInput').value.toLowerCase();
-            const products = document.querySelectorAll('.product-card');
-            let visibleCount = 0;
-            
-            products.forEach(product => {
-                const title = product.querySelector('h3').textContent.toLowerCase();
-                const description = product.querySelector('p').textContent.toLowerCase();
-                const category = product.getAttribute('data-category');
-                
-                if ((title.includes(searchTerm) || description.includes(searchTerm)) && 
-                    (currentCategory === 'all' || category === currentCategory)) {
-                    product.style.display = 'block';
-                    visibleCount++;
-                } else {
-                    product.style.display = 'none';
-                }
-            });
-            
-            // Show message if no products found
-            const noResults = document.getElementById('noResults');
-            if (visibleCount === 0) {
-                noResults.style.display = 'block';
-            } else {
-                noResults.style.display = 'none';
-            }
-        }
-        
-        function filterByCategory(category) {
-            currentCategory = category;
-            searchProducts(); // This will apply both category filter and search term
-            
-            // Update active category button
-            document.querySelectorAll('.category-btn').forEach(btn => {
-                if (btn.getAttribute('data-category') === category) {
-                    btn.classList.add('bg-amber-500', 'text-white');
-                    btn.classList.remove('bg-amber-100', 'text-amber-700');
-                } else {
-                    btn.classList.remove('bg-amber-500', 'text-white');
-                    btn.classList.add('bg-amber-100', 'text-amber-700');
-                }
-            });
-        }
-        
-        // Make search work on Enter key
-        document.getElementById('searchInput').addEventListener('keypress', function(e) {
-            if (e.key === 'Enter') {
-                searchProducts();
-            }
-        });
-        
-        // Initialize with all products shown
-        filterByCategory('all');
-    </script>
-</body>
-</html>'''
-
-        # Save index.html
-        index_file = f"{shop_dir}/index.html"
-        with open(index_file, "w", encoding="utf-8") as f:
-            f.write(html_content)
-        
-        # Create seller pages
-        create_seller_pages()
-        
-        print("✅ Created shop index.html with search, categories, products, reels, and sellers")
+        started = planner.tick()
+        stale = planner.plan()
+        # Edited product and seller pages, whichever branch renders the rest
+        pages = sorted(output for output in stale
+                       if not output.startswith(("index.html#", "listing/")))
+        listings = {}
+        if full or len(_index_sections) < len(INDEX_SECTIONS):
+            # Write (or initialize) the JSON snapshots first
+            compact_catalog()
+            write_site_assets()
+            create_seller_pages()
+            sections = INDEX_SECTIONS
+            # Every seller page was just rendered
+            pages = [output for output in pages if not output.startswith("seller/")]
+            listings = {category: set() for category in CATEGORIES}
+        else:
+            sections = [output.partition("#")[2] for output in stale if output.startswith("index.html#")]
+            for output in stale:
+                if output.startswith("listing/"):
+                    _, category, number = (output.split("/") + [""])[:3]
+                    listings.setdefault(category, set()).update([int(number)] if number else [])
+        
+        failed = []
+        for output in pages:
+            kind, _, file_name = output.partition("/")
+            key = file_name[:-len(".html")]
+            if kind == "product":
+                product = product_store.get(key)
+                if product:
+                    build_and_host(key, product.get('description', ''), product.get('images', []), save=False)
+                    # build_and_host reports errors instead of raising
+                    if not planner.built_since(output, started):
+                        failed.append(output)
+            elif kind == "seller":
+                seller = seller_store.get(key)
+                if seller:
+                    build_seller_page(seller)
+        
+        listing_files = sum(build_category_listing(category, numbers) for category, numbers in listings.items())
+        if listings:
+            update_listing_index()
+        
+        changed = update_index_page(sections)
+        precompress(manifest, manifest.pending())
+        manifest.save()
+        fragments.save()
+        planner.done(started, failed)
+        
+        print(f"✅ Shop updated: {len(pages)} pages, {listing_files} listing files, "
+              f"index sections: {', '.join(changed) or 'unchanged'}")
         
     except Exception as e:
         print(f"❌ Error creating index.html: {e}")
@@ -1,6 +1,5 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-import json
 import os
 import uuid
 import aiofiles
@@ -25,47 +24,55 @@ except:
     def remove_bg_and_upload(local_path: str) -> list:
         return [f"https://storage.googleapis.com/craftlink-images/fallback{i}.jpg?t={uuid.uuid4().hex[:8]}" for i in range(1, 5)]
 
+# Catalog access goes through deploy_shop so edits from this process are
+# serialized with the WhatsApp bot's writes
+try:
+    from deploy_shop import (get_product_by_id, find_product_ids, update_product_fields, catalog_version,
+                             SHORT_ID_LENGTH)
+    DEPLOY_AVAILABLE = True
+except Exception as e:
+    print(f"❌ Deploy shop not available: {e}")
+    DEPLOY_AVAILABLE = False
+    def get_product_by_id(product_id): return None
+    def find_product_ids(id_prefix, seller_phone=None, limit=2): return []
+    def update_product_fields(product_id, changes): return False
+    def catalog_version(): return 0
+    SHORT_ID_LENGTH = 8
+from response_cache import ResponseCache, response_parts
+
+# Pre-serialized, precompressed product responses, rebuilt when the catalog version moves
+response_cache = ResponseCache()
+
 @app.post("/api/edit-product")
 async def edit_product(
     product_id: str = Form(...),
     price: str = Form(None),
     description: str = Form(None),
-    image: UploadFile = File(None)
+    image: UploadFile = File(None),
+    whatsapp_number: str = Form(None)
 ):
     try:
-        # Load products
-        products_file = "../shop/out/products.json"
-        
-        # Read existing products or create empty array
-        if os.path.exists(products_file):
-            try:
-                async with aiofiles.open(products_file, "r") as f:
-                    content = await f.read()
-                    data = json.loads(content)
-            except json.JSONDecodeError:
-                data = {"products": []}
-        else:
-            data = {"products": []}
-        
-        # Find product
-        product = None
-        for p in data["products"]:
-            if p["id"] == product_id:
-                product = p
-                break
+        # Find product; short ids from the bot work too, scoped to the seller when known
+        seller_phone = (whatsapp_number or "").replace("whatsapp:", "").strip() or None
+        if seller_phone is None and len(product_id.strip()) < SHORT_ID_LENGTH:
+            raise HTTPException(status_code=400,
+                                detail=f"Use the full product ID or its first {SHORT_ID_LENGTH} characters")
+        matches = find_product_ids(product_id, seller_phone)
+        if len(matches) > 1:
+            raise HTTPException(status_code=409, detail="Product ID is ambiguous, use more characters")
+        product = get_product_by_id(matches[0]) if matches else None
         
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
+        product_id = product["id"]
         
-        # Update fields
-        updated = False
+        # Collect field changes
+        changes = {}
         if price and price.isdigit():
-            product["price"] = int(price)
-            updated = True
+            changes["price"] = int(price)
         
         if description:
-            product["description"] = description
-            updated = True
+            changes["description"] = description
         
         if image:
             # Save and process new image
@@ -75,15 +82,15 @@ async def edit_product(
             async with aiofiles.open(temp_path, "wb") as f:
                 await f.write(image_content)
             
-            new_images = remove_bg_and_upload(temp_path)
-            product["images"] = new_images
+            changes["images"] = remove_bg_and_upload(temp_path)
             os.remove(temp_path)
-            updated = True
         
-        if updated:
-            # Save updated products
-            async with aiofiles.open(products_file, "w") as f:
-                await f.write(json.dumps(data, indent=2))
+        if changes:
+            # Merged into the latest stored copy under the catalog lock, so
+            # concurrent edits to other fields aren't lost
+            if not update_product_fields(product_id, changes):
+                raise HTTPException(status_code=404, detail="Product not found")
+            product = get_product_by_id(product_id)
             
             return {
                 "success": True,
@@ -102,29 +109,28 @@ async def edit_product(
                 "message": "No changes were made"
             }
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating product: {str(e)}")
 
 @app.get("/api/products/{product_id}")
-async def get_product_api(product_id: str):
+async def get_product_api(product_id: str, request: Request):
     try:
-        products_file = "../shop/out/products.json"
-        if not os.path.exists(products_file):
-            raise HTTPException(status_code=404, detail="Product not found")
-        
-        async with aiofiles.open(products_file, "r") as f:
-            content = await f.read()
-            data = json.loads(content)
+        def build():
+            product = get_product_by_id(product_id)
+            return {"success": True, "product": product} if product else None
         
-        for product in data.get("products", []):
-            if product.get("id") == product_id:
-                return {
-                    "success": True,
-                    "product": product
-                }
+        entry = response_cache.get(("product", product_id), catalog_version(), build)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Product not found")
         
-        raise HTTPException(status_code=404, detail="Product not found")
+        status, body, headers = response_parts(
+            entry, request.headers.get("accept-encoding"), request.headers.get("if-none-match"))
+        return Response(content=body, status_code=status, headers=headers)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching product: {str(e)}")
 
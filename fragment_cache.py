@@ -0,0 +1,138 @@
+"""Rendered card fragments, memoized across pages and runs.
+
+The same product card appears on the index, its category listing and its
+seller's page, and a rebuild used to render every one of them again. Each
+fragment is keyed by the record's id and a hash of its content (its
+version), plus the macro arguments, so a card is rendered once and reused
+until its record changes. The whole cache is tied to a hash of the code
+card HTML comes from (templates, filters, minifier): changing any of it
+drops the cache. It's kept on disk between runs as a JSON-lines log: a
+``{"template": hash}`` header, then one ``{"key", "html"}`` line per
+fragment, appended as fragments are rendered and rewritten only once most
+of its lines are dropped fragments.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+from build_manifest import content_hash
+from catalog_store import write_file_atomic
+
+# Least recently used fragments beyond this are dropped
+MAX_FRAGMENTS = 50000
+
+
+def record_version(record):
+    """Hash of a record's content; changes whenever any field does"""
+    return content_hash(json.dumps(record, sort_keys=True, default=str).encode("utf-8"))[:16]
+
+
+class FragmentCache:
+    """Memoized HTML fragments, persisted in an append-only JSON-lines file"""
+
+    def __init__(self, path, template_hash, max_fragments=MAX_FRAGMENTS):
+        self.path = path
+        self.template_hash = template_hash
+        self.max_fragments = max_fragments
+        self._lock = threading.Lock()
+        self._fragments = OrderedDict()
+        # Fragments rendered since take_new() was last called
+        self._new = {}
+        # Fragments not yet appended to the file, and lines the file holds
+        self._unsaved = {}
+        self._lines = 0
+        self._rewrite = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            self._rewrite = True
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable {self.path}: {e}")
+            self._rewrite = True
+            return
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A torn line from an interrupted save
+                continue
+        if not entries or entries[0].get("template") != self.template_hash:
+            self._rewrite = True
+            return
+        for entry in entries[1:]:
+            self._fragments[entry["key"]] = entry["html"]
+            self._fragments.move_to_end(entry["key"])
+        self._lines = len(lines)
+        # Don't append after a torn last line
+        self._rewrite = not lines[-1].endswith("\n")
+        self._trim()
+
+    def get(self, kind, record_id, record, render, *args):
+        """Cached HTML for one fragment, calling render() only if record (or args) changed"""
+        key = f"{kind}:{record_id}:{record_version(record)}:{','.join(map(str, args))}"
+        with self._lock:
+            html = self._fragments.get(key)
+            if html is not None:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+                return html
+        html = str(render())
+        with self._lock:
+            self.misses += 1
+            self._fragments[key] = html
+            self._new[key] = html
+            self._unsaved[key] = html
+            self._trim()
+        return html
+
+    def _trim(self):
+        while len(self._fragments) > self.max_fragments:
+            self._fragments.popitem(last=False)
+
+    def take_new(self):
+        """Fragments rendered since the last call (how pool workers hand theirs back)"""
+        with self._lock:
+            new, self._new = self._new, {}
+            return new
+
+    def update(self, fragments):
+        with self._lock:
+            self._fragments.update(fragments)
+            self._unsaved.update(fragments)
+            self._trim()
+
+    def _line(self, entry):
+        return json.dumps(entry, ensure_ascii=False) + "\n"
+
+    def save(self):
+        """Append the fragments added since the last save; returns True if the file changed"""
+        with self._lock:
+            # Mostly dropped or superseded fragments: write the live ones afresh
+            if self._rewrite or self._lines > 2 * len(self._fragments) + 1000:
+                lines = [self._line({"template": self.template_hash})]
+                lines += [self._line({"key": key, "html": html}) for key, html in self._fragments.items()]
+                write_file_atomic(self.path, "".join(lines).encode("utf-8"))
+                self._lines = len(lines)
+                self._rewrite = False
+            elif self._unsaved:
+                lines = [self._line({"key": key, "html": html}) for key, html in self._unsaved.items()
+                         if key in self._fragments]
+                with open(self.path, "ab") as f:
+                    f.write("".join(lines).encode("utf-8"))
+                self._lines += len(lines)
+            else:
+                return False
+            self._new = {}
+            self._unsaved = {}
+            return True
+
+    def stats(self):
+        return {"fragments": len(self._fragments), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,273 @@
+"""Native Firebase Hosting deploys, without the firebase CLI.
+
+The CLI walks and hashes all of out/ on every deploy. This client talks to
+the Hosting REST API directly and takes the file list and content hashes
+from the build manifest. It also keeps the gzip hash of every file it has
+deployed in a state file, so an unchanged file is never compressed or hashed
+again. A deploy:
+
+1. creates a version with the serving config from firebase.json,
+2. lists every file with the sha256 of its gzipped bytes (populateFiles),
+3. uploads only the blobs Hosting says it doesn't have, concurrently over
+   one pooled HTTP session,
+4. finalizes the version and releases it.
+
+Point HOSTING_API at hosting_standin.py to try it offline.
+"""
+import fnmatch
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from build_manifest import content_hash
+from catalog_store import write_json_atomic
+from site_compress import gzip_data
+
+try:
+    import google.auth
+    import google.auth.transport.requests
+    GOOGLE_AUTH_AVAILABLE = True
+except ImportError:
+    GOOGLE_AUTH_AVAILABLE = False
+
+HOSTING_API = os.environ.get("HOSTING_API", "https://firebasehosting.googleapis.com/v1beta1")
+HOSTING_SITE = os.environ.get("HOSTING_SITE", "neethi-saarathi-ids")
+HOSTING_SCOPE = "https://www.googleapis.com/auth/firebase.hosting"
+# Files per populateFiles call (the API's limit)
+POPULATE_BATCH = 1000
+UPLOAD_WORKERS = int(os.environ.get("HOSTING_UPLOAD_WORKERS", 16))
+
+
+class HostingError(Exception):
+    pass
+
+
+class HostingAuthError(HostingError):
+    """No credentials to call the API with"""
+
+
+def serving_config(hosting):
+    """The API's ServingConfig for the "hosting" section of firebase.json"""
+    config = {}
+    if hosting.get("headers"):
+        config["headers"] = [{
+            "regex" if "regex" in rule else "glob": rule.get("regex", rule.get("source")),
+            "headers": {header["key"]: header["value"] for header in rule["headers"]},
+        } for rule in hosting["headers"]]
+    if hosting.get("redirects"):
+        config["redirects"] = [{
+            "regex" if "regex" in rule else "glob": rule.get("regex", rule.get("source")),
+            "location": rule["destination"],
+            "statusCode": rule.get("type", 301),
+        } for rule in hosting["redirects"]]
+    if hosting.get("rewrites"):
+        rewrites = []
+        for rule in hosting["rewrites"]:
+            rewrite = {"regex" if "regex" in rule else "glob": rule.get("regex", rule.get("source"))}
+            if "destination" in rule:
+                rewrite["path"] = rule["destination"]
+            elif "function" in rule:
+                rewrite["function"] = rule["function"]
+            elif "run" in rule:
+                rewrite["run"] = rule["run"]
+            rewrites.append(rewrite)
+        config["rewrites"] = rewrites
+    if "cleanUrls" in hosting:
+        config["cleanUrls"] = bool(hosting["cleanUrls"])
+    if "trailingSlash" in hosting:
+        config["trailingSlashBehavior"] = "ADD" if hosting["trailingSlash"] else "REMOVE"
+    return config
+
+
+def ignored(path, patterns):
+    """True if a site path matches one of firebase.json's ignore globs"""
+    name = os.path.basename(path)
+    for pattern in patterns:
+        bare = pattern.replace("**/", "")
+        if fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(path, bare) or fnmatch.fnmatch(name, bare):
+            return True
+    return False
+
+
+class HostingDeployer:
+    """Deploys the manifest's files to a Hosting site, uploading only blobs it doesn't have.
+
+    ``state_path`` keeps {path: [sha256, gzip sha256]} for the last release.
+    """
+
+    def __init__(self, site=HOSTING_SITE, api=HOSTING_API, state_path="./hosting-deploy.json",
+                 workers=UPLOAD_WORKERS, token=None):
+        self.site = site
+        self.api = api.rstrip("/")
+        self.state_path = state_path
+        self.workers = workers
+        self._token = token or os.environ.get("HOSTING_ACCESS_TOKEN")
+        self._credentials = None
+        self._session = None
+
+    # ---- HTTP ----------------------------------------------------------
+
+    @property
+    def session(self):
+        """One keep-alive session, with a connection per upload worker and retries on 429/5xx"""
+        if self._session is None:
+            session = requests.Session()
+            retry = Retry(total=4, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                          allowed_methods=None)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.workers, max_retries=retry)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+        return self._session
+
+    def _headers(self):
+        if self._token:
+            return {"Authorization": f"Bearer {self._token}"}
+        if not GOOGLE_AUTH_AVAILABLE:
+            raise HostingAuthError("no HOSTING_ACCESS_TOKEN and google-auth is not installed")
+        if self._credentials is None:
+            try:
+                self._credentials, _ = google.auth.default(scopes=[HOSTING_SCOPE])
+            except google.auth.exceptions.DefaultCredentialsError as e:
+                raise HostingAuthError(str(e)) from e
+        if not self._credentials.valid:
+            self._credentials.refresh(google.auth.transport.requests.Request())
+        return {"Authorization": f"Bearer {self._credentials.token}"}
+
+    def _call(self, method, url, **kwargs):
+        response = self.session.request(method, url, headers=self._headers(), timeout=60, **kwargs)
+        if response.status_code >= 400:
+            raise HostingError(f"{method} {url} -> {response.status_code}: {response.text[:300]}")
+        return response.json() if response.content else {}
+
+    # ---- local state ---------------------------------------------------
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable {self.state_path}: {e}")
+            return {}
+
+    def _gzipped(self, root, path, entry):
+        """Gzipped bytes of a site file, from its precompressed sibling when that's current"""
+        full_path = os.path.join(root, path)
+        if entry.get("compressed") == entry["sha256"]:
+            try:
+                with open(f"{full_path}.gz", "rb") as f:
+                    return f.read()
+            except FileNotFoundError:
+                pass
+        with open(full_path, "rb") as f:
+            return gzip_data(f.read())
+
+    def _adopt_untracked(self, manifest):
+        """Before the first release: add files under the site root the manifest doesn't know yet"""
+        known = manifest.files()
+        for directory, _, names in os.walk(manifest.root):
+            for name in names:
+                path = os.path.relpath(os.path.join(directory, name), manifest.root).replace(os.sep, "/")
+                if path not in known and not name.endswith((".gz", ".br", ".tmp")):
+                    manifest.track(path)
+
+    # ---- deploy --------------------------------------------------------
+
+    def deploy(self, manifest, hosting, message=None):
+        """Release the manifest's files on the site; returns deploy stats"""
+        started = time.perf_counter()
+        # No credentials: fail (and fall back to the CLI) before reading and hashing the site
+        self._headers()
+        previous = self._load_state().get("files", {})
+        if not previous:
+            self._adopt_untracked(manifest)
+        patterns = hosting.get("ignore", [])
+        files = {path: entry for path, entry in manifest.files().items() if not ignored(path, patterns)}
+
+        # Gzip hashes: reused for files whose content didn't change since the last release.
+        # The bytes hashed here are the bytes uploaded, so a file rewritten meanwhile can't
+        # go up under a hash it doesn't have
+        hashes = {}
+        gzipped = {}
+        for path, entry in files.items():
+            known = previous.get(path)
+            if known and known[0] == entry["sha256"]:
+                hashes[path] = known[1]
+            else:
+                gzipped[path] = self._gzipped(manifest.root, path, entry)
+                hashes[path] = content_hash(gzipped[path])
+        added = [path for path in files if path not in previous]
+        changed = [path for path in files if path in previous and previous[path][0] != files[path]["sha256"]]
+        removed = [path for path in previous if path not in files]
+        print(f"📦 {len(files)} files: {len(added)} new, {len(changed)} changed, {len(removed)} removed")
+
+        version = self._call("POST", f"{self.api}/sites/{self.site}/versions",
+                             json={"config": serving_config(hosting)})["name"]
+
+        # Hosting answers with the blobs it doesn't already have
+        required = set()
+        upload_url = None
+        paths = sorted(files)
+        for i in range(0, len(paths), POPULATE_BATCH):
+            batch = {f"/{path}": hashes[path] for path in paths[i:i + POPULATE_BATCH]}
+            result = self._call("POST", f"{self.api}/{version}:populateFiles", json={"files": batch})
+            required.update(result.get("uploadRequiredHashes", []))
+            upload_url = result.get("uploadUrl", upload_url)
+
+        by_hash = {}
+        for path in paths:
+            by_hash.setdefault(hashes[path], path)
+        uploads = [(digest, by_hash[digest]) for digest in sorted(required) if digest in by_hash]
+        # One token for all workers (refreshing it isn't thread-safe)
+        headers = {**self._headers(), "Content-Type": "application/octet-stream"}
+
+        def upload(item):
+            digest, path = item
+            data = gzipped.pop(path, None)
+            if data is None:
+                # Hashed from the state file: check the bytes on disk still match
+                data = self._gzipped(manifest.root, path, files[path])
+                if content_hash(data) != digest:
+                    raise HostingError(f"upload {path}: file changed during the deploy, aborting")
+            response = self.session.post(f"{upload_url}/{digest}", data=data, headers=headers, timeout=120)
+            if response.status_code >= 400:
+                raise HostingError(f"upload {path} -> {response.status_code}: {response.text[:300]}")
+            return len(data)
+
+        uploaded_bytes = 0
+        if uploads:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                uploaded_bytes = sum(pool.map(upload, uploads))
+
+        self._call("PATCH", f"{self.api}/{version}", params={"updateMask": "status"},
+                   json={"status": "FINALIZED"})
+        release = self._call("POST", f"{self.api}/sites/{self.site}/releases",
+                             params={"versionName": version}, json={"message": message or ""})
+
+        stats = {
+            "released_at": datetime.now().isoformat(),
+            "version": version,
+            "release": release.get("name"),
+            "files": len(files),
+            "added": len(added),
+            "changed": len(changed),
+            "removed": len(removed),
+            "uploaded": len(uploads),
+            "uploaded_bytes": uploaded_bytes,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        write_json_atomic(self.state_path, {
+            "files": {path: [files[path]["sha256"], hashes[path]] for path in paths},
+            "last_deploy": stats,
+        })
+        print(f"✅ Released {version}: uploaded {len(uploads)} of {len(files)} files "
+              f"({uploaded_bytes / 1024:.0f} KB) in {stats['seconds']}s")
+        return stats
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Firebase Hosting REST API, for deploying offline.
+
+    python hosting_standin.py [--port 8087]
+    HOSTING_API=http://127.0.0.1:8087/v1beta1 HOSTING_ACCESS_TOKEN=local python deploy_all.py
+
+Implements the part of the protocol hosting_deploy.py uses: create a
+version, populateFiles (answering with the hashes it doesn't have yet),
+blob uploads (checked against their hash), finalize, release. Blobs are
+kept in memory across versions, like Hosting dedupes them across deploys,
+and the released site is served from ``/site/<path>`` so a deploy can be
+checked end to end. ``/stats`` shows what was uploaded.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class HostingState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.blobs = {}
+        self.versions = {}
+        self.releases = []
+        self.uploads = 0
+        self.populated = 0
+
+
+class Handler(BaseHTTPRequestHandler):
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload=None, body=None, content_type="application/json"):
+        if body is None:
+            body = json.dumps(payload if payload is not None else {}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _authorized(self):
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self._reply(401, {"error": {"code": 401, "message": "missing bearer token"}})
+            return False
+        return True
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        state = self.state
+        if not self._authorized():
+            return
+
+        match = re.fullmatch(r"/v1beta1/sites/([^/]+)/versions", url.path)
+        if match:
+            name = f"sites/{match.group(1)}/versions/{uuid.uuid4().hex[:16]}"
+            config = json.loads(self._body() or b"{}").get("config", {})
+            with state.lock:
+                state.versions[name] = {"name": name, "status": "CREATED", "config": config, "files": {}}
+            return self._reply(200, {"name": name, "status": "CREATED", "config": config})
+
+        match = re.fullmatch(r"/v1beta1/(sites/[^/]+/versions/[^/:]+):populateFiles", url.path)
+        if match:
+            files = json.loads(self._body() or b"{}").get("files", {})
+            with state.lock:
+                version = state.versions.get(match.group(1))
+                if version is None or version["status"] != "CREATED":
+                    return self._reply(400, {"error": {"message": "version is not open for files"}})
+                version["files"].update(files)
+                state.populated += len(files)
+                required = sorted({digest for digest in files.values() if digest not in state.blobs})
+            upload_url = f"http://{self.headers['Host']}/upload/{match.group(1)}/files"
+            return self._reply(200, {"uploadRequiredHashes": required, "uploadUrl": upload_url})
+
+        match = re.fullmatch(r"/upload/(sites/[^/]+/versions/[^/]+)/files/([0-9a-f]{64})", url.path)
+        if match:
+            data = self._body()
+            if hashlib.sha256(data).hexdigest() != match.group(2):
+                return self._reply(400, {"error": {"message": "content does not match hash"}})
+            with state.lock:
+                state.blobs[match.group(2)] = data
+                state.uploads += 1
+            return self._reply(200)
+
+        match = re.fullmatch(r"/v1beta1/sites/([^/]+)/releases", url.path)
+        if match:
+            name = parse_qs(url.query).get("versionName", [""])[0]
+            with state.lock:
+                version = state.versions.get(name)
+                if version is None or version["status"] != "FINALIZED":
+                    return self._reply(400, {"error": {"message": "version is not finalized"}})
+                release = {"name": f"sites/{match.group(1)}/releases/{len(state.releases) + 1}",
+                           "version": {"name": name}}
+                state.releases.append(release)
+            return self._reply(200, release)
+
+        self._reply(404, {"error": {"message": f"no route for POST {url.path}"}})
+
+    def do_PATCH(self):
+        url = urlsplit(self.path)
+        state = self.state
+        if not self._authorized():
+            return
+        match = re.fullmatch(r"/v1beta1/(sites/[^/]+/versions/[^/]+)", url.path)
+        if not match:
+            return self._reply(404, {"error": {"message": f"no route for PATCH {url.path}"}})
+        status = json.loads(self._body() or b"{}").get("status")
+        with state.lock:
+            version = state.versions.get(match.group(1))
+            if version is None:
+                return self._reply(404, {"error": {"message": "no such version"}})
+            missing = [path for path, digest in version["files"].items() if digest not in state.blobs]
+            if status == "FINALIZED" and missing:
+                return self._reply(400, {"error": {"message": f"{len(missing)} files not uploaded, e.g. {missing[0]}"}})
+            version["status"] = status
+        self._reply(200, {"name": version["name"], "status": status})
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        state = self.state
+        if url.path == "/stats":
+            with state.lock:
+                return self._reply(200, {
+                    "blobs": len(state.blobs), "uploads": state.uploads, "populated": state.populated,
+                    "versions": len(state.versions), "releases": len(state.releases),
+                    "live": state.releases[-1]["version"]["name"] if state.releases else None,
+                })
+        if url.path.startswith("/site/"):
+            with state.lock:
+                if not state.releases:
+                    return self._reply(404, {"error": {"message": "nothing released"}})
+                files = state.versions[state.releases[-1]["version"]["name"]]["files"]
+                path = "/" + url.path[len("/site/"):]
+                digest = files.get(path) or files.get(path.rstrip("/") + "/index.html")
+                data = state.blobs.get(digest)
+            if data is None:
+                return self._reply(404, {"error": {"message": f"{path} not found"}})
+            return self._reply(200, body=gzip.decompress(data), content_type="application/octet-stream")
+        self._reply(404, {"error": {"message": f"no route for GET {url.path}"}})
+
+
+def make_server(port=8087, host="127.0.0.1"):
+    handler = type("HostingHandler", (Handler,), {"state": HostingState()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Firebase Hosting REST API")
+    parser.add_argument("--port", type=int, default=8087)
+    parser.add_argument("--host", default="127.0.0.1")
+    args = parser.parse_args()
+    server = make_server(args.port, args.host)
+    print(f"🧪 Hosting stand-in on http://{args.host}:{args.port}/v1beta1 (released site under /site/)")
+    server.serve_forever()
@@ -0,0 +1,69 @@
+"""Responsive renditions of product photos.
+
+Uploads keep the original and add resized copies next to it, in WebP and
+progressive JPEG, so pages can let the browser pick the smallest file that
+fills the slot (``srcset``/``sizes``) instead of always loading the full
+photo. Images uploaded this way live under RENDITION_PREFIX in the bucket;
+a product's ``image_variants`` lists the width tags available for its
+images, and pages fall back to the plain original when it's empty.
+"""
+import io
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+IMAGE_BUCKET = "craftlink-images"
+IMAGE_BUCKET_URL = f"https://storage.googleapis.com/{IMAGE_BUCKET}"
+# Objects under this prefix come with every rendition in RENDITION_WIDTHS
+RENDITION_PREFIX = "r/"
+# Thumbnail (100px slots at 2x), card (h-48 grid cells) and detail (main image)
+RENDITION_WIDTHS = (200, 480, 960)
+RENDITION_TAGS = tuple(f"{width}w" for width in RENDITION_WIDTHS)
+# extension -> (PIL format, content type, save options)
+FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 78, "method": 6}),
+    "jpg": ("JPEG", "image/jpeg", {"quality": 80, "optimize": True, "progressive": True}),
+}
+
+
+def variant_tags(urls):
+    """Width tags every one of urls has renditions for (none for older uploads)"""
+    prefix = f"{IMAGE_BUCKET_URL}/{RENDITION_PREFIX}"
+    if urls and all(url.startswith(prefix) for url in urls):
+        return RENDITION_TAGS
+    return ()
+
+
+def rendition_url(url, tag, ext):
+    """URL of one rendition: <original without extension>-<tag>.<ext>"""
+    return f"{url.rsplit('.', 1)[0]}-{tag}.{ext}"
+
+
+def srcset(url, variants, ext="webp"):
+    """srcset attribute value for url's renditions, or '' if it has none"""
+    if not url or not variants:
+        return ""
+    return ", ".join(f"{rendition_url(url, tag, ext)} {tag}" for tag in variants)
+
+
+def make_renditions(local_path):
+    """{(tag, ext): (bytes, content type)} for every width and format.
+
+    Photos are never upscaled: a width larger than the original gets the
+    original size, so every tag in RENDITION_TAGS always exists.
+    """
+    with Image.open(local_path) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    renditions = {}
+    for width, tag in zip(RENDITION_WIDTHS, RENDITION_TAGS):
+        resized = image
+        if width < image.width:
+            resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        for ext, (pil_format, content_type, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, pil_format, **options)
+            renditions[(tag, ext)] = (buffer.getvalue(), content_type)
+    return renditions
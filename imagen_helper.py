@@ -3,6 +3,7 @@ import os
 import uuid
 from google.cloud import storage
 import random
+from image_renditions import IMAGE_BUCKET, IMAGE_BUCKET_URL, RENDITION_PREFIX, PIL_AVAILABLE, make_renditions, rendition_url
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "key.json"
 
 
@@ -16,27 +17,43 @@ def get_fallback_video_url():
     return random.choice(fallbacks)
 
 def remove_bg_and_upload(local_path: str) -> list:
-    """Upload image to uniformly accessed bucket"""
+    """Upload image (and its responsive renditions) to uniformly accessed bucket"""
     try:
         storage_client = storage.Client()
-        bucket_name = "craftlink-images"
+        bucket_name = IMAGE_BUCKET
         bucket = storage_client.bucket(bucket_name)
         
         # Upload the image
         with open(local_path, "rb") as f:
             image_content = f.read()
         
-        file_name = f"{uuid.uuid4().hex}.jpg"
+        # Resized WebP/JPEG copies; without them the original goes in the plain namespace
+        renditions = {}
+        if PIL_AVAILABLE:
+            try:
+                renditions = make_renditions(local_path)
+            except Exception as e:
+                print(f"⚠️ Could not make image renditions: {e}")
+        
+        file_name = f"{RENDITION_PREFIX if renditions else ''}{uuid.uuid4().hex}.jpg"
+        # For uniform access, construct the URL directly
+        image_url = f"{IMAGE_BUCKET_URL}/{file_name}"
+        
+        # Renditions first: a URL under the rendition prefix promises they all exist
+        for (tag, ext), (data, content_type) in renditions.items():
+            rendition_name = rendition_url(image_url, tag, ext)[len(IMAGE_BUCKET_URL) + 1:]
+            rendition = bucket.blob(rendition_name)
+            rendition.cache_control = "public, max-age=31536000, immutable"
+            rendition.upload_from_string(data, content_type=content_type)
+        
         blob = bucket.blob(file_name)
         
         # REMOVE predefined_acl for uniform bucket-level access
         blob.upload_from_string(image_content, content_type='image/jpeg')
         
-        # For uniform access, construct the URL directly
-        image_url = f"https://storage.googleapis.com/{bucket_name}/{file_name}"
-        
-        print(f"✅ Image uploaded: {image_url}")
-        return [image_url] * 4
+        print(f"✅ Image uploaded: {image_url} ({len(renditions)} renditions)")
+        # One upload, one URL; repeating it only bloated every catalog copy
+        return [image_url]
         
     except Exception as e:
         print(f"❌ Upload failed: {e}")
@@ -2,6 +2,7 @@ from flask import Flask, request, Response, jsonify
 from twilio.twiml.messaging_response import MessagingResponse
 from twilio.rest import Client
 import os
+import atexit
 import logging
 import requests
 from requests.auth import HTTPBasicAuth
@@ -10,8 +11,9 @@ import uuid
 import random
 from datetime import datetime
 import traceback
-from threading import Thread
 import time
+from response_cache import ResponseCache, response_parts
+from work_pool import WorkPool
 
 
 
@@ -25,6 +27,21 @@ app = Flask(__name__)
 app.twilio_sid = os.environ.get("TWILIO_ACCOUNT_SID")
 app.twilio_token = os.environ.get("TWILIO_AUTH_TOKEN")
 
+# Background work (photos, reels, edits) runs on MEDIA_WORKERS threads. Edits
+# go first, then new products, then reels; each lane is capped at its own
+# concurrency and senders take turns within a lane
+media_pool = WorkPool(
+    [
+        ("edit", int(os.environ.get("EDIT_CONCURRENCY", 2))),
+        ("product", int(os.environ.get("PRODUCT_CONCURRENCY", 3))),
+        ("reel", int(os.environ.get("REEL_CONCURRENCY", 1))),
+    ],
+    workers=int(os.environ.get("MEDIA_WORKERS", 4)),
+    max_queued=int(os.environ.get("MEDIA_QUEUE_LIMIT", 100)),
+    name="media",
+)
+BUSY_MESSAGE = "⏳ We're processing a lot of uploads right now. Please send it again in a few minutes."
+
 logger.info(f"Twilio SID configured: {bool(app.twilio_sid)}")
 logger.info(f"Twilio Token configured: {bool(app.twilio_token)}")
 
@@ -62,22 +79,34 @@ except Exception as e:
     def upload_video(path): return f"https://storage.googleapis.com/craftlink-videos/fallback.mp4"
 
 try:
-    from deploy_shop import build_and_host, update_products_json, get_all_products, get_product_by_id, update_seller_profile, get_seller_profile, add_reel, get_all_reels, create_shop_index, deploy_to_firebase
+    from deploy_shop import build_and_host, update_products_json, update_product_fields, get_all_products, get_product_by_id, find_product_ids, get_products_by_seller, get_products_by_category, search_products, list_products, catalog_version, update_seller_profile, get_seller_profile, add_reel, get_all_reels, create_shop_index, schedule_deploy, flush_deploys, deploy_state
     DEPLOY_AVAILABLE = True
+    # This process schedules deploys: publish what's still queued when it exits
+    # (for at most DEPLOY_EXIT_TIMEOUT seconds)
+    atexit.register(flush_deploys)
     logger.info("Deploy shop loaded successfully")
 except Exception as e:
     logger.error(f"Deploy shop not available: {e}")
     DEPLOY_AVAILABLE = False
     def build_and_host(product_id, description, images, title, price): return f"https://neethi-saarathi-ids.web.app/product/{product_id}.html"
     def update_products_json(data): pass
+    def update_product_fields(product_id, changes): return False
     def get_all_products(): return []
     def get_product_by_id(product_id): return None
+    def find_product_ids(id_prefix, seller_phone=None, limit=2): return [id_prefix]
+    def get_products_by_seller(phone): return []
+    def get_products_by_category(category): return []
+    def search_products(query, limit=None): return []
+    def list_products(limit=48, cursor=None, category=None, seller_phone=None, search=None, fields=None): return {"products": [], "next_cursor": None}
+    def catalog_version(): return None
     def update_seller_profile(phone, profile_data): pass
     def get_seller_profile(phone): return None
     def add_reel(reel_data): pass
     def get_all_reels(): return []
     def create_shop_index(): pass
-    def deploy_to_firebase(): return True
+    def schedule_deploy(reason="", on_live=None): pass
+    def flush_deploys(): pass
+    def deploy_state(): return None
 
 try:
     from ship import create_label
@@ -169,6 +198,9 @@ def get_product(product_id):
 def update_product(product_id, field, value):
     """Update product in products.json"""
     try:
+        if DEPLOY_AVAILABLE:
+            return update_product_fields(product_id, {field: value})
+        
         # FIXED: Change from "../shop/out/products.json" to "out/products.json"
         products_file = "out/products.json"
         
@@ -211,7 +243,14 @@ def handle_edit_command(phone_number, message, media_url=None):
         if len(parts) < 4 and not media_url:
             return "Usage: edit PRODUCT_ID FIELD VALUE\nExample: edit abc123 price 500\n\nFields: price, description, image, title, category"
         
-        product_id = parts[1]
+        # Resolve the short id we hand out ("edit abc12345 ...") among the sender's own products
+        user_phone = phone_number.replace("whatsapp:", "")
+        matches = find_product_ids(parts[1], user_phone)
+        if not matches:
+            return "❌ Product not found. Check the product ID.\nType 'myproducts' to see your items."
+        if len(matches) > 1:
+            return f"❌ More than one of your products starts with '{parts[1]}'. Please use more characters of the ID."
+        product_id = matches[0]
         field = parts[2].lower() if len(parts) > 2 else "image"
         value = " ".join(parts[3:]) if len(parts) > 3 else ""
         
@@ -231,17 +270,10 @@ def handle_edit_command(phone_number, message, media_url=None):
             success = update_product(product_id, "category", value)
             
         elif field == "image" and media_url:
-            # Download and process new image
-            image_content = download_twilio_media(media_url)
-            image_filename = f"{uuid.uuid4().hex}.jpg"
-            image_path = save_image(image_content, image_filename)
-            
-            if IMAGEN_AVAILABLE:
-                image_urls = remove_bg_and_upload(image_path)
-            else:
-                image_urls = [f"https://storage.googleapis.com/craftlink-images/fallback{i}.jpg" for i in range(1,5)]
-                
-            success = update_product(product_id, "images", image_urls)
+            # Downloading and processing the photo takes too long for the webhook
+            if not media_pool.submit("edit", phone_number, process_image_edit_background, media_url, phone_number, product_id):
+                return BUSY_MESSAGE
+            return f"📸 Got the new photo for product {product_id[:8]}! I'll message you when it's live."
             
         elif field == "image":
             return "❌ Please send an image with the edit command: edit PRODUCT_ID image"
@@ -250,16 +282,10 @@ def handle_edit_command(phone_number, message, media_url=None):
             return "❌ Invalid field. Use: price, description, title, category, or image"
         
         if success:
-            # Redeploy the shop with updated product
-            product_data = get_product(product_id)
-            if product_data:
-                if DEPLOY_AVAILABLE:
-                    build_and_host(product_id, product_data.get('description', ''), product_data.get('images', []), product_data.get('title', ''), product_data.get('price', 350))
-                    # Auto-deploy to Firebase
-                    deploy_to_firebase()
-                else:
-                    build_and_host(product_id, product_data.get('description', ''), product_data.get('images', []), product_data.get('title', ''), product_data.get('price', 350))
-            return f"✅ Updated {field} for product {product_id[:8]}"
+            # The catalog change is saved; pages and the deploy follow in the background
+            if not media_pool.submit("edit", phone_number, publish_edit_background, phone_number, product_id, field):
+                return f"✅ Updated {field} for product {product_id[:8]}. It will show on your shop with the next update."
+            return f"✅ Updated {field} for product {product_id[:8]}. I'll message you when it's live."
         else:
             return "❌ Product not found. Check the product ID."
             
@@ -267,23 +293,58 @@ def handle_edit_command(phone_number, message, media_url=None):
         logger.error(f"Edit command error: {e}")
         return f"❌ Error: {str(e)}"
 
-def handle_myproducts_command(phone_number):
-    """Send user their product list"""
+def send_whatsapp(phone_number, body):
+    """Send a message outside a webhook reply (skipped without Twilio credentials)"""
+    twilio_client = get_twilio_client()
+    if twilio_client:
+        twilio_client.messages.create(body=body, from_="whatsapp:+14155238886", to=phone_number)
+
+def publish_edit_background(phone_number, product_id, field):
+    """Rebuild the pages showing an edited product, then tell the seller once it's live"""
     try:
-        products_file = "products.json"
-        if not os.path.exists(products_file):
-            return "You don't have any products yet. Send a photo to create your first shop!"
+        product_data = get_product(product_id)
+        if not product_data:
+            return
+        shop_url = build_and_host(product_id, product_data.get('description', ''), product_data.get('images', []), product_data.get('title', ''), product_data.get('price', 350))
+        live_message = f"🌐 Your {field} change for product {product_id[:8]} is live: {shop_url}"
+        if DEPLOY_AVAILABLE:
+            # Re-renders only the seller page and index sections showing this product
+            create_shop_index()
+            # Deployed with any other changes once they settle
+            schedule_deploy(f"edit {product_id[:8]}", on_live=lambda: send_whatsapp(phone_number, live_message))
+        else:
+            send_whatsapp(phone_number, live_message)
+    except Exception as e:
+        logger.error(f"Error publishing edit of {product_id}: {e}")
+        send_whatsapp(phone_number, f"⚠️ Your change to product {product_id[:8]} is saved, but the shop page couldn't be updated yet.")
+
+def process_image_edit_background(media_url, phone_number, product_id):
+    """Process a replacement photo, save it on the product and publish the change"""
+    try:
+        image_content = download_twilio_media(media_url)
+        image_filename = f"{uuid.uuid4().hex}.jpg"
+        image_path = save_image(image_content, image_filename)
         
-        with open(products_file, "r") as f:
-            data = json.load(f)
+        if IMAGEN_AVAILABLE:
+            image_urls = remove_bg_and_upload(image_path)
+        else:
+            image_urls = [f"https://storage.googleapis.com/craftlink-images/fallback{i}.jpg" for i in range(1,5)]
         
-        user_products = []
+        if update_product(product_id, "images", image_urls):
+            publish_edit_background(phone_number, product_id, "image")
+        else:
+            send_whatsapp(phone_number, "❌ Product not found. Check the product ID.")
+    except Exception as e:
+        logger.error(f"Error processing image edit for {product_id}: {e}")
+        send_whatsapp(phone_number, "⚠️ Sorry, I couldn't process that photo. Please try sending it again.")
+
+def handle_myproducts_command(phone_number):
+    """Send user their product list"""
+    try:
         user_phone = phone_number.replace("whatsapp:", "")
         
-        for product in data.get("products", []):
-            # Simple user matching by phone number pattern
-            if user_phone in product.get("id", "") or user_phone in product.get("user_phone", ""):
-                user_products.append(product)
+        # Answered from the seller -> products index, not a scan of the whole catalog
+        user_products = get_products_by_seller(user_phone)
         
         if not user_products:
             return "You don't have any products yet. Send a photo to create your first shop!"
@@ -332,7 +393,8 @@ def handle_profile_command(phone_number, message):
             field = parts[2].lower()
             value = " ".join(parts[3:])
             
-            profile = get_seller_profile(user_phone) or {}
+            # A new dict: the stored profile only changes through update_seller_profile
+            profile = dict(get_seller_profile(user_phone) or {})
             
             if field == "name":
                 profile["name"] = value
@@ -470,8 +532,8 @@ def process_image_background(media_url, phone_number):
             # Update shop index to include new product
             if DEPLOY_AVAILABLE:
                 create_shop_index()
-                # Auto-deploy to Firebase
-                deploy_to_firebase()
+                # Deployed with any other changes once they settle
+                schedule_deploy(f"product {product_id[:8]}")
             
             # Send shop link
             twilio_client.messages.create(
@@ -554,8 +616,8 @@ def process_video_background(media_url, phone_number, caption=""):
         # Update shop index to include new reel
         if DEPLOY_AVAILABLE:
             create_shop_index()
-            # Auto-deploy to Firebase
-            deploy_to_firebase()
+            # Deployed with any other changes once they settle
+            schedule_deploy("reel")
         
         # Send confirmation
         if twilio_client:
@@ -622,12 +684,11 @@ def whatsapp_reply():
             logger.info(f"Processing reel command: {Body}")
             if NumMedia != "0" and MediaUrl0 and MediaContentType0 and "video" in MediaContentType0:
                 caption = Body[4:].strip() if len(Body) > 4 else ""
-                # Send immediate response
-                resp.message("🎥 Processing your video for reels...")
-                # Process video in background
-                thread = Thread(target=process_video_background, args=(MediaUrl0, From, caption))
-                thread.daemon = True
-                thread.start()
+                # Process video in background, then send immediate response
+                if media_pool.submit("reel", From, process_video_background, MediaUrl0, From, caption):
+                    resp.message("🎥 Processing your video for reels...")
+                else:
+                    resp.message(BUSY_MESSAGE)
             else:
                 resp.message("❌ Please send a video with the reel command. Example: reel Check out my new craft!")
             
@@ -643,12 +704,11 @@ def whatsapp_reply():
                 resp.message("🎥 Got your video! Would you like to add it to reels? Reply 'reel' followed by a caption to add it.")
             else:
                 logger.info(f"Processing image: {MediaUrl0}")
-                # Send immediate response to prevent timeout
-                resp.message("📸 Got your image! Processing it now with AI... I'll send the analysis and shop link in a moment.")
-                # Process image in background
-                thread = Thread(target=process_image_background, args=(MediaUrl0, From))
-                thread.daemon = True
-                thread.start()
+                # Process image in background, then send immediate response to prevent timeout
+                if media_pool.submit("product", From, process_image_background, MediaUrl0, From):
+                    resp.message("📸 Got your image! Processing it now with AI... I'll send the analysis and shop link in a moment.")
+                else:
+                    resp.message(BUSY_MESSAGE)
             
         else:
             if message_body in ["hi", "hello", "hey", "start", "नमस्ते"]:
@@ -697,31 +757,56 @@ def health_check():
             "deployment": DEPLOY_AVAILABLE,
             "shipping": SHIPPING_AVAILABLE,
             "sms": SMS_AVAILABLE
-        }
+        },
+        "deploy": deploy_state(),
+        "media_pool": media_pool.stats()
     })
 
 @app.route('/')
 def home():
     return "✅ KalaaSaarathi Server is Running! Visit /whatsapp for WhatsApp webhook"
 
+# Catalog GET responses are served from pre-serialized, precompressed bytes;
+# entries rebuild once the catalog version moves past the one they were built at
+response_cache = ResponseCache()
+
+def cached_json(key, version, build):
+    """Flask response for a cached JSON payload, or None if build() found nothing"""
+    entry = response_cache.get(key, version, build)
+    if entry is None:
+        return None
+    status, body, headers = response_parts(
+        entry, request.headers.get('Accept-Encoding'), request.headers.get('If-None-Match'))
+    return Response(body, status=status, headers=headers)
+
 # Additional API endpoints
 @app.route('/api/products', methods=['GET'])
 def get_products():
     category = request.args.get('category')
     artisan = request.args.get('artisan')
     search = request.args.get('search')
+    cursor = request.args.get('cursor')
+    fields = request.args.get('fields')
+    
+    try:
+        limit = int(request.args.get('limit', 48))
+    except ValueError:
+        return jsonify({"error": "limit must be a number"}), 400
     
     try:
         if DEPLOY_AVAILABLE:
-            products = get_all_products()
+            # Paginated, newest first; ?fields=id,title,price,image trims each product
+            key = ('products', tuple(sorted(request.args.items(multi=True))))
+            return cached_json(key, catalog_version(),
+                               lambda: list_products(limit, cursor, category, artisan, search, fields))
+        
+        products_file = "products.json"
+        if os.path.exists(products_file):
+            with open(products_file, "r") as f:
+                data = json.load(f)
+                products = data.get("products", [])
         else:
-            products_file = "products.json"
-            if os.path.exists(products_file):
-                with open(products_file, "r") as f:
-                    data = json.load(f)
-                    products = data.get("products", [])
-            else:
-                products = []
+            products = []
         
         # Filter by category if provided
         if category:
@@ -729,7 +814,7 @@ def get_products():
         
         # Filter by artisan if provided
         if artisan:
-            products = [p for p in products if p.get("artisan_phone") == artisan]
+            products = [p for p in products if (p.get("artisan_phone") or p.get("user_phone")) == artisan]
         
         # Search by title or description
         if search:
@@ -738,32 +823,37 @@ def get_products():
                        if search_lower in p.get("title", "").lower() 
                        or search_lower in p.get("description", "").lower()]
         
-        return jsonify({"products": products})
+        return jsonify({"products": products[:max(1, min(limit, 200))], "next_cursor": None})
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
     except Exception as e:
         logger.error(f"Error loading products: {e}")
-        return jsonify({"products": []})
+        return jsonify({"products": [], "next_cursor": None})
 
 @app.route('/api/products/<product_id>', methods=['GET'])
 def get_product_api(product_id):
     try:
-        product = get_product(product_id)
-        if product:
-            return jsonify({
-                "success": True,
-                "product": product
-            })
-        else:
-            return jsonify({"success": False, "error": "Product not found"}), 404
+        def build():
+            product = get_product(product_id)
+            return {"success": True, "product": product} if product else None
+        
+        version = catalog_version() if DEPLOY_AVAILABLE else None
+        response = cached_json(('product', product_id), version, build)
+        if response is not None:
+            return response
+        return jsonify({"success": False, "error": "Product not found"}), 404
     except Exception as e:
         return jsonify({"success": False, "error": f"Error fetching product: {str(e)}"}), 500
 
+CATEGORIES = [
+    "pottery", "textiles", "jewelry", "paintings", "wooden",
+    "metalwork", "leather", "papercraft", "home-decor", "accessories"
+]
+
 @app.route('/api/categories', methods=['GET'])
 def get_categories():
-    categories = [
-        "pottery", "textiles", "jewelry", "paintings", "wooden",
-        "metalwork", "leather", "papercraft", "home-decor", "accessories"
-    ]
-    return jsonify({"categories": categories})
+    # The list is fixed, so one serialized copy serves every request
+    return cached_json(('categories',), 'static', lambda: {"categories": CATEGORIES})
 
 @app.route('/api/test', methods=['GET'])
 def test_endpoint():
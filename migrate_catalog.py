@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+import json
+import os
+import sys
+
+from catalog_store import ProductStore, SellerStore, ReelStore
+from catalog_sqlite import SqliteProductStore, SqliteSellerStore, SqliteReelStore
+
+# Sources in increasing priority: a record found in a later file wins
+PRODUCT_SOURCES = ["src/app/product/static_products.json", "public/products.json", "out/products.json"]
+SELLER_SOURCES = ["public/sellers.json", "out/sellers.json"]
+REEL_SOURCES = ["public/reels.json", "out/reels.json"]
+
+
+def load_records(path, collection, json_store_class):
+    """Read a catalog file: {"products": [...]} layout, JSON lines, or a live out/ store"""
+    if not os.path.exists(path):
+        return []
+
+    if os.path.normpath(path).startswith("out" + os.sep):
+        # Include mutations still sitting in the append-only log
+        return json_store_class(path).all()
+
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    try:
+        data = json.loads(content)
+        return data.get(collection, []) if isinstance(data, dict) else data
+    except ValueError:
+        # static_products.json is one product per line
+        return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+def migrate_collection(sources, collection, key_field, json_store_class, sqlite_store):
+    merged = {}
+    skipped = 0
+    for path in sources:
+        for record in load_records(path, collection, json_store_class):
+            key = record.get(key_field)
+            if not key:
+                skipped += 1
+                continue
+            merged[key] = {**merged.get(key, {}), **record}
+
+    records = sorted(merged.values(), key=lambda r: r.get("created_at") or "")
+    sqlite_store.bulk_upsert(records)
+    print(f"✅ Imported {len(records)} {collection} ({skipped} without {key_field} skipped)")
+    return len(records)
+
+
+def migrate(db_path="./catalog.db"):
+    """One-shot import of every JSON catalog file into the SQLite backend"""
+    migrate_collection(PRODUCT_SOURCES, "products", "id", ProductStore,
+                       SqliteProductStore(db_path, "./out/products.json"))
+    migrate_collection(SELLER_SOURCES, "sellers", "phone", SellerStore,
+                       SqliteSellerStore(db_path, "./out/sellers.json"))
+    migrate_collection(REEL_SOURCES, "reels", "id", ReelStore,
+                       SqliteReelStore(db_path, "./out/reels.json"))
+    print(f"🗄️ Catalog database ready: {db_path} (set CATALOG_BACKEND=sqlite to use it)")
+
+
+if __name__ == "__main__":
+    migrate(sys.argv[1] if len(sys.argv) > 1 else os.environ.get("CATALOG_DB", "./catalog.db"))
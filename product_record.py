@@ -0,0 +1,117 @@
+import sys
+from collections.abc import Mapping
+
+# Known product fields, in the order the bot writes them; anything else a
+# record carries is kept in a small per-record dict
+FIELDS = (
+    "id", "title", "description", "price", "images", "image_variants", "category",
+    "artisan_name", "artisan_region", "artisan_phone", "created_at", "user_phone",
+    "rating", "reviews_count", "orders_completed", "in_stock",
+)
+_FIELD_SET = frozenset(FIELDS)
+# Values shared by many products; interning keeps one copy of each
+INTERNED_FIELDS = frozenset({"category", "artisan_name", "artisan_region", "artisan_phone", "user_phone"})
+# Stored as tuples, serialized as lists
+SEQUENCE_FIELDS = frozenset({"images", "image_variants"})
+
+_MISSING = object()
+
+
+def unique_images(urls):
+    """Image URLs with repeats and blanks dropped, first-seen order kept"""
+    if not urls:
+        return ()
+    if isinstance(urls, str):
+        urls = [urls]
+    return tuple(dict.fromkeys(url for url in urls if url))
+
+
+class Product(Mapping):
+    """Read-only, slotted product record for the in-memory catalog.
+
+    Behaves like the product dicts it replaces (``product["title"]``,
+    ``.get()``, ``{**product}``) at a fraction of their size: no per-record
+    hash table, interned seller/category strings and deduplicated images.
+    ``images`` holds unique URLs; ``image_variants`` holds tags naming the
+    renditions available for each of them. ``to_dict()`` gives back the JSON
+    shape the catalog files use.
+    """
+
+    __slots__ = FIELDS + ("_extra",)
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        product = cls.__new__(cls)
+        extra = None
+        for key, value in data.items():
+            if key in _FIELD_SET:
+                if key in INTERNED_FIELDS and type(value) is str:
+                    value = sys.intern(value)
+                elif key == "images":
+                    value = unique_images(value)
+                elif key == "image_variants":
+                    value = tuple(sys.intern(tag) for tag in value or ())
+                setattr(product, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        product._extra = extra
+        return product
+
+    def to_dict(self):
+        data = {}
+        for field in FIELDS:
+            value = getattr(self, field, _MISSING)
+            if value is not _MISSING:
+                data[field] = list(value) if field in SEQUENCE_FIELDS else value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        return self._extra.get(key, default) if self._extra else default
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        return bool(self._extra) and key in self._extra
+
+    def __iter__(self):
+        for field in FIELDS:
+            if hasattr(self, field):
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __reduce__(self):
+        return (Product.from_dict, (self.to_dict(),))
+
+    def __repr__(self):
+        return f"Product({self.to_dict()!r})"
+
+
+def json_default(value):
+    """``default=`` hook letting json.dumps serialize Product (and other mappings)"""
+    if isinstance(value, Product):
+        return value.to_dict()
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,233 @@
+"""Where a finished build of out/ gets published.
+
+deploy_shop picks a Publisher from PUBLISH_TARGET: Firebase Hosting (see
+deploy_shop.FirebasePublisher), a local directory for nginx or any static
+server, or an S3-compatible bucket. Every publisher gets the build manifest
+and the paths changed since the last publish, and returns True once the new
+build is live.
+"""
+import hashlib
+import hmac
+import json
+import mimetypes
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import quote, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from catalog_store import temp_path, write_json_atomic
+from site_compress import compressed_paths
+
+# Content-hashed files never change, so caches may keep them for good
+IMMUTABLE_PREFIXES = ("assets/",)
+
+
+def cache_control(path):
+    if path.startswith(IMMUTABLE_PREFIXES):
+        return "public, max-age=31536000, immutable"
+    return "public, max-age=0, must-revalidate"
+
+
+def content_type(path):
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+class Publisher:
+    """A place a build can be published to"""
+
+    name = "none"
+
+    def publish(self, manifest, changed):
+        """Make the manifest's files live; returns True on success"""
+        raise NotImplementedError
+
+    def state(self):
+        """What's live, for /health"""
+        return {}
+
+
+class LocalPublisher(Publisher):
+    """Publishes into a directory a web server (e.g. nginx) serves as ``<root>/current``.
+
+    Each publish becomes ``<root>/releases/<timestamp>``, made of hard links
+    to the files in out/ (every site-file writer, rebuild.py included, goes
+    through catalog_store.write_file_atomic, which replaces files instead of
+    rewriting them in place, so a release never changes under the server),
+    with the .gz/.br
+    siblings for ``gzip_static``/``brotli_static``. The ``current`` symlink
+    is then swapped atomically, so requests see either the old build or the
+    new one, never a mix. The newest ``keep`` releases are kept for rollback.
+    """
+
+    name = "local"
+
+    def __init__(self, root, keep=3):
+        self.root = root
+        self.keep = keep
+        self._last = None
+
+    @property
+    def current(self):
+        return os.path.join(self.root, "current")
+
+    def _place(self, source, target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.link(source, target)
+        except OSError:
+            # Another filesystem (or no hard links): copy instead
+            shutil.copy2(source, target)
+
+    def publish(self, manifest, changed):
+        start = time.perf_counter()
+        releases = os.path.join(self.root, "releases")
+        release = os.path.join(releases, datetime.now().strftime("%Y%m%d-%H%M%S-%f"))
+        os.makedirs(release)
+        files = 0
+        for path in manifest.files():
+            for rel_path in [path] + compressed_paths(path):
+                source = os.path.join(manifest.root, rel_path)
+                if os.path.exists(source):
+                    self._place(source, os.path.join(release, rel_path))
+                    files += 1
+
+        # Atomic swap: rename a new symlink over the old one
+        link = temp_path(self.current)
+        os.symlink(os.path.relpath(release, self.root), link)
+        os.replace(link, self.current)
+
+        for old in sorted(os.listdir(releases))[:-self.keep]:
+            shutil.rmtree(os.path.join(releases, old), ignore_errors=True)
+        self._last = {"release": release, "files": files, "changed": len(changed),
+                      "seconds": round(time.perf_counter() - start, 3)}
+        print(f"✅ Published {files} files to {self.current} -> {release} in {self._last['seconds']}s")
+        return True
+
+    def state(self):
+        return {"current": os.path.realpath(self.current) if os.path.islink(self.current) else None,
+                "last_publish": self._last}
+
+
+def sign_v4(method, url, headers, payload_hash, access_key, secret_key, region, service="s3", now=None):
+    """AWS Signature Version 4: headers plus x-amz-date, x-amz-content-sha256 and Authorization"""
+    now = now or datetime.now(timezone.utc)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    date = amz_date[:8]
+    parts = urlsplit(url)
+    headers = {**headers, "host": parts.netloc, "x-amz-date": amz_date, "x-amz-content-sha256": payload_hash}
+
+    signed = {name.lower(): " ".join(str(value).split()) for name, value in headers.items()
+              if name.lower() == "host" or name.lower().startswith("x-amz-") or name.lower() == "content-type"}
+    signed_headers = ";".join(sorted(signed))
+    query = "&".join(f"{quote(key, safe='-_.~')}={quote(value, safe='-_.~')}" for key, _, value in sorted(
+        pair.partition("=") for pair in parts.query.split("&") if pair))
+    canonical = "\n".join([
+        method,
+        # Already URI-encoded once, which is what S3 expects (no double encoding)
+        parts.path or "/",
+        query,
+        "".join(f"{name}:{signed[name]}\n" for name in sorted(signed)),
+        signed_headers,
+        payload_hash,
+    ])
+    scope = f"{date}/{region}/{service}/aws4_request"
+    to_sign = "\n".join(["AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical.encode("utf-8")).hexdigest()])
+
+    key = f"AWS4{secret_key}".encode("utf-8")
+    for part in (date, region, service, "aws4_request"):
+        key = hmac.new(key, part.encode("utf-8"), hashlib.sha256).digest()
+    signature = hmac.new(key, to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    headers["Authorization"] = (f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+                                f"SignedHeaders={signed_headers}, Signature={signature}")
+    return headers
+
+
+class S3Publisher(Publisher):
+    """Publishes to an S3-compatible bucket (AWS, MinIO, R2...) with SigV4-signed requests.
+
+    Keeps the sha256 of every object it uploaded in ``state_path``, so a
+    publish only PUTs files whose content changed and DELETEs files that are
+    gone, concurrently over one pooled session. Objects use path-style URLs:
+    ``<endpoint>/<bucket>/<prefix><path>``.
+    """
+
+    name = "s3"
+
+    def __init__(self, endpoint, bucket, access_key, secret_key, region="us-east-1", prefix="",
+                 state_path="./s3-publish.json", workers=16):
+        self.endpoint = endpoint.rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.prefix = prefix
+        self.state_path = state_path
+        self.workers = workers
+        self._last = None
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=workers, max_retries=3)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _url(self, path):
+        return f"{self.endpoint}/{self.bucket}/{quote(self.prefix + path, safe='/-_.~')}"
+
+    def _request(self, method, path, data=b"", headers=None, payload_hash=None):
+        url = self._url(path)
+        payload_hash = payload_hash or hashlib.sha256(data).hexdigest()
+        signed = sign_v4(method, url, headers or {}, payload_hash, self.access_key, self.secret_key, self.region)
+        response = self.session.request(method, url, data=data, headers=signed, timeout=60)
+        if response.status_code >= 300 and not (method == "DELETE" and response.status_code == 404):
+            raise OSError(f"{method} {url} -> {response.status_code}: {response.text[:300]}")
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("files", {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable {self.state_path}: {e}")
+            return {}
+
+    def publish(self, manifest, changed):
+        start = time.perf_counter()
+        previous = self._load_state()
+        files = manifest.files()
+        uploads = sorted(path for path, entry in files.items() if previous.get(path) != entry["sha256"])
+        deletes = sorted(path for path in previous if path not in files)
+
+        def upload(path):
+            with open(os.path.join(manifest.root, path), "rb") as f:
+                data = f.read()
+            # Hash what is sent, not what the manifest says: the file may have been rewritten since
+            digest = hashlib.sha256(data).hexdigest()
+            self._request("PUT", path, data, {"content-type": content_type(path),
+                                              "cache-control": cache_control(path)},
+                          payload_hash=digest)
+            return digest, len(data)
+
+        def delete(path):
+            self._request("DELETE", path)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            uploaded = dict(zip(uploads, pool.map(upload, uploads)))
+            list(pool.map(delete, deletes))
+
+        uploaded_bytes = sum(size for _, size in uploaded.values())
+        # What the bucket now holds, so a file that changed mid-publish goes up again next time
+        state = {path: uploaded[path][0] if path in uploaded else entry["sha256"] for path, entry in files.items()}
+        write_json_atomic(self.state_path, {"files": state})
+        self._last = {"uploaded": len(uploads), "deleted": len(deletes), "bytes": uploaded_bytes,
+                      "seconds": round(time.perf_counter() - start, 3)}
+        print(f"✅ Published to s3://{self.bucket}/{self.prefix}: {len(uploads)} uploaded, "
+              f"{len(deletes)} deleted in {self._last['seconds']}s")
+        return True
+
+    def state(self):
+        return {"bucket": self.bucket, "endpoint": self.endpoint, "last_publish": self._last}
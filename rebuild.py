@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Regenerate every page of the static shop in parallel.
+
+    python rebuild.py [--workers N] [--shard-size N]
+
+Products and sellers are split into shards that a process pool renders and
+writes concurrently, so a large catalog uses every core. The category
+listings and the index are built last in this process. Pages whose content
+hash matches build-manifest.json are not rewritten; the manifest records
+every page's size and hash, the files changed since the last deploy, and
+this run's render timings. Changed text files then get .gz/.br siblings.
+Product, seller and reel cards come from the fragment cache, so only cards
+whose record changed are rendered again.
+With SITE_MODE=shell, products get JSON documents instead of pages.
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from build_manifest import content_hash, write_if_changed
+from catalog_store import write_file_atomic
+from site_compress import precompress
+
+SHOP_DIR = "./out"
+
+
+def _render_shard(kind, items, known, shop_dir, prerender_dir=None):
+    """Worker: render one shard of pages, writing those whose hash isn't in known.
+
+    Kind "document" is a product's JSON document for shell mode; with
+    prerender_dir its full page is also kept there for crawlers.
+    Returns [(path, bytes, sha256, ms, written, error)] and the card fragments
+    rendered along the way, for the parent's fragment cache.
+    """
+    # Imported here so each worker compiles the templates once, not once per shard
+    from site_templates import fragments, render_product_page, render_product_document, render_seller_page
+
+    results = []
+    for item in items:
+        start = time.perf_counter()
+        path = _page_path(kind, item)
+        try:
+            if kind == "product":
+                html = render_product_page(item)
+            elif kind == "document":
+                html = render_product_document(item)
+                if prerender_dir:
+                    write_if_changed(os.path.join(prerender_dir, "product", f"{item['id']}.html"),
+                                     render_product_page(item))
+            else:
+                html = render_seller_page(*item)
+            data = html.encode("utf-8")
+            digest = content_hash(data)
+            full_path = os.path.join(shop_dir, path)
+            written = known.get(path) != (digest, len(data)) or not os.path.exists(full_path)
+            if written:
+                # Replaced, not rewritten in place: published releases hard-link these files
+                write_file_atomic(full_path, data)
+            results.append((path, len(data), digest,
+                            (time.perf_counter() - start) * 1000, written, None))
+        except Exception as e:
+            results.append((path, 0, None, (time.perf_counter() - start) * 1000, False, str(e)))
+    return results, fragments.take_new()
+
+
+def _page_path(kind, item):
+    if kind == "product":
+        return f"product/{item['id']}.html"
+    if kind == "document":
+        return f"product/{item['id']}.json"
+    return f"seller/{item[0]['phone']}.html"
+
+
+def _shards(kind, items, size, files):
+    """Work units of up to size items, each with the known hashes of its pages"""
+    shards = []
+    for i in range(0, len(items), size):
+        chunk = items[i:i + size]
+        known = {}
+        for item in chunk:
+            path = _page_path(kind, item)
+            entry = files.get(path)
+            if entry:
+                known[path] = (entry["sha256"], entry["bytes"])
+        shards.append((kind, chunk, known))
+    return shards
+
+
+def rebuild(workers=None, shard_size=None):
+    """Render all product and seller pages on a process pool, then the index; returns run stats"""
+    from deploy_shop import (product_store, seller_store, get_products_by_seller,
+                             compact_catalog, update_index_page, manifest,
+                             build_category_listing, update_listing_index, write_site_assets,
+                             SITE_MODE, PRERENDER_PRODUCTS, PRERENDER_DIR, product_stale_output)
+    from site_templates import CATEGORIES, fragments
+
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+
+    # Fresh JSON snapshots and the stylesheet go out with the pages
+    compact_catalog()
+    write_site_assets()
+    products = product_store.all()
+    sellers = [(seller, get_products_by_seller(seller["phone"])[:9])
+               for seller in seller_store.all() if seller.get("phone")]
+    total = len(products) + len(sellers)
+
+    # Several shards per worker keeps every core busy until the end
+    shard_size = shard_size or max(50, min(1000, total // (workers * 8) or 1))
+    files = manifest.files()
+    product_kind = "document" if SITE_MODE == "shell" else "product"
+    jobs = _shards(product_kind, products, shard_size, files) + _shards("seller", sellers, shard_size, files)
+    prerender_dir = PRERENDER_DIR if SITE_MODE == "shell" and PRERENDER_PRODUCTS else None
+
+    os.makedirs(f"{SHOP_DIR}/product", exist_ok=True)
+    os.makedirs(f"{SHOP_DIR}/seller", exist_ok=True)
+    print(f"🔨 Rebuilding {len(products)} product {'documents' if SITE_MODE == 'shell' else 'pages'} "
+          f"and {len(sellers)} seller pages "
+          f"on {workers} workers ({len(jobs)} shards of {shard_size})")
+
+    results = []
+    next_report = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_render_shard, kind, items, known, SHOP_DIR, prerender_dir) for kind, items, known in jobs]
+        for future in as_completed(futures):
+            shard_results, new_fragments = future.result()
+            results.extend(shard_results)
+            fragments.update(new_fragments)
+            if len(results) >= next_report or len(results) == total:
+                elapsed = time.perf_counter() - started
+                print(f"   {len(results)}/{total} pages ({len(results) * 100 // max(total, 1)}%, "
+                      f"{len(results) / max(elapsed, 1e-9):,.0f} pages/s)")
+                next_report = len(results) + max(total // 10, 1)
+
+    # Category listings and the index go through the manifest themselves
+    start = time.perf_counter()
+    listing_files = sum(build_category_listing(category) for category in CATEGORIES)
+    listing_files += update_listing_index()
+    print(f"   {listing_files} category listing files changed ({time.perf_counter() - start:.1f}s)")
+
+    start = time.perf_counter()
+    before = files.get("index.html")
+    update_index_page()
+    manifest.track("index.html")
+    entry = manifest.files()["index.html"]
+    results.append(("index.html", entry["bytes"], entry["sha256"],
+                    (time.perf_counter() - start) * 1000, entry != before, None))
+
+    written = 0
+    for path, size, digest, _, was_written, error in results:
+        if error is None:
+            manifest.record(path, digest, size)
+            written += was_written
+    # Pages or documents left over from a build in the other SITE_MODE
+    removed = sum(manifest.remove(product_stale_output(product["id"])) for product in products)
+
+    seconds = time.perf_counter() - started
+    timings = sorted(ms for _, _, _, ms, _, error in results if error is None)
+    errors = {path: error for path, _, _, _, _, error in results if error}
+    stats = {
+        "built_at": datetime.now().isoformat(),
+        "workers": workers,
+        "seconds": round(seconds, 3),
+        "pages": len(results) - len(errors),
+        "written": written,
+        "listing_files": listing_files,
+        "removed": removed,
+        "timings_ms": {
+            "p50": round(statistics.median(timings), 3) if timings else 0,
+            "p95": round(timings[int(len(timings) * 0.95) - 1], 3) if timings else 0,
+            "max": round(timings[-1], 3) if timings else 0,
+        },
+        "slowest": [{"path": path, "ms": round(ms, 3)}
+                    for path, _, _, ms, _, _ in sorted(results, key=lambda r: r[3], reverse=True)[:5]],
+        "errors": errors,
+    }
+    start = time.perf_counter()
+    compressed = precompress(manifest, workers=workers)
+    stats["compressed"] = compressed
+    print(f"   🗜️ Precompressed {compressed} files ({time.perf_counter() - start:.1f}s)")
+    stats["fragments"] = fragments.stats()["fragments"]
+    manifest.save(last_rebuild=stats)
+    fragments.save()
+
+    print(f"✅ Rebuilt {stats['pages']} pages ({written} changed) in {seconds:.1f}s "
+          f"({len(results) / max(seconds, 1e-9):,.0f} pages/s; p50 {stats['timings_ms']['p50']} ms, "
+          f"p95 {stats['timings_ms']['p95']} ms, max {stats['timings_ms']['max']} ms)")
+    for entry in stats["slowest"]:
+        print(f"   🐢 {entry['path']}: {entry['ms']} ms")
+    if errors:
+        print(f"❌ {len(errors)} pages failed:")
+        for path, error in list(errors.items())[:10]:
+            print(f"   {path}: {error}")
+    print(f"📄 Manifest: {manifest.path} ({len(manifest.pending())} files to deploy)")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate every shop page in parallel")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--shard-size", type=int, default=None, help="pages per work unit")
+    args = parser.parse_args()
+    rebuild(args.workers, args.shard_size)
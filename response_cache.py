@@ -0,0 +1,133 @@
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from product_record import json_default
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Bodies smaller than this go out uncompressed; the headers would eat the saving
+MIN_COMPRESS_SIZE = 512
+
+
+def accepted_encodings(accept_encoding):
+    """Codings from an Accept-Encoding header that the client accepts (q > 0)"""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(coding)
+    return accepted
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class CachedResponse:
+    """A serialized JSON body plus its precompressed variants, each with a strong ETag"""
+
+    __slots__ = ("version", "variants")
+
+    def __init__(self, payload, version):
+        self.version = version
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"),
+                          default=json_default).encode("utf-8")
+        etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+        # coding -> (body, etag); each representation gets its own strong ETag
+        self.variants = {None: (body, etag)}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            if BROTLI_AVAILABLE:
+                self.variants["br"] = (brotli.compress(body, quality=9), etag[:-1] + '-br"')
+            self.variants["gzip"] = (gzip.compress(body, compresslevel=9, mtime=0), etag[:-1] + '-gz"')
+
+    def select(self, accept_encoding):
+        """(coding or None, body, etag) for the best variant the client accepts"""
+        accepted = accepted_encodings(accept_encoding)
+        for coding in ("br", "gzip"):
+            if coding in self.variants and coding in accepted:
+                return (coding, *self.variants[coding])
+        return (None, *self.variants[None])
+
+
+class ResponseCache:
+    """LRU of serialized GET responses keyed by (endpoint, query).
+
+    Each entry remembers the catalog version it was built from; a lookup with
+    a newer version rebuilds it, so a mutation invalidates every cached
+    response without the writers having to know about this cache.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version, build):
+        """Cached response for key at version, building it via build() -> payload on a miss.
+
+        Returns None (and caches nothing) when build() returns None. A version
+        of None means the data can't be versioned, so the entry is never reused.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and version is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        # Build outside the lock; two concurrent misses just both build
+        payload = build()
+        if payload is None:
+            return None
+        entry = CachedResponse(payload, version)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def response_parts(entry, accept_encoding, if_none_match):
+    """(status, body, headers) for a cached entry, honouring Accept-Encoding and If-None-Match"""
+    coding, body, etag = entry.select(accept_encoding)
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return 304, b"", headers
+    headers["Content-Type"] = "application/json; charset=utf-8"
+    if coding:
+        headers["Content-Encoding"] = coding
+    return 200, body, headers
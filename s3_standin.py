@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Local stand-in for an S3-compatible object store (MinIO-style), for publishing offline.
+
+    python s3_standin.py [--port 9009] [--access-key minio] [--secret-key minio123]
+    PUBLISH_TARGET=s3 S3_ENDPOINT=http://127.0.0.1:9009 S3_BUCKET=shop \\
+        S3_ACCESS_KEY=minio S3_SECRET_KEY=minio123 python deploy_all.py
+
+Path-style PUT/GET/HEAD/DELETE on ``/<bucket>/<key>``, kept in memory.
+Every request must carry a valid SigV4 signature for the configured keys
+and a payload matching its x-amz-content-sha256, like a real store would
+check. Buckets are created on first write. ``/_stats`` shows the objects.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from publish_targets import sign_v4
+
+
+class Handler(BaseHTTPRequestHandler):
+    objects = None
+    lock = None
+    access_key = None
+    secret_key = None
+    requests_served = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status, code, message):
+        body = f"<Error><Code>{code}</Code><Message>{message}</Message></Error>".encode("utf-8")
+        self._reply(status, body, {"Content-Type": "application/xml"})
+
+    def _verify(self, data):
+        """Recompute the request's signature; returns an error message or None"""
+        authorization = self.headers.get("Authorization", "")
+        if not authorization.startswith("AWS4-HMAC-SHA256 "):
+            return "missing SigV4 authorization"
+        fields = dict(part.strip().split("=", 1) for part in authorization[len("AWS4-HMAC-SHA256 "):].split(","))
+        access_key, date, region, service, _ = fields["Credential"].split("/")
+        if access_key != self.access_key:
+            return "unknown access key"
+        payload_hash = self.headers.get("x-amz-content-sha256", "")
+        if data is not None and hashlib.sha256(data).hexdigest() != payload_hash:
+            return "payload does not match x-amz-content-sha256"
+        signed = {name: self.headers.get(name, "") for name in fields["SignedHeaders"].split(";")}
+        now = datetime.strptime(signed.get("x-amz-date", ""), "%Y%m%dT%H%M%SZ")
+        expected = sign_v4(self.command, f"http://{signed['host']}{self.path}",
+                           {name: value for name, value in signed.items() if name not in ("host", "x-amz-date")},
+                           payload_hash, access_key, self.secret_key, region, service, now=now)
+        if not hmac.compare_digest(expected["Authorization"], authorization):
+            return "signature does not match"
+        return None
+
+    def _handle(self, data=None):
+        error = self._verify(data)
+        if error:
+            return self._error(403, "SignatureDoesNotMatch", error)
+        bucket, _, key = self.path.lstrip("/").partition("/")
+        with self.lock:
+            self.requests_served[self.command] = self.requests_served.get(self.command, 0) + 1
+            if self.command == "PUT":
+                self.objects[(bucket, key)] = (data, {
+                    "Content-Type": self.headers.get("Content-Type", "application/octet-stream"),
+                    "Cache-Control": self.headers.get("Cache-Control", ""),
+                    "ETag": f'"{hashlib.md5(data).hexdigest()}"',
+                })
+                return self._reply(200, headers={"ETag": self.objects[(bucket, key)][1]["ETag"]})
+            if self.command == "DELETE":
+                self.objects.pop((bucket, key), None)
+                return self._reply(204)
+            stored = self.objects.get((bucket, key))
+        if stored is None:
+            return self._error(404, "NoSuchKey", key)
+        self._reply(200, stored[0], stored[1])
+
+    def do_PUT(self):
+        self._handle(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+
+    def do_DELETE(self):
+        self._handle()
+
+    def do_HEAD(self):
+        self._handle()
+
+    def do_GET(self):
+        if self.path == "/_stats":
+            with self.lock:
+                body = json.dumps({
+                    "objects": len(self.objects),
+                    "bytes": sum(len(data) for data, _ in self.objects.values()),
+                    "requests": self.requests_served,
+                }).encode("utf-8")
+            return self._reply(200, body, {"Content-Type": "application/json"})
+        self._handle()
+
+
+def make_server(port=9009, host="127.0.0.1", access_key="minio", secret_key="minio123"):
+    handler = type("S3Handler", (Handler,), {
+        "objects": {}, "lock": threading.Lock(), "requests_served": {},
+        "access_key": access_key, "secret_key": secret_key,
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for an S3-compatible object store")
+    parser.add_argument("--port", type=int, default=9009)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--access-key", default="minio")
+    parser.add_argument("--secret-key", default="minio123")
+    args = parser.parse_args()
+    server = make_server(args.port, args.host, args.access_key, args.secret_key)
+    print(f"🧪 S3 stand-in on http://{args.host}:{args.port} (access key {args.access_key})")
+    server.serve_forever()
@@ -0,0 +1,186 @@
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+
+# Words are runs of letters/digits; Devanagari needs its own range because
+# vowel signs and viramas are combining marks, which \w doesn't match
+TOKEN_RE = re.compile(r"#?[\w\u0900-\u097f]+")
+HASHTAG_RE = re.compile(r"#([\w\u0900-\u097f]+)")
+CAMEL_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "this", "to", "with",
+    "है", "हैं", "का", "की", "के", "और", "में", "से", "को", "पर", "यह",
+}
+
+# Title words count more than description words; hashtags and the category
+# are deliberate labels, so they sit in between
+FIELD_WEIGHTS = (("title", 3), ("category", 2), ("description", 1))
+HASHTAG_WEIGHT = 2
+
+
+def _normalize(word):
+    word = word.lower()
+    # Fold simple English plurals so "pots" finds "pot" (Devanagari is left alone)
+    if word.isascii() and len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Split text into index terms.
+
+    Handles English, Hindi (Devanagari) and the Hinglish mix Gemini writes.
+    A hashtag yields the whole tag and its camel-case parts, so
+    ``#HandloomWeaving`` matches "handloom", "weaving" and "handloomweaving".
+    """
+    if not text:
+        return []
+    text = unicodedata.normalize("NFC", str(text))
+    terms = []
+    for match in TOKEN_RE.finditer(text):
+        word = match.group().replace("_", "")
+        if word.startswith("#"):
+            word = word[1:]
+            parts = CAMEL_RE.findall(word)
+            if len(parts) > 1:
+                terms.extend(_normalize(part) for part in parts)
+        word = _normalize(word)
+        if word and word not in STOPWORDS:
+            terms.append(word)
+    return terms
+
+
+def trigrams(term):
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Incrementally maintained inverted index with BM25 ranking.
+
+    Postings map term -> {doc id: weighted term frequency}. Query terms that
+    aren't in the vocabulary fall back to similar vocabulary terms found via
+    a trigram index, so "handlom" still finds handloom products. Query time
+    depends on the postings of the query terms, not on the catalog size.
+    """
+
+    k1 = 1.2
+    b = 0.75
+    typo_threshold = 0.45
+    typo_candidates = 3
+
+    def __init__(self):
+        self._postings = {}
+        self._doc_terms = {}
+        self._doc_lengths = {}
+        self._total_length = 0
+        self._trigrams = {}
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._doc_terms
+
+    # ---- maintenance ---------------------------------------------------
+
+    @staticmethod
+    def _document_terms(product):
+        counts = Counter()
+        for field, weight in FIELD_WEIGHTS:
+            for term in tokenize(product.get(field)):
+                counts[term] += weight
+        text = f"{product.get('title') or ''} {product.get('description') or ''}"
+        for tag in HASHTAG_RE.findall(text):
+            for term in tokenize("#" + tag):
+                counts[term] += HASHTAG_WEIGHT - 1
+        return counts
+
+    def add(self, product):
+        """Index (or re-index) a product dict"""
+        doc_id = product["id"]
+        self.remove(doc_id)
+        counts = self._document_terms(product)
+        if not counts:
+            return
+        self._doc_terms[doc_id] = counts
+        length = sum(counts.values())
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+        for term, frequency in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                for gram in trigrams(term):
+                    self._trigrams.setdefault(gram, set()).add(term)
+            postings[doc_id] = frequency
+
+    def remove(self, doc_id):
+        counts = self._doc_terms.pop(doc_id, None)
+        if counts is None:
+            return
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        for term in counts:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                for gram in trigrams(term):
+                    terms = self._trigrams.get(gram)
+                    if terms is not None:
+                        terms.discard(term)
+                        if not terms:
+                            del self._trigrams[gram]
+
+    def clear(self):
+        self.__init__()
+
+    # ---- querying ------------------------------------------------------
+
+    def _similar_terms(self, term):
+        """Vocabulary terms whose trigram sets overlap ``term``'s (Jaccard similarity)"""
+        grams = trigrams(term)
+        shared = Counter()
+        for gram in grams:
+            for candidate in self._trigrams.get(gram, ()):
+                shared[candidate] += 1
+        scored = []
+        for candidate, overlap in shared.items():
+            similarity = overlap / (len(grams) + len(trigrams(candidate)) - overlap)
+            if similarity >= self.typo_threshold:
+                scored.append((similarity, candidate))
+        return [(candidate, similarity) for similarity, candidate in heapq.nlargest(self.typo_candidates, scored)]
+
+    def search(self, query, limit=None):
+        """Return [(doc id, score)] best first"""
+        doc_count = len(self._doc_terms)
+        if not doc_count:
+            return []
+        average_length = self._total_length / doc_count
+
+        scores = {}
+        for term in set(tokenize(query)):
+            if term in self._postings:
+                expansions = [(term, 1.0)]
+            elif len(term) >= 3:
+                expansions = self._similar_terms(term)
+            else:
+                expansions = []
+
+            for expanded, weight in expansions:
+                postings = self._postings[expanded]
+                df = len(postings)
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight * idf * tf * (self.k1 + 1) / (tf + norm)
+
+        # Equal scores go by id, so every backend (and index build order) ranks alike
+        ranked = scores.items()
+        if limit is not None:
+            return heapq.nsmallest(limit, ranked, key=lambda item: (-item[1], item[0]))
+        return sorted(ranked, key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,329 @@
+"""Build-time CSS for the static shop.
+
+The pages used to load the Tailwind CDN runtime (which compiles CSS in the
+browser), all of Font Awesome's CSS and a blocking Google Fonts @import.
+Instead, the templates are scanned for the utility classes and icons they
+actually use, and one minified stylesheet is generated from the maps below,
+named after its content hash so it can be cached forever:
+
+    python site_assets.py    # print what the stylesheet contains
+"""
+import hashlib
+import os
+import re
+import sys
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+ASSET_DIR = "assets"
+
+# ---- utility classes (Tailwind-compatible names and values) -------------
+
+BREAKPOINTS = {"sm": 640, "md": 768, "lg": 1024, "xl": 1280, "2xl": 1536}
+STATES = {"hover": ":hover", "focus": ":focus", "active": ":active"}
+
+SPACING = {
+    "0": "0", "px": "1px", "0.5": ".125rem", "1": ".25rem", "1.5": ".375rem", "2": ".5rem",
+    "2.5": ".625rem", "3": ".75rem", "3.5": ".875rem", "4": "1rem", "5": "1.25rem", "6": "1.5rem",
+    "7": "1.75rem", "8": "2rem", "9": "2.25rem", "10": "2.5rem", "11": "2.75rem", "12": "3rem",
+    "14": "3.5rem", "16": "4rem", "20": "5rem", "24": "6rem", "28": "7rem", "32": "8rem",
+    "36": "9rem", "40": "10rem", "44": "11rem", "48": "12rem", "56": "14rem", "64": "16rem",
+    "72": "18rem", "80": "20rem", "96": "24rem",
+}
+
+COLORS = {
+    "amber": ("#fffbeb", "#fef3c7", "#fde68a", "#fcd34d", "#fbbf24",
+              "#f59e0b", "#d97706", "#b45309", "#92400e", "#78350f"),
+    "green": ("#f0fdf4", "#dcfce7", "#bbf7d0", "#86efac", "#4ade80",
+              "#22c55e", "#16a34a", "#15803d", "#166534", "#14532d"),
+    "gray": ("#f9fafb", "#f3f4f6", "#e5e7eb", "#d1d5db", "#9ca3af",
+             "#6b7280", "#4b5563", "#374151", "#1f2937", "#111827"),
+    "red": ("#fef2f2", "#fee2e2", "#fecaca", "#fca5a5", "#f87171",
+            "#ef4444", "#dc2626", "#b91c1c", "#991b1b", "#7f1d1d"),
+    "blue": ("#eff6ff", "#dbeafe", "#bfdbfe", "#93c5fd", "#60a5fa",
+             "#3b82f6", "#2563eb", "#1d4ed8", "#1e40af", "#1e3a8a"),
+}
+SHADES = ("50", "100", "200", "300", "400", "500", "600", "700", "800", "900")
+
+FONT_SIZES = {
+    "xs": (".75rem", "1rem"), "sm": (".875rem", "1.25rem"), "base": ("1rem", "1.5rem"),
+    "lg": ("1.125rem", "1.75rem"), "xl": ("1.25rem", "1.75rem"), "2xl": ("1.5rem", "2rem"),
+    "3xl": ("1.875rem", "2.25rem"), "4xl": ("2.25rem", "2.5rem"), "5xl": ("3rem", "1"),
+}
+FONT_WEIGHTS = {"light": 300, "normal": 400, "medium": 500, "semibold": 600, "bold": 700}
+RADII = {"none": "0", "sm": ".125rem", "": ".25rem", "md": ".375rem", "lg": ".5rem",
+         "xl": ".75rem", "2xl": "1rem", "3xl": "1.5rem", "full": "9999px"}
+SHADOWS = {
+    "sm": "0 1px 2px 0 rgb(0 0 0/.05)",
+    "": "0 1px 3px 0 rgb(0 0 0/.1),0 1px 2px -1px rgb(0 0 0/.1)",
+    "md": "0 4px 6px -1px rgb(0 0 0/.1),0 2px 4px -2px rgb(0 0 0/.1)",
+    "lg": "0 10px 15px -3px rgb(0 0 0/.1),0 4px 6px -4px rgb(0 0 0/.1)",
+    "xl": "0 20px 25px -5px rgb(0 0 0/.1),0 8px 10px -6px rgb(0 0 0/.1)",
+    "2xl": "0 25px 50px -12px rgb(0 0 0/.25)",
+    "none": "0 0 #0000",
+}
+MAX_WIDTHS = {"xs": "20rem", "sm": "24rem", "md": "28rem", "lg": "32rem", "xl": "36rem", "2xl": "42rem",
+              "3xl": "48rem", "4xl": "56rem", "5xl": "64rem", "6xl": "72rem", "7xl": "80rem", "full": "100%"}
+
+STATIC_UTILITIES = {
+    "block": "display:block", "inline-block": "display:inline-block", "inline": "display:inline",
+    "flex": "display:flex", "inline-flex": "display:inline-flex", "grid": "display:grid",
+    "hidden": "display:none",
+    "relative": "position:relative", "absolute": "position:absolute", "fixed": "position:fixed",
+    "sticky": "position:sticky",
+    "flex-1": "flex:1 1 0%", "flex-wrap": "flex-wrap:wrap", "flex-col": "flex-direction:column",
+    "items-center": "align-items:center", "items-start": "align-items:flex-start",
+    "justify-center": "justify-content:center", "justify-between": "justify-content:space-between",
+    "text-center": "text-align:center", "text-left": "text-align:left", "text-right": "text-align:right",
+    "leading-tight": "line-height:1.25", "leading-relaxed": "line-height:1.625",
+    "line-through": "text-decoration-line:line-through", "underline": "text-decoration-line:underline",
+    "object-cover": "object-fit:cover", "overflow-hidden": "overflow:hidden",
+    "cursor-pointer": "cursor:pointer",
+    "w-full": "width:100%", "h-full": "height:100%", "min-h-screen": "min-height:100vh",
+    "mx-auto": "margin-left:auto;margin-right:auto",
+    "border": "border-width:1px", "border-2": "border-width:2px", "border-4": "border-width:4px",
+    "border-b": "border-bottom-width:1px", "border-t": "border-top-width:1px",
+    "outline-none": "outline:2px solid transparent;outline-offset:2px",
+    "transition-colors": "transition-property:color,background-color,border-color,fill,stroke;"
+                         "transition-timing-function:cubic-bezier(.4,0,.2,1);transition-duration:.15s",
+    "transition": "transition-property:color,background-color,border-color,opacity,box-shadow,transform;"
+                  "transition-timing-function:cubic-bezier(.4,0,.2,1);transition-duration:.15s",
+}
+
+# Children spacing, applied between siblings
+_BETWEEN = ">:not([hidden])~:not([hidden])"
+
+
+def _utility_map():
+    """{class name: (selector suffix, declarations)} for every supported utility"""
+    utilities = {name: ("", css) for name, css in STATIC_UTILITIES.items()}
+    sides = {"m": ("margin",), "mx": ("margin-left", "margin-right"), "my": ("margin-top", "margin-bottom"),
+             "mt": ("margin-top",), "mb": ("margin-bottom",), "ml": ("margin-left",), "mr": ("margin-right",),
+             "p": ("padding",), "px": ("padding-left", "padding-right"), "py": ("padding-top", "padding-bottom"),
+             "pt": ("padding-top",), "pb": ("padding-bottom",), "pl": ("padding-left",), "pr": ("padding-right",)}
+    for step, size in SPACING.items():
+        for prefix, properties in sides.items():
+            utilities[f"{prefix}-{step}"] = ("", ";".join(f"{prop}:{size}" for prop in properties))
+        utilities[f"w-{step}"] = ("", f"width:{size}")
+        utilities[f"h-{step}"] = ("", f"height:{size}")
+        utilities[f"gap-{step}"] = ("", f"gap:{size}")
+        for side in ("top", "right", "bottom", "left"):
+            utilities[f"{side}-{step}"] = ("", f"{side}:{size}")
+        utilities[f"space-x-{step}"] = (_BETWEEN, f"margin-left:{size}")
+        utilities[f"space-y-{step}"] = (_BETWEEN, f"margin-top:{size}")
+    for columns in range(1, 13):
+        utilities[f"grid-cols-{columns}"] = ("", f"grid-template-columns:repeat({columns},minmax(0,1fr))")
+    for color, values in COLORS.items():
+        for shade, value in zip(SHADES, values):
+            utilities[f"text-{color}-{shade}"] = ("", f"color:{value}")
+            utilities[f"bg-{color}-{shade}"] = ("", f"background-color:{value}")
+            utilities[f"border-{color}-{shade}"] = ("", f"border-color:{value}")
+            utilities[f"ring-{color}-{shade}"] = ("", f"--tw-ring-color:{value}")
+    for color, value in (("white", "#fff"), ("black", "#000"), ("transparent", "transparent")):
+        utilities[f"text-{color}"] = ("", f"color:{value}")
+        utilities[f"bg-{color}"] = ("", f"background-color:{value}")
+        utilities[f"border-{color}"] = ("", f"border-color:{value}")
+    for name, (size, height) in FONT_SIZES.items():
+        utilities[f"text-{name}"] = ("", f"font-size:{size};line-height:{height}")
+    for name, weight in FONT_WEIGHTS.items():
+        utilities[f"font-{name}"] = ("", f"font-weight:{weight}")
+    for name, radius in RADII.items():
+        utilities[f"rounded-{name}" if name else "rounded"] = ("", f"border-radius:{radius}")
+    for name, shadow in SHADOWS.items():
+        utilities[f"shadow-{name}" if name else "shadow"] = ("", f"box-shadow:{shadow}")
+    for name, width in MAX_WIDTHS.items():
+        utilities[f"max-w-{name}"] = ("", f"max-width:{width}")
+    for width in (0, 1, 2, 4, 8):
+        utilities[f"ring-{width}"] = ("", f"box-shadow:0 0 0 {width}px var(--tw-ring-color,rgb(59 130 246/.5))")
+    return utilities
+
+
+UTILITIES = _utility_map()
+
+# Compact reset in place of Tailwind's preflight
+PREFLIGHT = (
+    "*,::before,::after{box-sizing:border-box;border:0 solid #e5e7eb}"
+    "html{line-height:1.5;-webkit-text-size-adjust:100%;tab-size:4}"
+    "body{margin:0;line-height:inherit}"
+    "h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}"
+    "a{color:inherit;text-decoration:inherit}"
+    "b,strong{font-weight:bolder}"
+    "button,input,select,textarea{font-family:inherit;font-size:100%;line-height:inherit;color:inherit;margin:0;padding:0}"
+    "button{background-color:transparent;background-image:none;cursor:pointer}"
+    "blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}"
+    "ol,ul{list-style:none;margin:0;padding:0}"
+    "img,svg,video,canvas,iframe{display:block;vertical-align:middle}"
+    "img,video{max-width:100%;height:auto}"
+    "input::placeholder{color:#9ca3af}"
+    "[hidden]{display:none}"
+)
+
+# ---- icons ---------------------------------------------------------------
+
+FONT_AWESOME_CDN = "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/webfonts"
+ICON_FONTS = {
+    "fas": ("Font Awesome 6 Free", 900, f"{FONT_AWESOME_CDN}/fa-solid-900.woff2"),
+    "fab": ("Font Awesome 6 Brands", 400, f"{FONT_AWESOME_CDN}/fa-brands-400.woff2"),
+}
+# Glyphs of the icons our pages may use (Font Awesome 6 free; v5 names kept)
+ICONS = {
+    "arrow-left": "f060", "arrow-right": "f061", "check": "f00c", "times": "f00d", "xmark": "f00d",
+    "comment": "f075", "hands": "f2a7", "hands-helping": "f4c4", "handshake-angle": "f4c4",
+    "heart": "f004", "search": "f002", "magnifying-glass": "f002", "star": "f005", "user": "f007",
+    "phone": "f095", "envelope": "f0e0", "share": "f064", "plus": "f067", "minus": "f068",
+    "spinner": "f110", "truck": "f0d1", "store": "f54e", "shopping-cart": "f07a", "tag": "f02b",
+    "camera": "f030", "video": "f03d", "images": "f302", "map-marker-alt": "f3c5",
+    "whatsapp": "f232", "instagram": "f16d", "facebook": "f09a",
+}
+
+# ---- fonts ---------------------------------------------------------------
+
+GOOGLE_FONTS_ORIGIN = "https://fonts.googleapis.com"
+GOOGLE_FONTS = f"{GOOGLE_FONTS_ORIGIN}/css2"
+# Where product images are served from
+IMAGE_ORIGIN = "https://storage.googleapis.com"
+# Extra font families only loaded when a template uses their class
+FONT_CLASSES = {"hindi-font": "Hind"}
+
+
+def _minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def _escape(name):
+    return re.sub(r"([:/.])", r"\\\1", name)
+
+
+def template_tokens(template_dir=TEMPLATE_DIR):
+    """Every class-like token in the HTML templates (markup and scripts alike)"""
+    tokens = set()
+    for name in sorted(os.listdir(template_dir)):
+        if name.endswith(".html"):
+            with open(os.path.join(template_dir, name), "r", encoding="utf-8") as f:
+                tokens.update(re.findall(r"[\w:/.-]+", f.read()))
+    return tokens
+
+
+def utility_css(tokens):
+    """Minified CSS for the utility classes among tokens, variants included"""
+    plain, states, screens = [], [], {name: [] for name in BREAKPOINTS}
+    for token in sorted(tokens, key=_utility_order):
+        *variants, name = token.split(":")
+        if name not in UTILITIES or len(variants) > 2:
+            continue
+        screen = [variant for variant in variants if variant in BREAKPOINTS]
+        pseudo = [STATES[variant] for variant in variants if variant in STATES]
+        if len(screen) + len(pseudo) != len(variants) or len(screen) > 1:
+            continue
+        suffix, declarations = UTILITIES[name]
+        rule = f".{_escape(token)}{''.join(pseudo)}{suffix}{{{declarations}}}"
+        if screen:
+            screens[screen[0]].append(rule)
+        elif pseudo:
+            states.append(rule)
+        else:
+            plain.append(rule)
+
+    css = []
+    if "container" in tokens:
+        css.append(".container{width:100%}")
+        for name, width in BREAKPOINTS.items():
+            screens[name].insert(0, f".container{{max-width:{width}px}}")
+    css += plain + states
+    for name, width in BREAKPOINTS.items():
+        if screens[name]:
+            css.append(f"@media (min-width:{width}px){{{''.join(screens[name])}}}")
+    return "".join(css)
+
+
+_UTILITY_POSITION = {name: position for position, name in enumerate(UTILITIES)}
+
+
+def _utility_order(token):
+    # Generation order, so later families (e.g. colors) win over earlier ones as in Tailwind
+    return _UTILITY_POSITION.get(token.rpartition(":")[2], -1), token
+
+
+def icon_css(tokens):
+    """@font-face and glyph rules for just the icons the templates use; returns (css, font urls)"""
+    fonts = [style for style in ICON_FONTS if style in tokens]
+    if not fonts:
+        return "", []
+    css = [".fas,.fab{display:inline-block;font-style:normal;font-variant:normal;line-height:1;"
+           "text-rendering:auto;-webkit-font-smoothing:antialiased;-moz-osx-font-smoothing:grayscale}"]
+    for style in fonts:
+        family, weight, url = ICON_FONTS[style]
+        css.append(f'@font-face{{font-family:"{family}";font-style:normal;font-weight:{weight};'
+                   f'font-display:block;src:url({url}) format("woff2")}}')
+        css.append(f'.{style}{{font-family:"{family}";font-weight:{weight}}}')
+    used = sorted(token[3:] for token in tokens if token.startswith("fa-"))
+    for icon in used:
+        if icon in ICONS:
+            css.append(f'.fa-{icon}::before{{content:"\\{ICONS[icon]}"}}')
+        else:
+            print(f"⚠️ No glyph for icon fa-{icon}; add it to site_assets.ICONS")
+    return "".join(css), [ICON_FONTS[style][2] for style in fonts]
+
+
+def google_fonts_url(tokens):
+    """Stylesheet URL for Poppins in the weights the templates use, plus any optional families"""
+    weights = sorted({400} | {weight for name, weight in FONT_WEIGHTS.items() if f"font-{name}" in tokens})
+    families = [f"family=Poppins:wght@{';'.join(map(str, weights))}"]
+    families += [f"family={family}:wght@400;500;600" for token, family in FONT_CLASSES.items() if token in tokens]
+    return f"{GOOGLE_FONTS}?{'&'.join(families)}&display=swap"
+
+
+class SiteAssets:
+    """The generated stylesheet and the <head> hints that go with it.
+
+    ``files`` maps paths under the site directory to their content;
+    ``stylesheet`` is the URL pages link to; ``preconnect``, ``preload``
+    and ``fonts`` are used by layout.html.
+    """
+
+    def __init__(self, template_dir=TEMPLATE_DIR):
+        tokens = template_tokens(template_dir)
+        icons, icon_fonts = icon_css(tokens)
+        with open(os.path.join(template_dir, "site.css"), "r", encoding="utf-8") as f:
+            site_css = _minify_css(f.read())
+        self.css = PREFLIGHT + site_css + icons + utility_css(tokens)
+
+        digest = hashlib.sha256(self.css.encode("utf-8")).hexdigest()[:12]
+        path = f"{ASSET_DIR}/site.{digest}.css"
+        self.files = {path: self.css}
+        self.stylesheet = f"/{path}"
+        self.fonts = google_fonts_url(tokens)
+        # (origin, crossorigin): font files are fetched in CORS mode, stylesheets and images aren't
+        self.preconnect = [(GOOGLE_FONTS_ORIGIN, False), ("https://fonts.gstatic.com", True),
+                           (IMAGE_ORIGIN, False)]
+        # Icon fonts are only discovered once the CSS is parsed; fetch the solid
+        # set (on every page) right away, brand icons load when a page uses one
+        self.preload = [{"href": url, "as": "font", "type": "font/woff2"}
+                        for url in icon_fonts if url == ICON_FONTS["fas"][2]]
+
+
+_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.S)
+_INDENT = re.compile(r"[ \t]*\n\s*")
+# Inline CSS, including a template's {% block style %}
+_STYLE = re.compile(r"(<style[^>]*>|{% block style %})(.*?)(</style>|{% endblock %})", re.S)
+
+
+def minify_html(html):
+    """Drop comments and indentation and minify inline CSS.
+
+    Line breaks stay, so inline spacing and scripts are unchanged. Works on
+    Jinja template sources as well as on rendered pages.
+    """
+    html = _STYLE.sub(lambda m: m.group(1) + _minify_css(m.group(2)) + m.group(3), html)
+    return _INDENT.sub("\n", _COMMENT.sub("", html)).strip()
+
+
+if __name__ == "__main__":
+    assets = SiteAssets(sys.argv[1] if len(sys.argv) > 1 else TEMPLATE_DIR)
+    print(f"🎨 {assets.stylesheet}: {len(assets.css.encode('utf-8')):,} bytes")
+    print(f"🔤 {assets.fonts}")
+    for hint in assets.preload:
+        print(f"⚡ preload {hint['href']}")
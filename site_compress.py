@@ -0,0 +1,95 @@
+"""Precompressed siblings for the static site.
+
+Every text file under out/ gets ``.gz`` (and, with the brotli package,
+``.br``) siblings at maximum compression, so a host or deploy client can
+serve or upload the bytes as-is instead of compressing per request. The
+build manifest remembers which content hash each file was compressed from,
+so only files whose content changed are compressed again.
+"""
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from build_manifest import content_hash
+from catalog_store import write_file_atomic
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+COMPRESSIBLE = (".html", ".json", ".css", ".js", ".svg", ".txt", ".xml")
+# Smaller files go out as they are; the encoding header costs more than it saves
+MIN_COMPRESS_SIZE = 512
+# Below this many files, compressing in the calling thread beats handing out work
+PARALLEL_THRESHOLD = 50
+
+
+def compressed_paths(rel_path):
+    """The sibling files precompress() may write for rel_path"""
+    return [f"{rel_path}.gz"] + ([f"{rel_path}.br"] if BROTLI_AVAILABLE else [])
+
+
+def gzip_data(data):
+    """Deterministic gzip (no timestamp), so equal content always has an equal .gz hash"""
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _compress_files(root, rel_paths):
+    """Write siblings for each file; returns [(path, sha256, gzip bytes, br bytes)]"""
+    results = []
+    for rel_path in rel_paths:
+        full_path = os.path.join(root, rel_path)
+        try:
+            with open(full_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            continue
+        gz = gzip_data(data)
+        write_file_atomic(f"{full_path}.gz", gz)
+        br = None
+        if BROTLI_AVAILABLE:
+            br = brotli.compress(data, quality=11)
+            write_file_atomic(f"{full_path}.br", br)
+        results.append((rel_path, content_hash(data), len(gz), len(br) if br is not None else None))
+    return results
+
+
+def _needs_compression(root, rel_path, entry):
+    if not rel_path.endswith(COMPRESSIBLE) or entry["bytes"] < MIN_COMPRESS_SIZE:
+        return False
+    if entry.get("compressed") != entry["sha256"]:
+        return True
+    # Compressed before: only redo it if a sibling went missing
+    return not all(os.path.exists(os.path.join(root, path)) for path in compressed_paths(rel_path))
+
+
+def precompress(manifest, paths=None, workers=None):
+    """Write .gz/.br siblings for manifest files (all, or just paths) whose content changed.
+
+    Returns how many files were compressed. The sizes are kept in the
+    manifest entries as ``gzip_bytes``/``br_bytes``.
+    """
+    files = manifest.files()
+    candidates = files if paths is None else {path: files[path] for path in paths if path in files}
+    todo = sorted(path for path, entry in candidates.items()
+                  if _needs_compression(manifest.root, path, entry))
+    if not todo:
+        return 0
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(todo) >= PARALLEL_THRESHOLD:
+        size = max(10, len(todo) // (workers * 4))
+        # Threads, not processes: zlib and brotli release the GIL while compressing, and
+        # forking from the bot's threads could copy a lock some other thread holds
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="precompress") as pool:
+            futures = [pool.submit(_compress_files, manifest.root, todo[i:i + size])
+                       for i in range(0, len(todo), size)]
+            results = [result for future in futures for result in future.result()]
+    else:
+        results = _compress_files(manifest.root, todo)
+
+    for rel_path, digest, gzip_bytes, br_bytes in results:
+        manifest.annotate(rel_path, digest, compressed=digest, gzip_bytes=gzip_bytes, br_bytes=br_bytes)
+    return len(results)
@@ -0,0 +1,92 @@
+import itertools
+import threading
+
+
+class BuildPlanner:
+    """Dependency graph between static-site outputs and the catalog records they show.
+
+    Renderers ``record()`` each output together with the keys it was built
+    from (``"product:<id>"``, ``"seller:<phone>"``, ``"products:latest"``...);
+    mutations ``mark()`` the keys they touch. ``plan()`` then returns only the
+    outputs that depend on a key marked after they were last built, so a
+    rebuild costs as much as the change rather than the catalog. A logical
+    clock orders marks and builds: a page rendered right after an edit isn't
+    rendered again by the next plan.
+    """
+
+    def __init__(self, implied=None):
+        # implied(key) -> outputs that exist because of the key itself (a
+        # product's own page), including ones never built yet
+        self._implied = implied or (lambda key: ())
+        self._lock = threading.Lock()
+        self._clock = itertools.count(1)
+        self._deps = {}        # output -> frozenset of keys
+        self._dependents = {}  # key -> set of outputs
+        self._built = {}       # output -> clock value at build time
+        self._marked = {}      # key -> clock value of its latest change
+
+    def __len__(self):
+        return len(self._built)
+
+    def mark(self, *keys):
+        """Note that the catalog records behind keys changed"""
+        with self._lock:
+            for key in keys:
+                if key:
+                    self._marked[key] = next(self._clock)
+
+    def tick(self):
+        """Clock value for ``record()``: take it before reading the catalog data an output shows"""
+        with self._lock:
+            return next(self._clock)
+
+    def record(self, output, deps, started):
+        """Note that output was built from deps, read after ``started = tick()``.
+
+        A mark made while the output was being rendered is later than
+        ``started``, so the next plan still renders it again.
+        """
+        deps = frozenset(deps)
+        with self._lock:
+            for key in self._deps.get(output, ()):
+                outputs = self._dependents.get(key)
+                if outputs is not None:
+                    outputs.discard(output)
+                    if not outputs:
+                        del self._dependents[key]
+            self._deps[output] = deps
+            for key in deps:
+                self._dependents.setdefault(key, set()).add(output)
+            self._built[output] = max(self._built.get(output, 0), started)
+
+    def plan(self):
+        """Outputs that are stale because of marks since they were built.
+
+        The marks stay until ``done()``, so a build that fails part-way is
+        planned again by the next call.
+        """
+        with self._lock:
+            stale = set()
+            for key, clock in self._marked.items():
+                for output in itertools.chain(self._dependents.get(key, ()), self._implied(key)):
+                    if self._built.get(output, 0) < clock:
+                        stale.add(output)
+            return stale
+
+    def built_since(self, output, started):
+        """True if output was recorded as built from data read after ``started = tick()``"""
+        with self._lock:
+            return self._built.get(output, 0) >= started
+
+    def done(self, started, failed=()):
+        """Forget marks made before ``started = tick()`` once the build planned after it went through.
+
+        Marks behind the ``failed`` outputs are kept, so the next plan tries them again.
+        """
+        failed = set(failed)
+        with self._lock:
+            self._marked = {
+                key: clock for key, clock in self._marked.items()
+                if clock > started or not failed.isdisjoint(
+                    itertools.chain(self._dependents.get(key, ()), self._implied(key)))
+            }
@@ -0,0 +1,252 @@
+import json
+import os
+import sys
+import time
+from urllib.parse import quote
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from build_manifest import content_hash
+from fragment_cache import FragmentCache, MAX_FRAGMENTS
+from image_renditions import rendition_url, srcset
+from site_assets import SiteAssets, minify_html
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# Filter buttons on the index page
+CATEGORIES = [
+    "all", "pottery", "textiles", "jewelry", "paintings",
+    "wooden", "metalwork", "leather", "papercraft", "home-decor", "accessories"
+]
+
+
+def clip(text, length):
+    """First ``length`` characters, with '...' if anything was cut"""
+    text = str(text or "")
+    return text[:length] + ("..." if len(text) > length else "")
+
+
+class MinifyExtension(Extension):
+    """Minify HTML template sources before they are compiled, so pages come out minified for free"""
+
+    def preprocess(self, source, name, filename=None):
+        return minify_html(source) if name and name.endswith(".html") else source
+
+
+# Templates are compiled once per process and kept: no reload checks, no eviction
+env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+    cache_size=-1,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    extensions=[MinifyExtension],
+)
+env.filters["clip"] = clip
+
+# The purged, content-hashed stylesheet every page links to; deploys write assets.files
+assets = SiteAssets(TEMPLATE_DIR)
+env.globals["assets"] = assets
+env.globals.update(srcset=srcset, rendition_url=rendition_url)
+
+_product_page = env.get_template("product.html")
+_seller_page = env.get_template("seller.html")
+_index_page = env.get_template("index.html")
+_category_page = env.get_template("category.html")
+_cards = env.get_template("cards.html").module
+
+
+def _fragment_template_hash():
+    """Hash of what card HTML is rendered from: the card macros, the srcset helpers and the
+    filters and minifier applied to them (clip and MinifyExtension here, minify_html in site_assets)"""
+    code_dir = os.path.dirname(os.path.abspath(__file__))
+    sources = b""
+    for path in (os.path.join(TEMPLATE_DIR, "cards.html"), os.path.join(code_dir, "image_renditions.py"),
+                 os.path.join(code_dir, "site_templates.py"), os.path.join(code_dir, "site_assets.py")):
+        with open(path, "rb") as f:
+            sources += f.read()
+    return content_hash(sources)
+
+
+# Cards rendered before (this run or an earlier one) are reused until their record changes
+fragments = FragmentCache(os.environ.get("FRAGMENT_CACHE", "./fragment-cache.jsonl"), _fragment_template_hash())
+
+
+def product_card(product, *args):
+    """One product card (args as for the cards.html macro), from the fragment cache when unchanged"""
+    return Markup(fragments.get("product", product["id"], product,
+                                lambda: _cards.product_card(product, *args), *args))
+
+
+def reel_card(reel):
+    return Markup(fragments.get("reel", reel.get("id", ""), reel, lambda: _cards.reel_card(reel)))
+
+
+def seller_card(phone, products_count, product):
+    return Markup(fragments.get("seller", phone, [products_count, product],
+                                lambda: _cards.seller_card(phone, products_count, product)))
+
+
+# Pages use the cached cards instead of calling the macros themselves
+env.globals["product_card"] = product_card
+
+
+def product_view(product_data, image_urls=None):
+    """Display values for a product page, shared by the page template and shell-mode JSON documents"""
+    images = list(product_data.get('images') or [])
+    image_urls = list(image_urls or images)
+    # Renditions are recorded for the product's own images
+    variants = tuple(product_data.get('image_variants') or ()) if image_urls == images else ()
+    product_id = product_data.get('id', '')
+    return {
+        "id": product_id,
+        "title": product_data.get('title', ''),
+        "description": product_data.get('description', ''),
+        "price": product_data.get('price', ''),
+        "original_price": product_data.get('original_price'),
+        "category": str(product_data.get('category', 'Handmade')).title(),
+        "material": product_data.get('material', 'Natural Materials'),
+        "reviews_count": product_data.get('reviews_count', 12),
+        "artisan_name": product_data.get('artisan_name', 'Local Artisan'),
+        "artisan_region": product_data.get('artisan_region', 'India'),
+        "orders_completed": product_data.get('orders_completed', 25),
+        "rating": product_data.get('rating', 4.8),
+        "buy_url": f"https://wa.me/14155238886?text=I%20want%20to%20buy%20{quote(str(product_id))}",
+        "images": [{
+            "src": rendition_url(url, '960w', 'jpg') if variants else url,
+            "thumb": rendition_url(url, '200w', 'jpg') if variants else url,
+            "webp": srcset(url, variants, 'webp') or None,
+            "jpg": srcset(url, variants, 'jpg') or None,
+        } for url in image_urls[:4]],
+    }, image_urls, variants
+
+
+def render_product_page(product_data, image_urls=None):
+    """HTML for one product page"""
+    view, image_urls, variants = product_view(product_data, image_urls)
+    return _product_page.render(product=view, image_urls=image_urls, variants=variants, shell=False)
+
+
+def render_product_shell():
+    """The one product page used in shell mode; it loads /product/<id>.json itself"""
+    blank = {key: '' for key in ("id", "title", "description", "price", "category", "material",
+                                 "reviews_count", "artisan_name", "artisan_region", "orders_completed",
+                                 "rating", "buy_url")}
+    return _product_page.render(product={**blank, "original_price": None, "images": []},
+                                image_urls=[], variants=(), shell=True)
+
+
+def render_product_document(product_data):
+    """JSON document the product shell renders a product from"""
+    view, _, _ = product_view(product_data)
+    return json.dumps(view, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def render_seller_page(seller, seller_products):
+    """HTML for one seller profile page"""
+    return _seller_page.render(seller=seller, products=seller_products)
+
+
+def render_category_page(category, number, products, newer=False):
+    """HTML for page ``number`` (1 = oldest) of a category listing; products newest first"""
+    return _category_page.render(category=category, number=number, products=products, newer=newer)
+
+
+def render_listing_shard(category, number, products):
+    """JSON for listing shard ``number`` of a category: the same products as its page, as cards.
+
+    Each card's ``html`` is the cards.html product card, so cards loaded by
+    the index page's script look exactly like the ones rendered into it.
+    """
+    cards = []
+    for product in products:
+        images = product.get("images") or ()
+        cards.append({
+            "id": product["id"],
+            "title": product.get("title"),
+            "description": clip(product.get("description"), 80),
+            "price": product.get("price"),
+            "image": images[0] if images else None,
+            "srcset": srcset(images[0] if images else None, product.get("image_variants"), "webp") or None,
+            "category": product.get("category"),
+            "html": str(product_card(product)).strip(),
+        })
+    return json.dumps({"category": category, "shard": number, "products": cards},
+                      ensure_ascii=False, separators=(",", ":"))
+
+
+def render_reels_section(reels):
+    """Reel cards for the index page"""
+    return Markup("").join(reel_card(reel) for reel in reels)
+
+
+def render_products_section(products):
+    """Product cards for the index page"""
+    return Markup("").join(product_card(product) for product in products)
+
+
+def render_sellers_section(seller_summaries):
+    """Artisan cards for the index page, from (phone, product count, first product) summaries"""
+    return Markup("").join(seller_card(phone, count, product)
+                           for phone, count, product in seller_summaries)
+
+
+def render_index(sections):
+    """index.html around already rendered reels, products and sellers sections"""
+    return _index_page.render(
+        categories=CATEGORIES,
+        sections={name: Markup(html) for name, html in sections.items()},
+    )
+
+
+def benchmark(count=2000, cache=True):
+    """Render ``count`` synthetic product pages plus seller pages and an index; print pages/second.
+
+    Cards come from an empty in-memory fragment cache, warmed by the first
+    pages that use them; with cache=False every card is rendered each time.
+    """
+    global fragments
+    saved, fragments = fragments, FragmentCache(os.devnull, "", max_fragments=MAX_FRAGMENTS if cache else 0)
+    products = [{
+        "id": f"{i:08x}-bench", "title": f"Handmade Pot #{i} <glazed>", "description": "Hand thrown & fired " * 6,
+        "price": 350 + i, "images": [f"https://storage.googleapis.com/craftlink-images/{i:032x}.jpg"],
+        "category": "pottery", "artisan_name": "Ravi", "artisan_region": "Karnataka",
+        "artisan_phone": f"+91990000{i % 50:04d}",
+    } for i in range(count)]
+    sellers = [{"phone": f"+91990000{i:04d}", "name": f"Artisan {i}", "skills": ["pottery"]} for i in range(50)]
+
+    results = []
+    start = time.perf_counter()
+    for product in products:
+        render_product_page(product)
+    results.append(("product pages", count, time.perf_counter() - start))
+
+    start = time.perf_counter()
+    for seller in sellers:
+        render_seller_page(seller, products[:9])
+    results.append(("seller pages", len(sellers), time.perf_counter() - start))
+
+    start = time.perf_counter()
+    rounds = 200
+    for _ in range(rounds):
+        render_index({
+            "reels": render_reels_section([]),
+            "products": render_products_section(products[-12:]),
+            "sellers": render_sellers_section([(s["phone"], 9, products[0]) for s in sellers[:6]]),
+        })
+    results.append(("index pages", rounds, time.perf_counter() - start))
+
+    fragments = saved
+
+    for name, pages, seconds in results:
+        print(f"⏱️ {name} (fragment cache {'on' if cache else 'off'}): "
+              f"{pages} in {seconds * 1000:.0f} ms ({pages / seconds:,.0f}/s)")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000, cache=False)
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
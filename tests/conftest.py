@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TESTS)
+
+# The modules live at the repository root
+sys.path.insert(0, ROOT)
+
+
+class Shop:
+    """A shop directory (catalog under out/) whose code runs in fresh processes, like the bot's"""
+
+    def __init__(self, directory):
+        self.dir = str(directory)
+
+    def path(self, *parts):
+        return os.path.join(self.dir, *parts)
+
+    def read(self, *parts):
+        with open(self.path(*parts), encoding="utf-8") as f:
+            return f.read()
+
+    def run(self, code, **env):
+        """Run code in a new Python process in the shop directory; returns its stdout"""
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=self.dir, capture_output=True, text=True, timeout=120,
+            # Scripts can use the helpers here too (from conftest import product)
+            env={**os.environ, "PYTHONPATH": os.pathsep.join([ROOT, TESTS]), "PUBLISH_TARGET": "local", **env},
+        )
+        assert result.returncode == 0, result.stdout + result.stderr
+        return result.stdout
+
+    def evaluate(self, code, **env):
+        """Run code that sets ``result`` in a new process; returns result as decoded JSON"""
+        output = self.run(f"{code}\nimport json as _json\nprint(_json.dumps(result, default=dict))", **env)
+        return json.loads(output.splitlines()[-1])
+
+
+def product(i, **fields):
+    return {
+        "id": f"{i:08x}-0000-4000-8000-{i:012x}", "title": f"Clay pot {i}", "description": "Hand thrown",
+        "price": 100 + i, "images": [f"https://storage.googleapis.com/craftlink-images/p{i}.jpg"],
+        "category": "pottery", "artisan_phone": "+919900000001", "created_at": f"2025-01-{i + 1:02d}",
+        **fields,
+    }
+
+
+@pytest.fixture
+def shop(tmp_path):
+    os.makedirs(tmp_path / "out")
+    catalog = {
+        "products.json": {"products": [product(i) for i in range(3)]},
+        "sellers.json": {"sellers": [{"phone": "+919900000001", "name": "Asha", "region": "Jaipur"}]},
+        "reels.json": {"reels": []},
+    }
+    for name, data in catalog.items():
+        with open(tmp_path / "out" / name, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    return Shop(tmp_path)
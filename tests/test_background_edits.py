@@ -0,0 +1,41 @@
+import os
+
+from conftest import product
+
+PID = product(0)["id"]
+
+EDIT = (
+    "import time\n"
+    "import deploy_shop, main\n"
+    "sent = []\n"
+    "main.send_whatsapp = lambda phone, body: sent.append(body)\n"
+    "reply = main.handle_edit_command('whatsapp:+919900000001', {command!r})\n"
+    "at_reply = list(sent)\n"
+    f"price = deploy_shop.get_product_by_id({PID!r})['price']\n"
+    "deadline = time.monotonic() + {wait}\n"
+    "while not sent and time.monotonic() < deadline:\n"
+    "    time.sleep(0.05)\n"
+    "result = {{'reply': reply, 'at_reply': at_reply, 'price': price, 'sent': sent}}\n"
+)
+
+
+def test_edit_replies_before_the_change_is_live(shop):
+    result = shop.evaluate(EDIT.format(command=f"edit {PID[:8]} price 555", wait=30),
+                           DEPLOY_QUIET_SECONDS="0.2", PUBLISH_DIR=shop.path("site"))
+    assert result["reply"] == f"✅ Updated price for product {PID[:8]}. I'll message you when it's live."
+    # Saved before the reply; the live message only comes after the publish
+    assert result["price"] == 555
+    assert result["at_reply"] == []
+    assert len(result["sent"]) == 1 and result["sent"][0].startswith(f"🌐 Your price change for product {PID[:8]} is live")
+
+    published = shop.path("site", "current", "product", f"{PID}.html")
+    with open(published, encoding="utf-8") as f:
+        assert "555" in f.read()
+
+
+def test_failed_edit_sends_nothing(shop):
+    result = shop.evaluate(EDIT.format(command=f"edit {PID[:8]} price lots", wait=1),
+                           DEPLOY_QUIET_SECONDS="0.2", PUBLISH_DIR=shop.path("site"))
+    assert result["reply"].startswith("❌ Price must be a number")
+    assert result["sent"] == [] and result["price"] == 100
+    assert not os.path.exists(shop.path("site"))
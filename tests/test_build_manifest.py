@@ -0,0 +1,86 @@
+import os
+
+from build_manifest import BuildManifest
+
+
+def make_manifest(tmp_path):
+    return BuildManifest(str(tmp_path / "out"), str(tmp_path / "build-manifest.json"))
+
+
+def publish(manifest):
+    """What publish_site() does around a successful publish"""
+    manifest.save()
+    manifest.mark_deployed(manifest.deployable(manifest.pending()))
+
+
+def test_written_files_are_pending_until_deployed(tmp_path):
+    manifest = make_manifest(tmp_path)
+    assert manifest.write("index.html", "<h1>Shop</h1>")
+    assert manifest.write("product/p1.html", "<h1>Pot</h1>")
+    assert manifest.pending() == {"index.html", "product/p1.html"}
+
+    publish(manifest)
+    assert manifest.pending() == set()
+    assert make_manifest(tmp_path).pending() == set()
+
+
+def test_identical_content_is_not_rewritten(tmp_path):
+    manifest = make_manifest(tmp_path)
+    manifest.write("index.html", "same")
+    publish(manifest)
+    mtime = os.path.getmtime(os.path.join(manifest.root, "index.html"))
+
+    assert not manifest.write("index.html", "same")
+    assert manifest.pending() == set()
+    assert os.path.getmtime(os.path.join(manifest.root, "index.html")) == mtime
+
+
+def test_file_changed_during_publish_stays_pending(tmp_path):
+    manifest = make_manifest(tmp_path)
+    manifest.write("index.html", "v1")
+    manifest.write("about.html", "v1")
+    manifest.save()
+    deployed = manifest.deployable(manifest.pending())
+
+    # Rewritten after the publish read it
+    manifest.write("index.html", "v2")
+    manifest.mark_deployed(deployed)
+    assert manifest.pending() == {"index.html"}
+
+
+def test_change_from_another_process_during_publish_stays_pending(tmp_path):
+    manifest = make_manifest(tmp_path)
+    manifest.write("index.html", "v1")
+    manifest.save()
+    deployed = manifest.deployable(manifest.pending())
+
+    other = make_manifest(tmp_path)
+    other.write("index.html", "v2")
+    other.save()
+    manifest.mark_deployed(deployed)
+    assert manifest.pending() == {"index.html"}
+    assert make_manifest(tmp_path).pending() == {"index.html"}
+
+
+def test_removed_files_are_pending_until_deployed(tmp_path):
+    manifest = make_manifest(tmp_path)
+    manifest.write("product/p1.html", "<h1>Pot</h1>")
+    publish(manifest)
+
+    assert manifest.remove("product/p1.html")
+    assert not os.path.exists(os.path.join(manifest.root, "product/p1.html"))
+    assert manifest.pending() == {"product/p1.html"}
+    assert manifest.deployable(manifest.pending()) == {"product/p1.html": None}
+    publish(manifest)
+    assert manifest.pending() == set()
+    assert "product/p1.html" not in manifest.files()
+
+
+def test_records_from_several_instances_merge(tmp_path):
+    first, second = make_manifest(tmp_path), make_manifest(tmp_path)
+    first.write("a.html", "a")
+    second.write("b.html", "b")
+    first.save()
+    second.save()
+    assert set(make_manifest(tmp_path).files()) == {"a.html", "b.html"}
+    assert make_manifest(tmp_path).pending() == {"a.html", "b.html"}
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from catalog_sqlite import SqliteProductStore, SqliteSellerStore
+from catalog_store import ProductStore, SellerStore
+
+from conftest import product
+
+SELLERS = ["+911", "+912", "+913"]
+CATEGORIES = ["pottery", "textiles"]
+
+
+def scenario(products):
+    """The same mutations for either backend"""
+    for i in range(30):
+        products.upsert(product(i, artisan_phone=SELLERS[i % 3], category=CATEGORIES[i % 2],
+                                title=f"{'Clay pot' if i % 2 == 0 else 'Handloom saree'} {i}",
+                                created_at=f"2025-01-{i // 2 + 1:02d}T00:00:{i:02d}"))
+    products.update(product(4)["id"], {"price": 999, "title": "Glazed clay pot"})
+    products.delete(product(7)["id"])
+    # Re-adding moves it to the end, as the newest record
+    products.upsert(product(2, artisan_phone="+911", category="pottery", created_at="2025-02-01"))
+
+
+@pytest.fixture
+def stores(tmp_path):
+    json_store = ProductStore(str(tmp_path / "json" / "products.json"))
+    sqlite_store = SqliteProductStore(str(tmp_path / "catalog.db"), str(tmp_path / "sqlite" / "products.json"))
+    for store in (json_store, sqlite_store):
+        scenario(store)
+    return json_store, sqlite_store
+
+
+def plain(products):
+    return [dict(p) for p in products]
+
+
+def test_reads_match(stores):
+    json_store, sqlite_store = stores
+    assert len(json_store) == len(sqlite_store) == 29
+    assert plain(json_store.all()) == plain(sqlite_store.all())
+    assert plain(json_store.latest(5)) == plain(sqlite_store.latest(5))
+    assert dict(json_store.get(product(4)["id"])) == dict(sqlite_store.get(product(4)["id"]))
+    assert json_store.get(product(7)["id"]) is sqlite_store.get(product(7)["id"]) is None
+
+
+def test_indexes_match(stores):
+    json_store, sqlite_store = stores
+    for seller in SELLERS:
+        assert plain(json_store.by_seller(seller)) == plain(sqlite_store.by_seller(seller))
+    for category in CATEGORIES:
+        assert plain(json_store.by_category(category)) == plain(sqlite_store.by_category(category))
+        assert json_store.listing_ids(category) == sqlite_store.listing_ids(category)
+    assert json_store.listing_ids() == sqlite_store.listing_ids()
+    assert [(phone, count, dict(first)) for phone, count, first in json_store.seller_summaries(3)] == \
+        [(phone, count, dict(first)) for phone, count, first in sqlite_store.seller_summaries(3)]
+    for prefix, seller in [("0000000", None), ("00000001", None), ("0000000", "+912"), ("ff", None)]:
+        assert json_store.find_by_prefix(prefix, seller) == sqlite_store.find_by_prefix(prefix, seller)
+
+
+@pytest.mark.parametrize("seller, category", [(None, None), ("+911", None), (None, "textiles")])
+def test_pages_match(stores, seller, category):
+    json_store, sqlite_store = stores
+    cursors = {}
+    for store in stores:
+        pages, after = [], None
+        while True:
+            products, after = store.page(4, after, seller=seller, category=category)
+            pages.append([p["id"] for p in products])
+            if after is None:
+                break
+        cursors[store] = pages
+    assert cursors[json_store] == cursors[sqlite_store]
+
+
+def test_search_matches(stores):
+    json_store, sqlite_store = stores
+    for query in ("clay pot", "handloom", "glazed", "potery"):
+        assert [p["id"] for p in json_store.search(query, 5)] == [p["id"] for p in sqlite_store.search(query, 5)]
+
+
+def test_compacted_snapshots_match(tmp_path, stores):
+    for store in stores:
+        store.compact()
+    with open(tmp_path / "json" / "products.json") as a, open(tmp_path / "sqlite" / "products.json") as b:
+        assert json.load(a) == json.load(b)
+
+
+def test_seller_stores_match(tmp_path):
+    stores = [SellerStore(str(tmp_path / "sellers.json")),
+              SqliteSellerStore(str(tmp_path / "catalog.db"), str(tmp_path / "sqlite-sellers.json"))]
+    for store in stores:
+        store.upsert({"phone": "+911", "name": "Asha"})
+        store.upsert({"phone": "+912", "name": "Ravi"})
+        store.update("+911", {"region": "Jaipur"})
+        store.delete("+912")
+    assert stores[0].all() == stores[1].all() == [{"phone": "+911", "name": "Asha", "region": "Jaipur"}]
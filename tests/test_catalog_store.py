@@ -0,0 +1,97 @@
+import json
+import os
+import subprocess
+import sys
+
+from catalog_store import SellerStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def in_other_process(path, code):
+    """Run code with ``store`` opened on path in a separate Python process"""
+    script = f"from catalog_store import SellerStore\nstore = SellerStore({path!r})\n{code}\n"
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True, timeout=60,
+                   env={**os.environ, "PYTHONPATH": ROOT})
+
+
+def seller(phone, name):
+    return {"phone": phone, "name": name}
+
+
+def test_writes_append_to_the_log_not_the_snapshot(tmp_path):
+    store = SellerStore(str(tmp_path / "sellers.json"))
+    store.upsert(seller("+911", "Asha"))
+    store.upsert(seller("+912", "Ravi"))
+    store.update("+911", {"name": "Asha Devi"})
+
+    assert not os.path.exists(store.path)
+    with open(store.log_path) as f:
+        assert [json.loads(line)["op"] for line in f] == ["upsert", "upsert", "update"]
+    # A fresh view replays the log
+    assert SellerStore(store.path).get("+911")["name"] == "Asha Devi"
+
+
+def test_log_written_by_another_process_is_replayed(tmp_path):
+    store = SellerStore(str(tmp_path / "sellers.json"))
+    store.upsert(seller("+911", "Asha"))
+    version = store.version()
+
+    in_other_process(store.path, "store.upsert({'phone': '+912', 'name': 'Ravi'})\nstore.delete('+911')")
+
+    assert store.version() != version
+    assert store.get("+911") is None
+    assert store.get("+912")["name"] == "Ravi"
+
+
+def test_compaction_by_another_process(tmp_path):
+    store = SellerStore(str(tmp_path / "sellers.json"))
+    for i in range(5):
+        store.upsert(seller(f"+91{i}", f"Seller {i}"))
+
+    in_other_process(store.path, "assert store.compact()")
+
+    with open(store.path) as f:
+        assert [record["phone"] for record in json.load(f)["sellers"]] == [f"+91{i}" for i in range(5)]
+    assert os.path.getsize(store.log_path) == 0
+    # Our view survives the snapshot swap and log reset, and keeps appending
+    assert len(store) == 5
+    store.update("+910", {"name": "Renamed"})
+    other = SellerStore(store.path)
+    assert len(other) == 5
+    assert other.get("+910")["name"] == "Renamed"
+
+
+def test_compaction_keeps_order_and_drops_deleted(tmp_path):
+    store = SellerStore(str(tmp_path / "sellers.json"))
+    for i in range(3):
+        store.upsert(seller(f"+91{i}", f"Seller {i}"))
+    store.delete("+911")
+    # Upserting an existing record moves it to the end
+    store.upsert(seller("+910", "Back"))
+    assert store.compact()
+
+    assert [record["phone"] for record in SellerStore(store.path).all()] == ["+912", "+910"]
+    assert not store.compact()
+
+
+def test_torn_log_line_is_ignored(tmp_path):
+    store = SellerStore(str(tmp_path / "sellers.json"))
+    store.upsert(seller("+911", "Asha"))
+    with open(store.log_path, "a") as f:
+        f.write('{"op": "upsert", "record": {"phone": "+9')
+
+    other = SellerStore(store.path)
+    assert [record["phone"] for record in other.all()] == ["+911"]
+    other.upsert(seller("+912", "Ravi"))
+    assert [record["phone"] for record in SellerStore(store.path).all()] == ["+911", "+912"]
+
+
+def test_readers_get_copies_of_plain_records(tmp_path):
+    store = SellerStore(str(tmp_path / "sellers.json"))
+    store.upsert(seller("+911", "Asha"))
+
+    store.get("+911")["name"] = "Changed behind the writer"
+    store.all()[0]["region"] = "Nowhere"
+    store.latest(1)[0]["bio"] = "Unsaved"
+    assert store.get("+911") == seller("+911", "Asha")
@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+
+from deploy_scheduler import DeployScheduler
+
+
+class Deploys:
+    """Stand-in deploy function that records when it ran"""
+
+    def __init__(self, results=()):
+        self.times = []
+        self.results = list(results)
+        self.done = threading.Event()
+
+    def __call__(self):
+        self.times.append(time.monotonic())
+        self.done.set()
+        return self.results.pop(0) if self.results else True
+
+
+def test_burst_of_requests_is_one_deploy():
+    deploys = Deploys()
+    scheduler = DeployScheduler(deploys, quiet=0.2, max_delay=5)
+    for i in range(10):
+        scheduler.request(f"edit {i}")
+        time.sleep(0.01)
+    assert deploys.done.wait(2)
+    time.sleep(0.3)
+    assert len(deploys.times) == 1
+    assert scheduler.state()["last_deploy"]["requests"] == 10
+
+
+def test_deploy_waits_for_the_quiet_window():
+    deploys = Deploys()
+    scheduler = DeployScheduler(deploys, quiet=0.3, max_delay=5)
+    start = time.monotonic()
+    scheduler.request("first")
+    time.sleep(0.2)
+    scheduler.request("second")
+    assert deploys.done.wait(2)
+    # Quiet counts from the latest request
+    assert deploys.times[0] - start >= 0.45
+
+
+def test_max_delay_caps_a_steady_stream():
+    deploys = Deploys()
+    scheduler = DeployScheduler(deploys, quiet=0.3, max_delay=0.5)
+    start = time.monotonic()
+    while not deploys.done.is_set() and time.monotonic() - start < 3:
+        # Never quiet for 0.3s
+        scheduler.request("edit")
+        time.sleep(0.05)
+    assert deploys.done.is_set()
+    assert 0.45 <= deploys.times[0] - start < 1.0
+
+
+def test_on_live_runs_after_a_successful_deploy():
+    deploys = Deploys()
+    scheduler = DeployScheduler(deploys, quiet=0.05, max_delay=1)
+    live = threading.Event()
+    scheduler.request("edit", on_live=live.set)
+    assert live.wait(2)
+    assert deploys.times
+
+
+def test_failed_deploy_is_retried_with_its_requests():
+    deploys = Deploys(results=[False, True])
+    scheduler = DeployScheduler(deploys, quiet=0.05, max_delay=1, retry_delay=0.2)
+    live = threading.Event()
+    scheduler.request("edit", on_live=live.set)
+    assert live.wait(3)
+    assert len(deploys.times) == 2
+    assert deploys.times[1] - deploys.times[0] >= 0.15
+    state = scheduler.state()
+    assert (state["deploys"], state["failures"]) == (1, 1)
+
+
+def test_flush_deploys_without_waiting():
+    deploys = Deploys()
+    scheduler = DeployScheduler(deploys, quiet=30, max_delay=60)
+    scheduler.request("edit")
+    assert scheduler.flush(timeout=2)
+    assert len(deploys.times) == 1
+    assert scheduler.state()["pending_requests"] == 0
+
+
+def test_only_the_bot_publishes_queued_deploys_at_exit(shop):
+    queue = "import deploy_shop\ndeploy_shop.schedule_deploy('edit')\n"
+    env = {"DEPLOY_QUIET_SECONDS": "60", "PUBLISH_DIR": shop.path("site")}
+
+    # A script that merely imports deploy_shop exits without waiting on the scheduler
+    started = time.monotonic()
+    shop.run(queue, **env)
+    assert time.monotonic() - started < 10
+    assert not os.path.exists(shop.path("site", "current"))
+
+    shop.run("import main\n" + queue, **env)
+    assert os.path.exists(shop.path("site", "current", "products.json"))
@@ -0,0 +1,69 @@
+from fragment_cache import FragmentCache
+
+RECORD = {"id": "p1", "title": "Clay pot"}
+
+
+def card(cache, record, rendered):
+    def render():
+        rendered.append(record["id"])
+        return f"<li>{record['title']}</li>"
+    return cache.get("product", record["id"], record, render)
+
+
+def test_renders_once_per_record_version(tmp_path):
+    cache, rendered = FragmentCache(str(tmp_path / "cache.jsonl"), "t1"), []
+    assert card(cache, RECORD, rendered) == "<li>Clay pot</li>"
+    assert card(cache, dict(RECORD), rendered) == "<li>Clay pot</li>"
+    assert card(cache, {**RECORD, "title": "Jug"}, rendered) == "<li>Jug</li>"
+    assert rendered == ["p1", "p1"]
+    assert cache.stats() == {"fragments": 2, "hits": 1, "misses": 2}
+
+
+def test_saved_fragments_survive_a_reload(tmp_path):
+    path = str(tmp_path / "cache.jsonl")
+    cache = FragmentCache(path, "t1")
+    card(cache, RECORD, [])
+    assert cache.save()
+    assert not cache.save()
+    card(cache, {**RECORD, "id": "p2"}, [])
+    cache.save()
+    # Header plus one appended line per fragment
+    with open(path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
+
+    rendered = []
+    reloaded = FragmentCache(path, "t1")
+    card(reloaded, RECORD, rendered)
+    assert rendered == []
+
+
+def test_template_change_drops_the_cache(tmp_path):
+    path = str(tmp_path / "cache.jsonl")
+    cache = FragmentCache(path, "t1")
+    card(cache, RECORD, [])
+    cache.save()
+
+    rendered = []
+    changed = FragmentCache(path, "t2")
+    card(changed, RECORD, rendered)
+    assert rendered == ["p1"]
+    changed.save()
+    with open(path, encoding="utf-8") as f:
+        assert f.readline() == '{"template": "t2"}\n'
+
+
+def test_torn_last_line_is_rewritten(tmp_path):
+    path = str(tmp_path / "cache.jsonl")
+    cache = FragmentCache(path, "t1")
+    card(cache, RECORD, [])
+    cache.save()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "product:p2')
+
+    reloaded = FragmentCache(path, "t1")
+    assert reloaded.stats()["fragments"] == 1
+    card(reloaded, {**RECORD, "id": "p3"}, [])
+    reloaded.save()
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()
+    assert len(lines) == 3 and all(line.endswith("}\n") for line in lines)
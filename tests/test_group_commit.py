@@ -0,0 +1,72 @@
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from catalog_store import SellerStore, writer
+
+from conftest import ROOT
+
+
+def test_concurrent_threads_and_processes_lose_no_writes(tmp_path):
+    store = SellerStore(str(tmp_path / "sellers.json"))
+    store.upsert({"phone": "+910", "name": "First"})
+
+    script = (
+        "import sys\n"
+        "from catalog_store import SellerStore\n"
+        "store = SellerStore(sys.argv[1])\n"
+        "for i in range(25):\n"
+        "    store.upsert({'phone': f'+91{sys.argv[2]}-{i}', 'name': 'Other process'})\n"
+    )
+    processes = [subprocess.Popen([sys.executable, "-c", script, store.path, f"p{n}"], cwd=ROOT)
+                 for n in range(2)]
+
+    def work(n):
+        for i in range(25):
+            store.upsert({"phone": f"+91t{n}-{i}", "name": "Thread"})
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for process in processes:
+        assert process.wait(timeout=60) == 0
+
+    assert len(SellerStore(store.path)) == 1 + 8 * 25 + 2 * 25
+
+
+def test_concurrent_field_updates_merge(tmp_path):
+    store = SellerStore(str(tmp_path / "sellers.json"))
+    store.upsert({"phone": "+911", "name": "Asha"})
+
+    fields = [f"field{i}" for i in range(20)]
+    threads = [threading.Thread(target=store.update, args=("+911", {field: field})) for field in fields]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    record = SellerStore(store.path).get("+911")
+    assert all(record[field] == field for field in fields)
+    assert record["name"] == "Asha"
+
+
+def test_failed_mutation_only_fails_its_caller(tmp_path):
+    store = SellerStore(str(tmp_path / "sellers.json"))
+
+    def broken(store):
+        raise ValueError("bad record")
+
+    with pytest.raises(ValueError):
+        writer.submit(store, broken)
+    store.upsert({"phone": "+911", "name": "Asha"})
+    assert SellerStore(store.path).get("+911")["name"] == "Asha"
+
+
+def test_update_of_missing_record_returns_none(tmp_path):
+    store = SellerStore(str(tmp_path / "sellers.json"))
+    assert store.update("+919", {"name": "Nobody"}) is None
+    assert store.delete("+919") is False
@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+import requests
+
+import hosting_deploy
+from build_manifest import BuildManifest
+from hosting_deploy import HostingAuthError, HostingDeployer, serving_config
+from hosting_standin import make_server
+
+
+@pytest.fixture
+def standin():
+    server = make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def stats(standin):
+    return requests.get(f"{standin}/stats", timeout=10).json()
+
+
+def page(text):
+    # Large enough to be worth compressing, distinct per text
+    return f"<html><body>{text}</body></html>" + "<!-- padding -->" * 64
+
+
+def test_second_deploy_uploads_only_changed_blobs(tmp_path, standin):
+    manifest = BuildManifest(str(tmp_path / "out"), str(tmp_path / "build-manifest.json"))
+    for i in range(5):
+        manifest.write(f"product/p{i}.html", page(f"product {i}"))
+    manifest.write("index.html", page("index"))
+    deployer = HostingDeployer(site="shop", api=f"{standin}/v1beta1", token="local",
+                               state_path=str(tmp_path / "hosting-deploy.json"))
+
+    first = deployer.deploy(manifest, {})
+    assert (first["files"], first["uploaded"]) == (6, 6)
+
+    manifest.write("product/p1.html", page("product 1, new price"))
+    manifest.write("product/p5.html", page("product 5"))
+    manifest.remove("product/p4.html")
+    second = deployer.deploy(manifest, {})
+    assert (second["added"], second["changed"], second["removed"]) == (1, 1, 1)
+    assert second["uploaded"] == 2
+
+    assert stats(standin)["uploads"] == 8
+    assert stats(standin)["releases"] == 2
+    live = requests.get(f"{standin}/site/product/p1.html", timeout=10).text
+    assert "new price" in live
+    assert requests.get(f"{standin}/site/product/p4.html", timeout=10).status_code == 404
+
+
+def test_nothing_changed_uploads_nothing(tmp_path, standin):
+    manifest = BuildManifest(str(tmp_path / "out"), str(tmp_path / "build-manifest.json"))
+    manifest.write("index.html", page("index"))
+    deployer = HostingDeployer(site="shop", api=f"{standin}/v1beta1", token="local",
+                               state_path=str(tmp_path / "hosting-deploy.json"))
+    deployer.deploy(manifest, {})
+    assert deployer.deploy(manifest, {})["uploaded"] == 0
+
+
+def test_missing_credentials_fail_before_reading_the_site(tmp_path, monkeypatch):
+    monkeypatch.setattr(hosting_deploy, "GOOGLE_AUTH_AVAILABLE", False)
+    monkeypatch.delenv("HOSTING_ACCESS_TOKEN", raising=False)
+
+    class Untouchable:
+        def files(self):
+            raise AssertionError("read the manifest without credentials")
+
+    with pytest.raises(HostingAuthError):
+        HostingDeployer(state_path=str(tmp_path / "hosting-deploy.json")).deploy(Untouchable(), {})
+
+
+def test_serving_config_from_firebase_json():
+    config = serving_config({
+        "headers": [{"source": "/assets/**", "headers": [{"key": "Cache-Control", "value": "immutable"}]}],
+        "rewrites": [{"source": "**", "destination": "/index.html"}],
+        "cleanUrls": True,
+    })
+    assert config["headers"] == [{"glob": "/assets/**", "headers": {"Cache-Control": "immutable"}}]
+    assert config["rewrites"] == [{"glob": "**", "path": "/index.html"}]
+    assert config["cleanUrls"] is True
@@ -0,0 +1,50 @@
+import json
+
+from conftest import product
+
+# 48 + 3 pottery products: two shards, the second one partly filled
+SEED = (
+    "import deploy_shop\n"
+    "from conftest import product\n"
+    "for i in range(3, 51):\n"
+    "    deploy_shop.update_products_json(product(i, created_at=f'2025-02-01T00:{i:02d}'))\n"
+)
+
+BUILD = (
+    "written = deploy_shop.build_category_listing('pottery')\n"
+    "deploy_shop.update_listing_index()\n"
+)
+
+
+def read_json(shop, *parts):
+    return json.loads(shop.read("out", *parts))
+
+
+def test_shards_hold_oldest_first_pages_of_newest_first_cards(shop):
+    shop.run(SEED + BUILD)
+    index = read_json(shop, "listing", "index.json")
+    assert index == {"shard_size": 48, "categories": {"pottery": {"products": 51, "shards": 2}}}
+
+    first, second = read_json(shop, "listing", "pottery", "1.json"), read_json(shop, "listing", "pottery", "2.json")
+    assert (first["category"], first["shard"], second["shard"]) == ("pottery", 1, 2)
+    assert [card["id"] for card in first["products"]] == [product(i)["id"] for i in range(47, -1, -1)]
+    assert [card["id"] for card in second["products"]] == [product(i)["id"] for i in (50, 49, 48)]
+
+
+def test_shard_cards_are_the_page_cards(shop):
+    shop.run(SEED + BUILD)
+    page = shop.read("out", "category", "pottery", "2.html")
+    for card in read_json(shop, "listing", "pottery", "2.json")["products"]:
+        assert card["html"].startswith("<")
+        assert card["html"] in page
+    assert shop.read("out", "category", "pottery", "index.html") == page
+
+
+def test_new_product_only_rewrites_the_last_shard(shop):
+    result = shop.evaluate(SEED + BUILD + (
+        "deploy_shop.update_products_json(product(51, created_at='2025-03-01'))\n"
+        "result = deploy_shop.build_category_listing('pottery')\n"
+    ))
+    # 2.html, 2.json and index.html; shard 1 is untouched
+    assert result == 3
+    assert read_json(shop, "listing", "pottery", "2.json")["products"][0]["id"] == product(51)["id"]
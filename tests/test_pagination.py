@@ -0,0 +1,75 @@
+from conftest import product
+
+SEED = (
+    "import deploy_shop\n"
+    "from conftest import product\n"
+    "for i in range(3, 25):\n"
+    "    deploy_shop.update_products_json(product(i, category='textiles' if i % 3 == 0 else 'pottery',\n"
+    "                                             created_at=f'2025-02-{i:02d}'))\n"
+)
+
+
+def walk(shop, **query):
+    """Every page of list_products(**query), as lists of ids"""
+    return shop.evaluate(SEED + (
+        "pages, cursor = [], None\n"
+        "while True:\n"
+        f"    page = deploy_shop.list_products(cursor=cursor, **{query!r})\n"
+        "    pages.append([p['id'] for p in page['products']])\n"
+        "    cursor = page['next_cursor']\n"
+        "    if cursor is None:\n"
+        "        break\n"
+        "result = pages\n"
+    ))
+
+
+def test_pages_cover_every_product_once_newest_first(shop):
+    pages = walk(shop, limit=7)
+    assert [len(page) for page in pages] == [7, 7, 7, 4]
+    ids = [i for page in pages for i in page]
+    assert ids[:2] == [product(24)["id"], product(23)["id"]]
+    assert sorted(ids) == sorted(product(i)["id"] for i in range(25))
+
+
+def test_filtered_pages(shop):
+    pages = walk(shop, limit=3, category="textiles")
+    ids = [i for page in pages for i in page]
+    assert ids == [product(i)["id"] for i in (24, 21, 18, 15, 12, 9, 6, 3)]
+
+
+def test_cursor_is_stable_while_products_are_added(shop):
+    result = shop.evaluate(SEED + (
+        "first = deploy_shop.list_products(limit=5)\n"
+        "deploy_shop.update_products_json(product(99, created_at='2025-03-01'))\n"
+        "second = deploy_shop.list_products(limit=5, cursor=first['next_cursor'])\n"
+        "result = [[p['id'] for p in first['products']], [p['id'] for p in second['products']]]\n"
+    ))
+    first, second = result
+    # The new product is on page one of a fresh listing, not pushed into page two
+    assert second[0] == product(19)["id"]
+    assert not set(first) & set(second)
+
+
+def test_projection_and_bad_cursors(shop):
+    result = shop.evaluate(SEED + (
+        "card = deploy_shop.list_products(limit=1, fields='card')['products'][0]\n"
+        "some = deploy_shop.list_products(limit=1, fields='id,price')['products'][0]\n"
+        "errors = []\n"
+        "for cursor in ('not-a-cursor', deploy_shop.encode_cursor({'x': 1})):\n"
+        "    try:\n"
+        "        deploy_shop.list_products(cursor=cursor)\n"
+        "    except ValueError:\n"
+        "        errors.append(cursor)\n"
+        "result = [card, some, len(errors)]\n"
+    ))
+    card, some, errors = result
+    assert set(card) == {"id", "title", "price", "image"}
+    assert card["image"] == product(24)["images"][0]
+    assert set(some) == {"id", "price"}
+    assert errors == 2
+
+
+def test_search_results_page_by_offset(shop):
+    pages = walk(shop, limit=10, search="clay pot")
+    ids = [i for page in pages for i in page]
+    assert len(ids) == len(set(ids)) == 25
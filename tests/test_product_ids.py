@@ -0,0 +1,56 @@
+from catalog_store import ProductStore
+
+from conftest import product
+
+
+def make_store(tmp_path, products):
+    store = ProductStore(str(tmp_path / "products.json"))
+    for record in products:
+        store.upsert(record)
+    return store
+
+
+def test_unique_prefix_finds_one_product(tmp_path):
+    store = make_store(tmp_path, [product(1), product(2, id="abc12345-aaaa")])
+    assert store.find_by_prefix("abc12345") == ["abc12345-aaaa"]
+    assert store.find_by_prefix("abd") == []
+    assert store.find_by_prefix("") == []
+
+
+def test_ambiguous_prefix_returns_several(tmp_path):
+    store = make_store(tmp_path, [product(1, id="abc12345-aaaa"), product(2, id="abc12345-bbbb")])
+    assert store.find_by_prefix("abc12345") == ["abc12345-aaaa", "abc12345-bbbb"]
+    assert store.find_by_prefix("abc12345-b") == ["abc12345-bbbb"]
+
+
+def test_seller_scope_disambiguates(tmp_path):
+    store = make_store(tmp_path, [
+        product(1, id="abc12345-aaaa", artisan_phone="+911"),
+        product(2, id="abc12345-bbbb", artisan_phone="+912"),
+    ])
+    assert store.find_by_prefix("abc12345", seller="+912") == ["abc12345-bbbb"]
+    assert store.find_by_prefix("abc12345-aaaa", seller="+912") == []
+
+
+def test_prefix_index_follows_deletes(tmp_path):
+    store = make_store(tmp_path, [product(1, id="abc12345-aaaa"), product(2, id="abc12345-bbbb")])
+    store.delete("abc12345-aaaa")
+    assert store.find_by_prefix("abc12345") == ["abc12345-bbbb"]
+
+
+def test_unscoped_lookup_needs_a_full_short_id(shop):
+    ids = shop.evaluate(
+        "import deploy_shop\n"
+        "result = [deploy_shop.find_product_ids(prefix, seller) for prefix, seller in [\n"
+        "    ('00000001', None), ('0', None), ('0000000', None),\n"
+        "    ('00000001', 'whatsapp:+919900000001'), ('0', '+919900000001'), ('0', '+910000000000'),\n"
+        "]]\n"
+    )
+    full = product(1)["id"]
+    assert ids[0] == [full]
+    # Too short to look up without a seller, even where unique or ambiguous
+    assert ids[1] == [] and ids[2] == []
+    # The seller's own products, with or without the whatsapp: prefix
+    assert ids[3] == [full]
+    assert len(ids[4]) == 2
+    assert ids[5] == []
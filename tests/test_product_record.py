@@ -0,0 +1,49 @@
+import json
+import pickle
+
+import pytest
+
+from product_record import Product, json_default, unique_images
+
+from conftest import product
+
+
+def test_round_trips_the_catalog_json_shape():
+    data = {**product(1), "images": ["a.jpg", "b.jpg"], "image_variants": ["480w"], "custom": {"x": 1}}
+    record = Product.from_dict(data)
+    assert record.to_dict() == data
+    assert json.loads(json.dumps(record, default=json_default)) == data
+    assert pickle.loads(pickle.dumps(record)).to_dict() == data
+
+
+def test_behaves_like_a_read_only_dict():
+    record = Product.from_dict(product(1))
+    assert record["title"] == "Clay pot 1"
+    assert record.get("rating") is None and record.get("rating", 5) == 5
+    assert "title" in record and "rating" not in record and "custom" not in record
+    with pytest.raises(KeyError):
+        record["rating"]
+    with pytest.raises(TypeError):
+        record["title"] = "Changed"
+    assert {**record, "price": 1}["price"] == 1
+    assert len(record) == len(product(1))
+
+
+def test_images_are_deduplicated_and_tuples():
+    record = Product.from_dict({**product(1), "images": ["a.jpg", "", "a.jpg", "b.jpg"]})
+    assert record["images"] == ("a.jpg", "b.jpg")
+    assert record.to_dict()["images"] == ["a.jpg", "b.jpg"]
+    assert unique_images("a.jpg") == ("a.jpg",)
+    assert unique_images(None) == ()
+
+
+def test_shared_strings_are_interned():
+    first = Product.from_dict({**product(1), "artisan_phone": "".join(["+91", "99"])})
+    second = Product.from_dict({**product(2), "artisan_phone": "".join(["+9", "199"])})
+    assert first["artisan_phone"] is second["artisan_phone"]
+
+
+def test_uses_no_per_record_dict():
+    record = Product.from_dict(product(1))
+    assert not hasattr(record, "__dict__")
+    assert Product.from_dict(record) is record
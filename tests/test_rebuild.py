@@ -0,0 +1,36 @@
+import os
+import shutil
+
+from conftest import Shop, product
+
+
+def pages(shop):
+    """Every rendered product and seller page (not the .gz copies), by path"""
+    found = {}
+    for folder in ("product", "seller"):
+        for name in sorted(os.listdir(shop.path("out", folder))):
+            if name.endswith(".html"):
+                found[f"{folder}/{name}"] = shop.read("out", folder, name)
+    return found
+
+
+def test_worker_count_does_not_change_the_pages(shop, tmp_path):
+    other = Shop(tmp_path / "other")
+    shutil.copytree(shop.dir, other.dir, ignore=shutil.ignore_patterns("other"))
+
+    serial = shop.evaluate("import rebuild\nresult = rebuild.rebuild(workers=1)")
+    parallel = other.evaluate("import rebuild\nresult = rebuild.rebuild(workers=2, shard_size=1)")
+
+    assert serial["pages"] == parallel["pages"] == 3 + 1 + 1  # products, seller, index
+    assert serial["errors"] == parallel["errors"] == {}
+    assert pages(shop) == pages(other)
+    assert f"product/{product(0)['id']}.html" in pages(shop)
+    assert shop.read("out", "index.html") == other.read("out", "index.html")
+
+
+def test_second_rebuild_changes_nothing(shop):
+    first = shop.evaluate("import rebuild\nresult = rebuild.rebuild(workers=2, shard_size=1)")
+    second = shop.evaluate("import rebuild\nresult = rebuild.rebuild(workers=2, shard_size=1)")
+    assert first["written"] == first["pages"]
+    assert second["pages"] == first["pages"]
+    assert second["written"] == 0
@@ -0,0 +1,74 @@
+import gzip
+import json
+
+from response_cache import ResponseCache, accepted_encodings, etag_matches, response_parts
+
+PAYLOAD = {"products": [{"id": str(i), "title": "Clay pot " * 10} for i in range(20)]}
+
+
+def test_entry_is_reused_until_the_version_moves():
+    cache = ResponseCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return PAYLOAD
+
+    first = cache.get("products", 1, build)
+    assert cache.get("products", 1, build) is first
+    assert cache.get("products", 2, build) is not first
+    assert len(builds) == 2
+    # Unversioned data is never reused
+    cache.get("other", None, build)
+    cache.get("other", None, build)
+    assert len(builds) == 4
+    assert cache.get("missing", 1, lambda: None) is None
+
+
+def test_compressed_variants_and_etags():
+    entry = ResponseCache().get("products", 1, lambda: PAYLOAD)
+    status, body, headers = response_parts(entry, "gzip, deflate", None)
+    assert status == 200
+    assert headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(body)) == PAYLOAD
+
+    plain_status, plain_body, plain_headers = response_parts(entry, "identity", None)
+    assert "Content-Encoding" not in plain_headers
+    assert json.loads(plain_body) == PAYLOAD
+    # Each representation has its own strong ETag
+    assert plain_headers["ETag"] != headers["ETag"]
+    assert headers["Vary"] == "Accept-Encoding"
+
+
+def test_if_none_match_gets_a_304():
+    entry = ResponseCache().get("products", 1, lambda: PAYLOAD)
+    _, _, headers = response_parts(entry, "gzip", None)
+    status, body, revalidated = response_parts(entry, "gzip", f'W/{headers["ETag"]}, "other"')
+    assert (status, body) == (304, b"")
+    assert revalidated["ETag"] == headers["ETag"]
+    assert response_parts(entry, "gzip", '"stale"')[0] == 200
+
+
+def test_header_parsing():
+    assert accepted_encodings("gzip;q=0, br;q=0.5, identity") == {"br", "identity"}
+    assert etag_matches("*", '"x"')
+    assert not etag_matches(None, '"x"')
+
+
+def test_api_revalidates_until_the_catalog_changes(shop):
+    result = shop.evaluate(
+        "import main\n"
+        "from conftest import product\n"
+        "client = main.app.test_client()\n"
+        "first = client.get('/api/products?limit=2')\n"
+        "etag = first.headers['ETag']\n"
+        "again = client.get('/api/products?limit=2', headers={'If-None-Match': etag})\n"
+        "main.update_product_fields(product(2)['id'], {'price': 4321})\n"
+        "changed = client.get('/api/products?limit=2', headers={'If-None-Match': etag})\n"
+        "result = [first.status_code, etag, again.status_code, changed.status_code, changed.headers['ETag'],\n"
+        "          changed.get_json()['products'][0]['price']]\n"
+    )
+    first, etag, again, changed, new_etag, price = result
+    assert (first, again, changed) == (200, 304, 200)
+    assert new_etag != etag
+    assert price == 4321
@@ -0,0 +1,73 @@
+from search_index import SearchIndex, tokenize
+
+
+def make_index(*products):
+    index = SearchIndex()
+    for product in products:
+        index.add(product)
+    return index
+
+
+def ids(results):
+    return [doc_id for doc_id, _ in results]
+
+
+def test_title_match_outranks_description_match():
+    index = make_index(
+        {"id": "desc", "title": "Clay lamp", "description": "Comes with a small terracotta pot"},
+        {"id": "title", "title": "Terracotta pot", "description": "Hand thrown and fired"},
+    )
+    assert ids(index.search("pot")) == ["title", "desc"]
+
+
+def test_rare_terms_weigh_more_than_common_ones():
+    index = make_index(
+        {"id": "1", "title": "Handloom saree", "description": "cotton"},
+        {"id": "2", "title": "Handloom stole", "description": "cotton"},
+        {"id": "3", "title": "Handloom dupatta", "description": "ikat cotton"},
+    )
+    # "ikat" is in one document, "handloom" in all of them
+    assert index.search("handloom ikat")[0][0] == "3"
+
+
+def test_plurals_and_hashtags_are_folded():
+    assert "pot" in tokenize("pots")
+    assert {"handloom", "weaving", "handloomweaving"} <= set(tokenize("#HandloomWeaving"))
+
+
+def test_typo_falls_back_to_similar_terms():
+    index = make_index(
+        {"id": "1", "title": "Blue pottery vase", "description": ""},
+        {"id": "2", "title": "Brass lamp", "description": ""},
+    )
+    assert "potery" not in index._postings
+    assert ids(index.search("potery")) == ["1"]
+
+
+def test_known_terms_are_not_expanded():
+    index = make_index(
+        {"id": "1", "title": "Brass lamp", "description": ""},
+        {"id": "2", "title": "Brass lamps and lampshades", "description": ""},
+        {"id": "3", "title": "Glass bangle", "description": ""},
+    )
+    # "brass" is in the vocabulary, so "glass" (one letter away) doesn't match
+    assert set(ids(index.search("brass"))) == {"1", "2"}
+
+
+def test_removed_documents_leave_no_trace():
+    index = make_index({"id": "1", "title": "Pottery vase", "description": ""})
+    index.remove("1")
+    assert index.search("pottery") == []
+    assert index.search("potery") == []
+    assert not index._trigrams
+
+
+def test_limit_keeps_the_best():
+    index = make_index(*({"id": str(i), "title": "pot " * (i + 1), "description": "vase"} for i in range(10)))
+    assert ids(index.search("pot", limit=3)) == ids(index.search("pot"))[:3]
+
+
+def test_ties_rank_by_id_whatever_the_insertion_order():
+    products = [{"id": doc_id, "title": "Clay pot", "description": ""} for doc_id in ("b", "c", "a")]
+    assert ids(make_index(*products).search("pot")) == ["a", "b", "c"]
+    assert ids(make_index(*reversed(products)).search("pot", limit=2)) == ["a", "b"]
@@ -0,0 +1,69 @@
+from catalog_store import ProductStore
+
+from conftest import product
+
+
+def ids(products):
+    return [p["id"] for p in products]
+
+
+def make_store(tmp_path):
+    store = ProductStore(str(tmp_path / "products.json"))
+    store.upsert(product(1, artisan_phone="+911"))
+    store.upsert(product(2, artisan_phone="+912"))
+    store.upsert(product(3, artisan_phone="+911"))
+    # Older records only have the bot's user_phone
+    store.upsert({**product(4, artisan_phone=None), "user_phone": "+912"})
+    return store
+
+
+def test_products_by_seller_in_upload_order(tmp_path):
+    store = make_store(tmp_path)
+    assert ids(store.by_seller("+911")) == [product(1)["id"], product(3)["id"]]
+    assert ids(store.by_seller("+912")) == [product(2)["id"], product(4)["id"]]
+    assert store.by_seller("+919") == []
+
+
+def test_edits_keep_the_index_current(tmp_path):
+    store = make_store(tmp_path)
+    store.update(product(1)["id"], {"price": 999})
+    # A price edit keeps the product's place
+    assert ids(store.by_seller("+911")) == [product(1)["id"], product(3)["id"]]
+    assert store.by_seller("+911")[0]["price"] == 999
+
+    store.update(product(3)["id"], {"artisan_phone": "+912"})
+    assert ids(store.by_seller("+911")) == [product(1)["id"]]
+    assert product(3)["id"] in ids(store.by_seller("+912"))
+
+    store.delete(product(1)["id"])
+    assert store.by_seller("+911") == []
+    assert [phone for phone, _, _ in store.seller_summaries(10)] == ["+912"]
+
+
+def test_seller_summaries_count_products(tmp_path):
+    store = make_store(tmp_path)
+    summaries = store.seller_summaries(10)
+    assert [(phone, count, first["id"]) for phone, count, first in summaries] == [
+        ("+911", 2, product(1)["id"]),
+        ("+912", 2, product(2)["id"]),
+    ]
+    assert len(store.seller_summaries(1)) == 1
+
+
+def test_index_follows_writes_from_another_view(tmp_path):
+    store = make_store(tmp_path)
+    other = ProductStore(store.path)
+    other.upsert(product(5, artisan_phone="+911"))
+    assert ids(store.by_seller("+911"))[-1] == product(5)["id"]
+
+
+def test_seller_page_lists_the_sellers_products(shop):
+    shop.run(
+        "import deploy_shop\n"
+        "deploy_shop.update_products_json({**deploy_shop.get_product_by_id("
+        f"{product(0)['id']!r}).to_dict(), 'title': 'Blue pottery vase'}})\n"
+        "deploy_shop.build_seller_page(deploy_shop.get_seller_profile('+919900000001'))\n"
+    )
+    page = shop.read("out", "seller", "+919900000001.html")
+    assert "Blue pottery vase" in page
+    assert "Clay pot 2" in page
@@ -0,0 +1,32 @@
+import json
+import os
+
+from conftest import product
+
+PID = product(0)["id"]
+BUILD = (
+    "import deploy_shop\n"
+    "deploy_shop.write_site_assets()\n"
+    f"deploy_shop.build_and_host({PID!r}, 'Hand thrown', [])\n"
+)
+
+
+def test_shell_mode_writes_documents_and_drops_pages(shop):
+    shop.run(BUILD)
+    assert os.path.exists(shop.path("out", "product", f"{PID}.html"))
+
+    shop.run(BUILD, SITE_MODE="shell", PRERENDER_PRODUCTS="1")
+    assert not os.path.exists(shop.path("out", "product", f"{PID}.html"))
+    document = json.loads(shop.read("out", "product", f"{PID}.json"))
+    assert (document["id"], document["title"]) == (PID, "Clay pot 0")
+    assert "product-shell.html" in os.listdir(shop.path("out"))
+    # Full pages for crawlers stay outside the deployed directory
+    assert "Clay pot 0" in shop.read("prerender", "product", f"{PID}.html")
+
+
+def test_pages_mode_drops_documents_and_the_shell(shop):
+    shop.run(BUILD, SITE_MODE="shell")
+    shop.run(BUILD)
+    assert os.path.exists(shop.path("out", "product", f"{PID}.html"))
+    assert not os.path.exists(shop.path("out", "product", f"{PID}.json"))
+    assert not os.path.exists(shop.path("out", "product-shell.html"))
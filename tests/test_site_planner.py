@@ -0,0 +1,80 @@
+from site_planner import BuildPlanner
+
+
+def implied(key):
+    kind, _, name = key.partition(":")
+    return [f"product/{name}.html"] if kind == "product" else []
+
+
+def build(planner, output, deps):
+    planner.record(output, deps, planner.tick())
+
+
+def test_marks_plan_only_dependent_outputs():
+    planner = BuildPlanner(implied)
+    build(planner, "index.html#products", ["products:latest", "product:1", "product:2"])
+    build(planner, "seller/+91.html", ["seller:+91", "product:2"])
+    build(planner, "product/1.html", ["product:1"])
+
+    planner.mark("product:1")
+    assert planner.plan() == {"index.html#products", "product/1.html"}
+    planner.mark("seller:+91")
+    assert "seller/+91.html" in planner.plan()
+
+
+def test_implied_outputs_are_planned_before_their_first_build():
+    planner = BuildPlanner(implied)
+    planner.mark("product:new")
+    assert planner.plan() == {"product/new.html"}
+
+
+def test_output_built_after_the_mark_is_not_stale():
+    planner = BuildPlanner(implied)
+    planner.mark("product:1")
+    build(planner, "product/1.html", ["product:1"])
+    assert planner.plan() == set()
+
+
+def test_mark_during_a_render_keeps_the_output_stale():
+    planner = BuildPlanner(implied)
+    started = planner.tick()
+    # The product changes after the page read it
+    planner.mark("product:1")
+    planner.record("product/1.html", ["product:1"], started)
+    assert planner.plan() == {"product/1.html"}
+
+
+def test_marks_survive_until_the_build_is_done():
+    planner = BuildPlanner(implied)
+    planner.mark("product:1", "product:2")
+    started = planner.tick()
+    assert planner.plan() == {"product/1.html", "product/2.html"}
+    # Planned again if the build never finished
+    assert planner.plan() == {"product/1.html", "product/2.html"}
+
+    build(planner, "product/1.html", ["product:1"])
+    planner.done(started, failed=["product/2.html"])
+    assert planner.plan() == {"product/2.html"}
+    planner.mark("product:3")
+    planner.done(started)
+    # Marks made after the build started are kept
+    assert planner.plan() == {"product/3.html"}
+
+
+def test_dependencies_are_replaced_on_rebuild():
+    planner = BuildPlanner(implied)
+    build(planner, "index.html#products", ["product:1"])
+    build(planner, "index.html#products", ["product:2"])
+    planner.mark("product:1")
+    assert planner.plan() == {"product/1.html"}
+
+
+def test_first_build_in_a_new_process_includes_edited_pages(shop):
+    product_id = "00000001-0000-4000-8000-000000000001"
+    output = shop.run(
+        "import deploy_shop\n"
+        f"deploy_shop.update_product_fields({product_id!r}, {{'price': 12345}})\n"
+        "deploy_shop.create_shop_index()\n"
+    )
+    assert "1 pages" in output
+    assert "12345" in shop.read("out", "product", f"{product_id}.html")
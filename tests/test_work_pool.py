@@ -0,0 +1,97 @@
+import threading
+import time
+
+from work_pool import WorkPool
+
+
+def wait_for(condition, timeout=3):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def blocked_pool(lanes, **kwargs):
+    """A one-worker pool whose worker is held until the returned event is set"""
+    pool = WorkPool(lanes, workers=1, **kwargs)
+    gate = threading.Event()
+    pool.submit(lanes[0][0], "setup", gate.wait)
+    wait_for(lambda: pool.stats()["lanes"][lanes[0][0]]["running"] == 1)
+    return pool, gate
+
+
+def test_lanes_are_served_in_priority_order():
+    pool, gate = blocked_pool([("edits", 1), ("photos", 1), ("reels", 1)])
+    order = []
+    for lane in ("reels", "photos", "edits"):
+        pool.submit(lane, "+911", order.append, lane)
+    gate.set()
+    wait_for(lambda: len(order) == 3)
+    assert order == ["edits", "photos", "reels"]
+
+
+def test_senders_take_turns_within_a_lane():
+    pool, gate = blocked_pool([("photos", 1)])
+    order = []
+    for i in range(3):
+        pool.submit("photos", "busy", order.append, f"busy-{i}")
+    pool.submit("photos", "quiet", order.append, "quiet-0")
+    pool.submit("photos", "other", order.append, "other-0")
+    gate.set()
+    wait_for(lambda: len(order) == 5)
+    assert order == ["busy-0", "quiet-0", "other-0", "busy-1", "busy-2"]
+
+
+def test_lane_concurrency_is_capped():
+    pool = WorkPool([("reels", 2), ("photos", 4)], workers=4)
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0}
+    done = []
+
+    def job():
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        time.sleep(0.05)
+        with lock:
+            running["now"] -= 1
+            done.append(1)
+
+    for i in range(8):
+        pool.submit("reels", f"+91{i}", job)
+    wait_for(lambda: len(done) == 8)
+    assert running["max"] == 2
+
+
+def test_busy_low_lane_leaves_workers_for_higher_lanes():
+    pool = WorkPool([("edits", 2), ("reels", 1)], workers=2)
+    gate = threading.Event()
+    for i in range(3):
+        pool.submit("reels", f"+91{i}", gate.wait)
+    finished = threading.Event()
+    pool.submit("edits", "+919", finished.set)
+    # Reels hold only one worker, so the edit runs while they're stuck
+    assert finished.wait(2)
+    gate.set()
+
+
+def test_full_lane_rejects_submissions():
+    pool, gate = blocked_pool([("photos", 1)], max_queued=2)
+    assert pool.submit("photos", "+911", lambda: None)
+    assert pool.submit("photos", "+912", lambda: None)
+    assert not pool.submit("photos", "+913", lambda: None)
+    stats = pool.stats()["lanes"]["photos"]
+    assert (stats["queued"], stats["rejected"]) == (2, 1)
+    gate.set()
+    wait_for(lambda: pool.stats()["lanes"]["photos"]["completed"] == 3)
+    assert pool.submit("photos", "+913", lambda: None)
+
+
+def test_failed_job_does_not_stop_the_worker(capsys):
+    pool = WorkPool([("photos", 1)], workers=1)
+    done = threading.Event()
+    pool.submit("photos", "+911", lambda: 1 / 0)
+    pool.submit("photos", "+911", done.set)
+    assert done.wait(2)
+    wait_for(lambda: pool.stats()["lanes"]["photos"]["failed"] == 1)
+    assert "ZeroDivisionError" in capsys.readouterr().out
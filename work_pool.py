@@ -0,0 +1,147 @@
+"""Bounded worker pool for the bot's background work, with priority lanes.
+
+Photos, reels and edits used to get a thread each, so a burst of uploads
+meant hundreds of threads hitting Gemini, GCS and the catalog at once. Now
+they are queued here and run on a fixed number of workers:
+
+- lanes are served in priority order (edits before new products before
+  reels), each with its own concurrency limit, so a busy lane can't take
+  every worker;
+- within a lane, senders take turns (round-robin), so one seller sending
+  fifty photos doesn't hold up everyone else's first one;
+- each lane's queue is bounded; submit() returns False when it's full.
+
+stats() reports queue depth, running jobs and wait/run times per lane.
+"""
+import statistics
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+
+
+class _Lane:
+    def __init__(self, name, concurrency, max_queued):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        # sender -> queued jobs, in the order senders take turns
+        self.senders = OrderedDict()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        # Seconds spent queued and running, for the most recent jobs
+        self.waits = deque(maxlen=500)
+        self.runs = deque(maxlen=500)
+
+    def pop(self):
+        """Next job: the first sender's oldest, after which that sender goes to the back"""
+        sender, jobs = next(iter(self.senders.items()))
+        job = jobs.popleft()
+        if jobs:
+            self.senders.move_to_end(sender)
+        else:
+            del self.senders[sender]
+        self.queued -= 1
+        return job
+
+
+def _summary(seconds):
+    if not seconds:
+        return {"p50": 0, "p95": 0, "max": 0}
+    ordered = sorted(seconds)
+    return {
+        "p50": round(statistics.median(ordered), 3),
+        "p95": round(ordered[max(int(len(ordered) * 0.95) - 1, 0)], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+class WorkPool:
+    """Fixed set of worker threads serving priority lanes with per-sender fairness.
+
+    ``lanes`` is [(name, concurrency)] from highest priority to lowest.
+    """
+
+    def __init__(self, lanes, workers=4, max_queued=100, name="work-pool"):
+        self.workers = workers
+        self.name = name
+        self._lanes = OrderedDict((lane, _Lane(lane, concurrency, max_queued)) for lane, concurrency in lanes)
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def submit(self, lane, sender, fn, *args):
+        """Queue fn(*args) in a lane on behalf of sender; returns False if the lane is full"""
+        with self._cond:
+            queue = self._lanes[lane]
+            if queue.queued >= queue.max_queued:
+                queue.rejected += 1
+                return False
+            if not self._threads:
+                for i in range(self.workers):
+                    thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+            queue.senders.setdefault(sender, deque()).append((fn, args, time.monotonic()))
+            queue.queued += 1
+            self._cond.notify()
+            return True
+
+    def _next(self):
+        """Highest-priority lane with queued work and a free slot (caller holds the lock)"""
+        for queue in self._lanes.values():
+            if queue.queued and queue.running < queue.concurrency:
+                return queue
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                queue = self._next()
+                while queue is None:
+                    self._cond.wait()
+                    queue = self._next()
+                fn, args, queued_at = queue.pop()
+                queue.running += 1
+                started = time.monotonic()
+                queue.waits.append(started - queued_at)
+
+            failed = False
+            try:
+                fn(*args)
+            except Exception:
+                failed = True
+                print(f"❌ {queue.name} job failed:\n{traceback.format_exc()}")
+
+            with self._cond:
+                queue.running -= 1
+                queue.runs.append(time.monotonic() - started)
+                if failed:
+                    queue.failed += 1
+                else:
+                    queue.completed += 1
+                # A slot in this lane is free again
+                self._cond.notify_all()
+
+    def stats(self):
+        """Per-lane queue depth, running jobs, outcomes and wait/run seconds"""
+        with self._cond:
+            now = time.monotonic()
+            lanes = {}
+            for queue in self._lanes.values():
+                oldest = min((jobs[0][2] for jobs in queue.senders.values()), default=None)
+                lanes[queue.name] = {
+                    "queued": queue.queued,
+                    "senders_waiting": len(queue.senders),
+                    "running": queue.running,
+                    "concurrency": queue.concurrency,
+                    "completed": queue.completed,
+                    "failed": queue.failed,
+                    "rejected": queue.rejected,
+                    "oldest_wait_seconds": round(now - oldest, 3) if oldest is not None else None,
+                    "wait_seconds": _summary(queue.waits),
+                    "run_seconds": _summary(queue.runs),
+                }
+            return {"workers": self.workers, "lanes": lanes}